@@ -0,0 +1,66 @@
+class Adiado:
+    """
+    Chamada de função cujo cálculo foi adiado (modo preguiçoso do ProSisInterpreter).
+
+    O tipo do resultado é conhecido sem calcular a função, o que permite verificar a
+    declaração na hora. As variáveis lidas são capturadas pelas suas entradas em
+    'vars': se forem redeclaradas antes do cálculo, a chamada ainda usa os valores
+    da época da declaração. Uma declaração que nunca é lida nunca é calculada; uma
+    cópia ('sis B = Ai') compartilha o mesmo objeto, e o valor é calculado uma vez.
+
+    Attributes:
+        funcao (str): Nome da função ('inv', 'det', 'solve', ...)
+        nome_var (str): Variável 'sis' passada à função
+        nomes_termos (tuple): Termos independentes extras de 'solve'
+        linha (int): Linha da chamada no código fonte
+        tipo (str): Tipo do resultado ('float', 'eq' ou 'sis')
+        entradas (dict): Entradas de 'vars' das variáveis lidas, no momento da declaração
+        valor: Resultado da chamada, depois de calculado
+        calculado (bool): Indica se 'valor' já foi calculado
+    """
+
+    __slots__ = ('funcao', 'nome_var', 'nomes_termos', 'linha', 'tipo', 'entradas', 'valor', 'calculado')
+
+    def __init__(self, funcao, nome_var, nomes_termos, linha, tipo, entradas):
+        self.funcao = funcao
+        self.nome_var = nome_var
+        self.nomes_termos = tuple(nomes_termos)
+        self.linha = linha
+        self.tipo = tipo
+        self.entradas = entradas
+        self.valor = None
+        self.calculado = False
+
+    def __repr__(self):
+        argumentos = ', '.join([self.nome_var, *self.nomes_termos])
+        estado = 'calculado' if self.calculado else 'pendente'
+        return f"Adiado({self.funcao}({argumentos}), {estado})"
+
+
+def tipo_resultado(funcao, valor, tipos_termos):
+    """
+    Tipo do resultado de uma chamada de função, sem calculá-la.
+
+    Args:
+        funcao (str): Nome da função
+        valor: Valor da variável 'sis' passada à função (pode ser um Adiado)
+        tipos_termos (list): Tipos das variáveis com termos independentes extras
+
+    Returns:
+        str: 'float', 'eq' ou 'sis', ou None se só o cálculo pode dizer (ou falhar)
+    """
+    if funcao == 'det':
+        return 'float'
+    if funcao != 'solve':
+        return 'sis'
+    if len(tipos_termos) > 1:
+        return 'sis'
+    if tipos_termos:
+        return tipos_termos[0] if tipos_termos[0] in ('eq', 'sis') else None
+    if isinstance(valor, Adiado):
+        return None
+    # Sem termos explícitos, as colunas além da parte quadrada são os termos independentes
+    colunas_termos = valor.shape[1] - valor.shape[0]
+    if colunas_termos < 1:
+        return None
+    return 'eq' if colunas_termos == 1 else 'sis'
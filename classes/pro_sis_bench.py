@@ -0,0 +1,309 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from importlib import metadata
+
+import numpy as np
+
+from pro_sis_interpreter import ProSisCompiler
+from pro_sis_lote import GRAMATICA_PADRAO
+
+FUNCOES = ('solve', 'det', 'inv', 'trans', 'retP', 'retL', 'retU', 'retD')
+
+# Cenários usados quando nenhum parâmetro é informado na linha de comando
+CENARIOS_PADRAO = (
+    {'tamanho': 10, 'variaveis': 4, 'comandos': 16, 'esparso': False},
+    {'tamanho': 100, 'variaveis': 2, 'comandos': 8, 'esparso': False},
+    {'tamanho': 300, 'variaveis': 1, 'comandos': 8, 'esparso': False},
+    {'tamanho': 1000, 'variaveis': 1, 'comandos': 8, 'esparso': True},
+)
+
+
+def gerar_programa(tamanho, variaveis=1, comandos=8, esparso=False, densidade=0.01, semente=0):
+    """
+    Gera um programa PRO-SIS sintético com formato controlado.
+
+    Cada variável é um sistema aumentado 'tamanho' x ('tamanho' + 1) diagonalmente
+    dominante (portanto não singular), com coeficientes decimais; os comandos
+    percorrem FUNCOES em ciclo, alternando entre as variáveis.
+
+    Args:
+        tamanho (int): Número de equações de cada sistema
+        variaveis (int): Número de variáveis 'sis' declaradas
+        comandos (int): Número de comandos 'funcao variavel end'
+        esparso (bool): Se True, declara os sistemas com 'sparse(m, n) {...}'
+        densidade (float): Fração de elementos não nulos fora da diagonal (sistemas esparsos)
+        semente (int): Semente do gerador aleatório
+
+    Returns:
+        str: Código fonte PRO-SIS
+    """
+    rng = np.random.default_rng(semente)
+    linhas = []
+    for v in range(variaveis):
+        if esparso:
+            linhas.append(_sistema_esparso(f"S{v}", tamanho, densidade, rng))
+        else:
+            linhas.append(_sistema_denso(f"S{v}", tamanho, rng))
+        linhas.append("")
+    for c in range(comandos):
+        linhas.append(f"{FUNCOES[c % len(FUNCOES)]} S{c % variaveis} end")
+    return "\n".join(linhas) + "\n"
+
+
+def _coeficientes(rng, n, tamanho):
+    # Diagonal 1 e demais coeficientes em (-1/n, 1/n): dominância diagonal sem
+    # determinantes que estourem o float64 em sistemas grandes
+    return rng.integers(-9, 10, size=tamanho) / (10 * n)
+
+
+def _sistema_denso(nome, n, rng):
+    valores = _coeficientes(rng, n, (n, n + 1))
+    valores[np.arange(n), np.arange(n)] = 1.0
+    corpo = ",\n".join("    [" + ", ".join(f"{v:.6f}" for v in linha) + "]" for linha in valores.tolist())
+    return f"sis {nome} = {{\n{corpo}\n}}"
+
+
+def _sistema_esparso(nome, n, densidade, rng):
+    extras = int(densidade * n * n)
+    posicoes = {(i, i): 1.0 for i in range(n)}
+    linhas = rng.integers(0, n, size=extras).tolist()
+    colunas = rng.integers(0, n, size=extras).tolist()
+    for i, j, v in zip(linhas, colunas, _coeficientes(rng, n, extras).tolist()):
+        posicoes.setdefault((i, j), v)
+    for i, v in enumerate(_coeficientes(rng, n, n).tolist()):
+        posicoes[(i, n)] = v
+    triplas = ",\n".join(f"    ({i}, {j}, {v:.6f})" for (i, j), v in sorted(posicoes.items()))
+    return f"sis {nome} = sparse({n}, {n + 1}) {{\n{triplas}\n}}"
+
+
+def _estatisticas(tempos):
+    return {
+        'min_s': min(tempos),
+        'mediana_s': statistics.median(tempos),
+        'media_s': statistics.fmean(tempos),
+        'desvio_s': statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        'repeticoes': len(tempos),
+    }
+
+
+def _medir(funcao, repeticoes, preparar=None):
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return _estatisticas(tempos)
+
+
+def nome_cenario(cenario):
+    """Identificador estável de um cenário, usado para comparar relatórios."""
+    tipo = 'esparso' if cenario.get('esparso') else 'denso'
+    return f"{tipo}_n{cenario['tamanho']}_v{cenario['variaveis']}_c{cenario['comandos']}"
+
+
+def medir_cenario(compilador, cenario, repeticoes=5):
+    """
+    Mede separadamente cada fase da execução de um programa gerado.
+
+    - 'parse': Lark.parse do código;
+    - 'lexico': ProSisLexer.lex_and_print (impressão descartada, arquivo em diretório temporário);
+    - 'transform': ProSisInterpreter.transform da árvore, com a saída de resultados nula;
+    - 'funcoes': cada função de FUNCOES sobre a primeira variável, sem fatorações em cache.
+
+    Args:
+        compilador (ProSisCompiler): Compilador já construído (a gramática não entra na medida)
+        cenario (dict): Parâmetros de gerar_programa
+        repeticoes (int): Número de repetições de cada medida
+
+    Returns:
+        dict: Parâmetros, tamanho do código e estatísticas de tempo por fase e por função
+    """
+    codigo = gerar_programa(**cenario)
+    parser = compilador.pro_sis_parser
+    tree = parser.parse(codigo)
+
+    def novo_interpretador():
+        compilador.reiniciar()
+
+    def transformar():
+        compilador.interpreter.transform(tree)
+
+    with tempfile.TemporaryDirectory() as diretorio, contextlib.redirect_stdout(io.StringIO()) as saida:
+        caminho_tokens = os.path.join(diretorio, "tokens.txt")
+
+        def lexico():
+            compilador.lexer.lex_and_print(codigo, caminho_saida_txt=caminho_tokens)
+            saida.seek(0)
+            saida.truncate()
+
+        fases = {
+            'parse': _medir(lambda: parser.parse(codigo), repeticoes),
+            'lexico': _medir(lexico, repeticoes),
+            'transform': _medir(transformar, repeticoes, preparar=novo_interpretador),
+        }
+
+    interpretador = compilador.interpreter
+    funcoes = {}
+    for nome_funcao in FUNCOES:
+        funcoes[nome_funcao] = _medir(lambda: interpretador.executar_comando(nome_funcao, 'S0'), repeticoes,
+                                      preparar=interpretador.fatoracoes.limpar)
+
+    return {
+        'nome': nome_cenario(cenario),
+        'parametros': dict(cenario),
+        'bytes_codigo': len(codigo.encode('utf-8')),
+        'fases': fases,
+        'funcoes': funcoes,
+    }
+
+
+def _versao(pacote):
+    try:
+        return metadata.version(pacote)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def executar_benchmark(cenarios=CENARIOS_PADRAO, repeticoes=5, parser='lalr', grammar_file=GRAMATICA_PADRAO):
+    """
+    Executa os cenários e monta um relatório JSON comparável entre versões.
+
+    Args:
+        cenarios (iterable): Parâmetros de gerar_programa, um dict por cenário
+        repeticoes (int): Número de repetições de cada medida
+        parser (str): Algoritmo de análise sintática ('earley' ou 'lalr')
+        grammar_file (str): Caminho da gramática .lark
+
+    Returns:
+        dict: Relatório com o ambiente, o tempo de carga da gramática e os cenários
+    """
+    opcoes = {'saida_resultados': 'nula', 'guardar_resultados': False, 'verboso': False}
+    inicio = time.perf_counter()
+    compilador = ProSisCompiler(grammar_file, parser=parser, opcoes_interpretador=opcoes)
+    carga_gramatica = time.perf_counter() - inicio
+
+    return {
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'numpy': _versao('numpy'),
+            'scipy': _versao('scipy'),
+            'lark': _versao('lark'),
+        },
+        'parser': parser,
+        'repeticoes': repeticoes,
+        'carga_gramatica_s': carga_gramatica,
+        'cenarios': [medir_cenario(compilador, dict(c), repeticoes) for c in cenarios],
+    }
+
+
+def comparar_relatorios(base, novo, limite=0.10):
+    """
+    Compara as medianas de dois relatórios, cenário a cenário.
+
+    Args:
+        base (dict): Relatório de referência
+        novo (dict): Relatório a avaliar
+        limite (float): Aumento relativo da mediana a partir do qual há regressão (0.10 = 10%)
+
+    Returns:
+        list: Uma entrada por medida presente nos dois relatórios, com a razão novo/base
+              e o indicador 'regressao'
+    """
+    cenarios_base = {c['nome']: c for c in base['cenarios']}
+    comparacoes = []
+    for cenario in novo['cenarios']:
+        referencia = cenarios_base.get(cenario['nome'])
+        if referencia is None:
+            continue
+        for grupo in ('fases', 'funcoes'):
+            for medida, estatisticas in cenario[grupo].items():
+                if medida not in referencia[grupo]:
+                    continue
+                antes = referencia[grupo][medida]['mediana_s']
+                depois = estatisticas['mediana_s']
+                razao = depois / antes if antes > 0 else float('inf')
+                comparacoes.append({
+                    'cenario': cenario['nome'],
+                    'medida': f"{grupo}.{medida}",
+                    'base_s': antes,
+                    'novo_s': depois,
+                    'razao': razao,
+                    'regressao': razao > 1 + limite,
+                })
+    return comparacoes
+
+
+def imprimir_relatorio(relatorio):
+    """Imprime as medianas de cada cenário em forma de tabela."""
+    print(f"Carga da gramática ({relatorio['parser']}): {relatorio['carga_gramatica_s'] * 1e3:.1f} ms")
+    for cenario in relatorio['cenarios']:
+        print(f"\n{cenario['nome']} ({cenario['bytes_codigo']} bytes)")
+        for grupo in ('fases', 'funcoes'):
+            for medida, estatisticas in cenario[grupo].items():
+                print(f"  {medida:<10} {estatisticas['mediana_s'] * 1e3:10.3f} ms  "
+                      f"(min {estatisticas['min_s'] * 1e3:.3f} ms)")
+
+
+def main():
+    """
+    Executa o benchmark e imprime (ou salva) o relatório, ou compara dois relatórios (--comparar).
+
+    Na comparação, termina com código 1 se alguma medida piorar além do limite.
+    """
+    cli_parser = argparse.ArgumentParser(description="Benchmark das fases do interpretador PRO-SIS")
+    cli_parser.add_argument("--tamanhos", type=int, nargs="+", default=None,
+                            help="Tamanhos dos sistemas gerados (padrão: cenários embutidos).")
+    cli_parser.add_argument("--variaveis", type=int, default=1, help="Variáveis 'sis' por programa (padrão: 1).")
+    cli_parser.add_argument("--comandos", type=int, default=len(FUNCOES), help="Comandos por programa (padrão: 8).")
+    cli_parser.add_argument("--esparso", action="store_true", help="Gera sistemas esparsos.")
+    cli_parser.add_argument("--densidade", type=float, default=0.01, help="Densidade fora da diagonal dos sistemas esparsos.")
+    cli_parser.add_argument("--repeticoes", type=int, default=5, help="Repetições de cada medida (padrão: 5).")
+    cli_parser.add_argument("--parser", choices=ProSisCompiler.PARSERS_SUPORTADOS, default="lalr",
+                            help="Algoritmo de análise sintática (padrão: lalr).")
+    cli_parser.add_argument("--saida", default=None, help="Arquivo JSON onde salvar o relatório.")
+    cli_parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NOVO"), default=None,
+                            help="Compara dois relatórios salvos em vez de executar o benchmark.")
+    cli_parser.add_argument("--limite", type=float, default=0.10,
+                            help="Piora relativa considerada regressão na comparação (padrão: 0.10).")
+    args = cli_parser.parse_args()
+
+    if args.comparar:
+        with open(args.comparar[0], 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.comparar[1], 'r', encoding='utf-8') as f:
+            novo = json.load(f)
+        comparacoes = comparar_relatorios(base, novo, args.limite)
+        for c in comparacoes:
+            marca = "REGRESSÃO" if c['regressao'] else ""
+            print(f"{c['cenario']:<28} {c['medida']:<18} {c['base_s'] * 1e3:10.3f} ms -> "
+                  f"{c['novo_s'] * 1e3:10.3f} ms  x{c['razao']:.2f} {marca}")
+        sys.exit(1 if any(c['regressao'] for c in comparacoes) else 0)
+
+    if args.tamanhos:
+        cenarios = [{'tamanho': n, 'variaveis': args.variaveis, 'comandos': args.comandos,
+                     'esparso': args.esparso, 'densidade': args.densidade} for n in args.tamanhos]
+    else:
+        cenarios = CENARIOS_PADRAO
+
+    relatorio = executar_benchmark(cenarios, repeticoes=args.repeticoes, parser=args.parser)
+    imprimir_relatorio(relatorio)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\nRelatório salvo em '{args.saida}'.")
+
+
+if __name__ == "__main__":
+    main()
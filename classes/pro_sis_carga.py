@@ -0,0 +1,124 @@
+import os
+import warnings
+
+import numpy as np
+import scipy.sparse as sp
+
+EXTENSOES_BINARIAS = ('.bin', '.raw', '.f64')
+LINHAS_POR_BLOCO = 65536
+SEPARADORES = str.maketrans(',;', '  ')
+
+
+def carregar_matriz(caminho, forma=None):
+    """
+    Carrega uma matriz externa sem passar pelo parser.
+
+    - '.npy': mapeada em memória (somente leitura), sem cópia;
+    - '.bin', '.raw', '.f64': float64 little-endian cru, mapeado em memória
+      (sem 'forma', o resultado é um vetor);
+    - '.npz': matriz esparsa salva com scipy.sparse.save_npz;
+    - demais extensões: texto (CSV, ';' ou espaços), lido em blocos.
+
+    Args:
+        caminho (str): Caminho do arquivo
+        forma (tuple): Dimensões (linhas, colunas), obrigatórias apenas para arquivos crus
+
+    Returns:
+        np.ndarray or sp.csr_matrix: Matriz (ou vetor) carregada
+
+    Raises:
+        Exception: Se o arquivo não existir ou não puder ser interpretado
+    """
+    if not os.path.isfile(caminho):
+        raise Exception(f"Erro: Arquivo de dados '{caminho}' não encontrado.")
+
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.npy':
+        try:
+            matriz = np.load(caminho, mmap_mode='r')
+        except ValueError as e:
+            # Arrays de objetos (pickle) não são carregados nem mapeados em memória
+            raise Exception(f"Erro: O arquivo '{caminho}' não é um .npy numérico válido ({e}).")
+        if not (np.issubdtype(matriz.dtype, np.number) or matriz.dtype == np.bool_):
+            raise Exception(f"Erro: O arquivo '{caminho}' não contém dados numéricos (dtype {matriz.dtype}).")
+    elif extensao in EXTENSOES_BINARIAS:
+        matriz = np.memmap(caminho, dtype='<f8', mode='r')
+    elif extensao == '.npz':
+        matriz = sp.load_npz(caminho).tocsr()
+    else:
+        return carregar_texto(caminho, forma)
+
+    if forma is not None:
+        if int(np.prod(forma)) != int(np.prod(matriz.shape)):
+            raise Exception(f"Erro: O arquivo '{caminho}' tem {matriz.shape} elementos, incompatível com a forma {forma}.")
+        matriz = matriz.reshape(forma)
+    return matriz
+
+
+def carregar_texto(caminho, forma=None):
+    """
+    Lê uma matriz em texto em blocos de linhas, gravando direto em um buffer float64.
+
+    Uma primeira passada conta as linhas (sem guardar o texto) para pré-alocar o
+    buffer; a segunda converte cada bloco com np.fromstring. Separadores aceitos:
+    vírgula, ponto e vírgula e espaços. Linhas vazias ou iniciadas por '#' são ignoradas.
+
+    Args:
+        caminho (str): Caminho do arquivo de texto
+        forma (tuple): Dimensões esperadas (opcional, usadas para validar)
+
+    Returns:
+        np.ndarray: Matriz lida
+
+    Raises:
+        Exception: Se as linhas não tiverem o mesmo número de colunas
+    """
+    with open(caminho, 'rb') as f:
+        max_linhas = sum(bloco.count(b'\n') for bloco in iter(lambda: f.read(1 << 20), b'')) + 1
+
+    matriz = None
+    linhas_lidas = 0
+    with open(caminho, 'r', encoding='utf-8') as f:
+        bloco = []
+        for linha in f:
+            linha = linha.strip()
+            if not linha or linha.startswith('#'):
+                continue
+            bloco.append(linha)
+            if len(bloco) == LINHAS_POR_BLOCO:
+                matriz, linhas_lidas = _converter_bloco(bloco, matriz, linhas_lidas, max_linhas, caminho)
+                bloco = []
+        if bloco:
+            matriz, linhas_lidas = _converter_bloco(bloco, matriz, linhas_lidas, max_linhas, caminho)
+
+    if matriz is None:
+        raise Exception(f"Erro: O arquivo '{caminho}' não contém dados numéricos.")
+    if linhas_lidas < matriz.shape[0]:
+        # Libera as linhas pré-alocadas e não usadas (comentários e linhas vazias), sem
+        # cópia: uma view 'matriz[:linhas_lidas]' manteria o buffer inteiro vivo
+        matriz.resize((linhas_lidas, matriz.shape[1]), refcheck=False)
+    if forma is not None and matriz.shape != tuple(forma):
+        raise Exception(f"Erro: O arquivo '{caminho}' tem forma {matriz.shape}, diferente da declarada {tuple(forma)}.")
+    return matriz
+
+
+def _converter_bloco(bloco, matriz, linhas_lidas, max_linhas, caminho):
+    linhas = '\n'.join(bloco).translate(SEPARADORES).split('\n')
+    if matriz is None:
+        matriz = np.empty((max_linhas, len(linhas[0].split())), dtype=np.float64)
+    colunas = matriz.shape[1]
+    # Linhas de tamanhos diferentes podem somar o total esperado: confere cada uma
+    if any(len(linha.split()) != colunas for linha in linhas):
+        raise Exception(f"Erro: Todas as linhas de '{caminho}' devem ter {colunas} colunas.")
+    with warnings.catch_warnings():
+        # Texto não numérico interrompe a leitura (DeprecationWarning e resultado curto,
+        # ou ValueError nas versões novas do NumPy)
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            valores = np.fromstring(' '.join(linhas), dtype=np.float64, sep=' ')
+        except ValueError:
+            valores = None
+    if valores is None or valores.size != len(bloco) * colunas:
+        raise Exception(f"Erro: O arquivo '{caminho}' contém valores não numéricos.")
+    matriz[linhas_lidas:linhas_lidas + len(bloco)] = valores.reshape(len(bloco), colunas)
+    return matriz, linhas_lidas + len(bloco)
@@ -0,0 +1,97 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import cg, gmres
+
+SOLVERS_ITERATIVOS = {
+    'cg': cg,
+    'gmres': gmres,
+}
+
+
+def montar_esparsa(linhas, colunas, triplas):
+    """
+    Monta uma matriz esparsa CSR a partir de triplas (linha, coluna, valor).
+
+    Os índices começam em 0; triplas repetidas para a mesma posição são somadas.
+
+    Args:
+        linhas (int): Número de linhas da matriz
+        colunas (int): Número de colunas da matriz
+        triplas (np.ndarray): Matriz k x 3 com as triplas
+
+    Returns:
+        sp.csr_matrix: Matriz esparsa
+
+    Raises:
+        Exception: Se algum índice estiver fora das dimensões declaradas
+    """
+    idx_linhas = triplas[:, 0].astype(np.int64)
+    idx_colunas = triplas[:, 1].astype(np.int64)
+    if idx_linhas.size and (idx_linhas.max() >= linhas or idx_colunas.max() >= colunas):
+        raise Exception(f"Erro Semântico: Tripla com índice fora das dimensões declaradas ({linhas} x {colunas}).")
+    return sp.csr_matrix((triplas[:, 2], (idx_linhas, idx_colunas)), shape=(linhas, colunas))
+
+
+def converter_se_esparsa(matriz, limiar_densidade, tamanho_minimo):
+    """
+    Converte uma matriz densa para CSR quando ela é grande e majoritariamente nula.
+
+    Args:
+        matriz (np.ndarray): Matriz densa
+        limiar_densidade (float): Fração máxima de não nulos para converter (None desativa)
+        tamanho_minimo (int): Número mínimo de elementos para considerar a conversão
+
+    Returns:
+        np.ndarray or sp.csr_matrix: A própria matriz ou sua versão esparsa
+    """
+    if limiar_densidade is None or matriz.size < tamanho_minimo:
+        return matriz
+    if np.count_nonzero(matriz) <= limiar_densidade * matriz.size:
+        return sp.csr_matrix(matriz)
+    return matriz
+
+
+def termos_independentes(matriz, n):
+    """
+    Retorna as colunas a partir de n de um sistema aumentado como termos independentes densos.
+
+    Args:
+        matriz (np.ndarray or sparse): Sistema aumentado n x (n + k)
+        n (int): Número de colunas de coeficientes
+
+    Returns:
+        np.ndarray: Vetor (k = 1) ou matriz n x k
+    """
+    termos = matriz[:, n:]
+    if sp.issparse(termos):
+        termos = termos.toarray()
+    return termos[:, 0] if termos.shape[1] == 1 else termos
+
+
+def matriz_diagonal(A):
+    """Matriz diagonal com a diagonal de A, preservando o formato (denso ou esparso)."""
+    if sp.issparse(A):
+        return sp.diags(A.diagonal()).tocsr()
+    return np.diag(np.diag(A))
+
+
+def resolver_iterativo(A, b, metodo, tolerancia):
+    """
+    Resolve A x = b por um método iterativo de Krylov.
+
+    Args:
+        A (np.ndarray or sparse): Matriz de coeficientes quadrada
+        b (np.ndarray): Vetor de termos independentes
+        metodo (str): 'cg' (A simétrica definida positiva) ou 'gmres'
+        tolerancia (float): Tolerância relativa do resíduo
+
+    Returns:
+        np.ndarray: Solução aproximada
+
+    Raises:
+        np.linalg.LinAlgError: Se o método não convergir
+    """
+    x, info = SOLVERS_ITERATIVOS[metodo](A, b, rtol=tolerancia, atol=0.0)
+    if info != 0:
+        raise np.linalg.LinAlgError(f"o método '{metodo}' não convergiu (código {info})")
+    return x
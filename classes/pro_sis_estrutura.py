@@ -0,0 +1,86 @@
+from collections import namedtuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import bandwidth, issymmetric
+
+# Estrutura de uma matriz quadrada: 'tipo' e o número de diagonais não nulas abaixo
+# ('inferior') e acima ('superior') da diagonal principal
+Estrutura = namedtuple('Estrutura', ['tipo', 'inferior', 'superior'])
+
+# Uma matriz é tratada como em banda quando as diagonais não nulas ocupam no máximo
+# esta fração da largura: a LU em banda custa O(n p q), contra O(n^3) da LU densa
+FRACAO_BANDA = 0.25
+
+# Fatoração (ver CacheFatoracoes) usada para cada estrutura
+FATORACAO_POR_ESTRUTURA = {
+    'diagonal': 'diagonal',
+    'triangular_inferior': 'triangular_inferior',
+    'triangular_superior': 'triangular_superior',
+    'banda': 'banda',
+    'simetrica_positiva': 'cholesky',
+    'simetrica_indefinida': 'lu',
+    'geral': 'lu',
+}
+
+DESCRICOES = {
+    'diagonal': ("diagonal", "divisão pela diagonal, O(n)"),
+    'triangular_inferior': ("triangular inferior", "substituição progressiva, O(n²)"),
+    'triangular_superior': ("triangular superior", "substituição regressiva, O(n²)"),
+    'banda': ("em banda ({inferior} abaixo, {superior} acima da diagonal)", "LU em banda, O(n·p·q)"),
+    'simetrica_positiva': ("simétrica definida positiva", "Cholesky"),
+    'simetrica_indefinida': ("simétrica (não definida positiva)", "LU"),
+    'geral': ("geral", "LU"),
+}
+
+
+def detectar_estrutura(A):
+    """
+    Detecta a estrutura de uma matriz quadrada, em O(n²) (O(nnz) se esparsa).
+
+    As estruturas são testadas da mais para a menos específica: diagonal, triangular,
+    em banda e simétrica. Uma matriz simétrica com diagonal positiva é classificada
+    como 'simetrica': só a fatoração de Cholesky confirma se é definida positiva.
+    Matrizes esparsas só são classificadas como diagonais ou triangulares; nas demais
+    a LU esparsa já aproveita a esparsidade.
+
+    Args:
+        A (np.ndarray or sparse): Matriz quadrada
+
+    Returns:
+        Estrutura: Tipo e larguras de banda da matriz
+    """
+    n = A.shape[0]
+    if sp.issparse(A):
+        coo = A.tocoo()
+        nao_nulos = coo.data != 0
+        deslocamentos = coo.col[nao_nulos].astype(np.int64) - coo.row[nao_nulos]
+        inferior = int(max(0, -deslocamentos.min())) if deslocamentos.size else 0
+        superior = int(max(0, deslocamentos.max())) if deslocamentos.size else 0
+    else:
+        inferior, superior = bandwidth(A)
+
+    if inferior == 0 and superior == 0:
+        return Estrutura('diagonal', 0, 0)
+    if superior == 0:
+        return Estrutura('triangular_inferior', inferior, 0)
+    if inferior == 0:
+        return Estrutura('triangular_superior', 0, superior)
+    if sp.issparse(A):
+        return Estrutura('geral', inferior, superior)
+    if inferior + superior + 1 <= FRACAO_BANDA * n:
+        return Estrutura('banda', inferior, superior)
+    if np.all(np.diagonal(A) > 0) and issymmetric(A):
+        return Estrutura('simetrica', inferior, superior)
+    return Estrutura('geral', inferior, superior)
+
+
+def descrever(estrutura):
+    """
+    Descreve a estrutura e o solver escolhido, para as mensagens do interpretador.
+
+    Returns:
+        str: Ex.: "triangular superior; solver: substituição regressiva, O(n²)"
+    """
+    descricao, solver = DESCRICOES[estrutura.tipo]
+    return f"{descricao.format(**estrutura._asdict())}; solver: {solver}"
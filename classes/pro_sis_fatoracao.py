@@ -0,0 +1,473 @@
+import threading
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import LinAlgWarning, cho_factor, cho_solve, get_lapack_funcs, lu_factor, lu_solve, solve_triangular
+from scipy.sparse.linalg import splu, spsolve_triangular
+
+
+class FatoracaoLU:
+    """
+    Decomposição LU com pivoteamento parcial (A = P L U) de uma matriz quadrada.
+
+    Guarda apenas a saída compacta do LAPACK (getrf); P, L, U, determinante,
+    inversa e soluções são derivados dela sem refatorar a matriz.
+    """
+
+    def __init__(self, A):
+        """
+        Fatora a matriz A.
+
+        Args:
+            A (np.ndarray): Matriz quadrada a ser fatorada
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", LinAlgWarning)
+            self.lu, self.piv = lu_factor(A)
+        self.n = self.lu.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.lu.nbytes + self.piv.nbytes
+
+    def singular(self):
+        """Indica se algum pivô é exatamente zero."""
+        return not np.all(np.diagonal(self.lu))
+
+    def _permutacao(self):
+        perm = np.arange(self.n)
+        for i, p in enumerate(self.piv):
+            perm[i], perm[p] = perm[p], perm[i]
+        return perm
+
+    def P(self):
+        """Matriz de permutação P, tal que A = P L U."""
+        P = np.zeros((self.n, self.n), dtype=self.lu.dtype)
+        P[self._permutacao(), np.arange(self.n)] = 1.0
+        return P
+
+    def L(self):
+        """Matriz triangular inferior L, com diagonal unitária."""
+        L = np.tril(self.lu, k=-1)
+        np.fill_diagonal(L, 1.0)
+        return L
+
+    def U(self):
+        """Matriz triangular superior U."""
+        return np.triu(self.lu)
+
+    def det(self):
+        """Determinante calculado pelo produto da diagonal de U e pelo sinal da permutação."""
+        trocas = np.count_nonzero(self.piv != np.arange(self.n))
+        sinal = -1.0 if trocas % 2 else 1.0
+        # Produto em float64 mesmo com fatores float32 (evita overflow); soma 0.0 para
+        # normalizar o -0.0 de matrizes singulares
+        return sinal * np.prod(np.diagonal(self.lu), dtype=np.float64) + 0.0
+
+    def resolver(self, b, transposta=False):
+        """
+        Resolve A x = b (ou A^T x = b, com transposta=True) reaproveitando os fatores.
+
+        Raises:
+            np.linalg.LinAlgError: Se a matriz for singular
+        """
+        if self.singular():
+            raise np.linalg.LinAlgError("Singular matrix")
+        return lu_solve((self.lu, self.piv), b, trans=1 if transposta else 0)
+
+    def inversa(self):
+        """
+        Inversa de A a partir dos fatores.
+
+        Raises:
+            np.linalg.LinAlgError: Se a matriz for singular
+        """
+        return self.resolver(np.eye(self.n, dtype=self.lu.dtype))
+
+
+class FatoracaoCholesky:
+    """
+    Decomposição de Cholesky (A = C^T C) de uma matriz simétrica definida positiva.
+    """
+
+    def __init__(self, A):
+        """
+        Fatora a matriz A.
+
+        Raises:
+            np.linalg.LinAlgError: Se a matriz não for definida positiva
+        """
+        self.c, self.lower = cho_factor(A)
+        self.n = self.c.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.c.nbytes
+
+    def singular(self):
+        # cho_factor só termina com sucesso se A for definida positiva
+        return False
+
+    def det(self):
+        return np.prod(np.diagonal(self.c), dtype=np.float64) ** 2
+
+    def resolver(self, b, transposta=False):
+        # A é simétrica: A^T x = b é o mesmo sistema
+        return cho_solve((self.c, self.lower), b)
+
+    def inversa(self):
+        return self.resolver(np.eye(self.n, dtype=self.c.dtype))
+
+
+class FatoracaoDiagonal:
+    """
+    Matriz diagonal (densa ou esparsa): 'solve' é uma divisão elemento a elemento.
+    """
+
+    def __init__(self, A):
+        self.esparsa = sp.issparse(A)
+        self.d = np.asarray(A.diagonal())
+        self.n = self.d.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.d.nbytes
+
+    def singular(self):
+        return not np.all(self.d)
+
+    def det(self):
+        return np.prod(self.d, dtype=np.float64) + 0.0
+
+    def resolver(self, b, transposta=False):
+        if self.singular():
+            raise np.linalg.LinAlgError("Singular matrix")
+        b = np.asarray(b)
+        return b / (self.d if b.ndim == 1 else self.d[:, np.newaxis])
+
+    def inversa(self):
+        if self.singular():
+            raise np.linalg.LinAlgError("Singular matrix")
+        if self.esparsa:
+            return sp.diags(1.0 / self.d, format='csr')
+        return np.diag(1.0 / self.d)
+
+
+class FatoracaoTriangular:
+    """
+    Matriz triangular (densa ou esparsa): 'solve' por substituição, sem fatorar.
+
+    Guarda apenas uma referência à matriz da variável, que já é contada no workspace.
+    """
+
+    def __init__(self, A, inferior):
+        """
+        Args:
+            A (np.ndarray or sparse): Matriz triangular quadrada
+            inferior (bool): True se A for triangular inferior, False se superior
+        """
+        self.esparsa = sp.issparse(A)
+        self.A = A.tocsr() if self.esparsa else A
+        self.inferior = inferior
+        self.n = A.shape[0]
+
+    @property
+    def nbytes(self):
+        return 0
+
+    def singular(self):
+        return not np.all(self.A.diagonal())
+
+    def det(self):
+        return np.prod(self.A.diagonal(), dtype=np.float64) + 0.0
+
+    def resolver(self, b, transposta=False):
+        if self.singular():
+            raise np.linalg.LinAlgError("Singular matrix")
+        if self.esparsa:
+            A = self.A.T.tocsr() if transposta else self.A
+            return spsolve_triangular(A, np.asarray(b, dtype=self.A.dtype), lower=self.inferior != transposta)
+        return solve_triangular(self.A, b, trans=1 if transposta else 0, lower=self.inferior)
+
+    def inversa(self):
+        inversa = self.resolver(np.eye(self.n, dtype=self.A.dtype))
+        return sp.csr_matrix(inversa) if self.esparsa else inversa
+
+
+class FatoracaoBanda:
+    """
+    Decomposição LU com pivoteamento parcial de uma matriz em banda (LAPACK gbtrf),
+    guardada no formato compacto de banda: O(n p q) operações e O(n (2p + q)) memória
+    para p diagonais abaixo e q acima da diagonal principal.
+    """
+
+    def __init__(self, A, inferior, superior):
+        """
+        Fatora a matriz A.
+
+        Args:
+            A (np.ndarray): Matriz quadrada em banda
+            inferior (int): Número de diagonais não nulas abaixo da principal
+            superior (int): Número de diagonais não nulas acima da principal
+        """
+        self.n = A.shape[0]
+        self.inferior = inferior
+        self.superior = superior
+        # Linha 'inferior + superior - d' guarda a diagonal d; as 'inferior' primeiras
+        # linhas ficam livres para o preenchimento causado pelo pivoteamento
+        banda = np.zeros((2 * inferior + superior + 1, self.n), dtype=A.dtype)
+        for d in range(-inferior, superior + 1):
+            linha = inferior + superior - d
+            if d >= 0:
+                banda[linha, d:] = np.diagonal(A, d)
+            else:
+                banda[linha, :self.n + d] = np.diagonal(A, d)
+        gbtrf, self._gbtrs = get_lapack_funcs(('gbtrf', 'gbtrs'), (banda,))
+        self.lu, self.piv, _ = gbtrf(banda, inferior, superior)
+
+    @property
+    def nbytes(self):
+        return self.lu.nbytes + self.piv.nbytes
+
+    def _diagonal_u(self):
+        return self.lu[self.inferior + self.superior]
+
+    def singular(self):
+        return not np.all(self._diagonal_u())
+
+    def det(self):
+        trocas = np.count_nonzero(self.piv != np.arange(self.n))
+        sinal = -1.0 if trocas % 2 else 1.0
+        return sinal * np.prod(self._diagonal_u(), dtype=np.float64) + 0.0
+
+    def resolver(self, b, transposta=False):
+        if self.singular():
+            raise np.linalg.LinAlgError("Singular matrix")
+        x, _ = self._gbtrs(self.lu, self.inferior, self.superior, np.asarray(b, dtype=self.lu.dtype), self.piv,
+                           trans=1 if transposta else 0)
+        return x
+
+    def inversa(self):
+        return self.resolver(np.eye(self.n, dtype=self.lu.dtype))
+
+
+class FatoracaoLUEsparsa:
+    """
+    Decomposição LU esparsa (SuperLU) de uma matriz quadrada esparsa: Pr A Pc = L U.
+
+    Com ordem 'COLAMD' (padrão) as colunas são reordenadas para reduzir o
+    preenchimento, o que é o ideal para 'solve' e 'det'. Com ordem 'NATURAL'
+    Pc é a identidade, e P = Pr^T satisfaz A = P L U como na versão densa.
+    Uma matriz exatamente singular não é fatorada: 'det' retorna 0 e as demais
+    operações lançam LinAlgError.
+    """
+
+    def __init__(self, A, ordem='COLAMD'):
+        """
+        Fatora a matriz A.
+
+        Args:
+            A (sparse): Matriz quadrada esparsa a ser fatorada
+            ordem (str): Ordenação das colunas usada pelo SuperLU
+        """
+        self.n = A.shape[0]
+        A = sp.csc_matrix(A)
+        self.dtype = A.dtype
+        try:
+            self.fatores = splu(A, permc_spec=ordem)
+        except RuntimeError:
+            self.fatores = None
+        # Valores e índices de L e U, no tipo dos fatores (float64 ou float32); o SuperLU
+        # monta uma cópia de L e U a cada acesso, então o tamanho é medido uma única vez
+        self._nbytes = 0
+        if self.fatores is not None:
+            self._nbytes = sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+                               for m in (self.fatores.L, self.fatores.U))
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def singular(self):
+        return self.fatores is None
+
+    def _exigir_fatores(self):
+        if self.fatores is None:
+            raise np.linalg.LinAlgError("Singular matrix")
+        return self.fatores
+
+    def P(self):
+        """Matriz de permutação P = Pr^T (A = P L U quando a ordem é 'NATURAL')."""
+        perm_r = self._exigir_fatores().perm_r
+        return sp.csr_matrix((np.ones(self.n, dtype=self.dtype), (np.arange(self.n), perm_r)), shape=(self.n, self.n))
+
+    def L(self):
+        return self._exigir_fatores().L.tocsr()
+
+    def U(self):
+        return self._exigir_fatores().U.tocsr()
+
+    def det(self):
+        """Determinante pelo produto da diagonal de U e pelos sinais das duas permutações."""
+        if self.fatores is None:
+            return 0.0
+        sinal = _sinal_permutacao(self.fatores.perm_r) * _sinal_permutacao(self.fatores.perm_c)
+        return sinal * np.prod(self.fatores.U.diagonal(), dtype=np.float64) + 0.0
+
+    def resolver(self, b, transposta=False):
+        # O SuperLU exige termos com o mesmo tipo dos fatores (float64 ou float32)
+        return self._exigir_fatores().solve(np.asarray(b, dtype=self.dtype), trans='T' if transposta else 'N')
+
+    def inversa(self):
+        """Inversa de A (em geral densa, devolvida no formato esparso)."""
+        return sp.csr_matrix(self.resolver(np.eye(self.n, dtype=self.dtype)))
+
+
+def _sinal_permutacao(perm):
+    """Retorna +1 ou -1 conforme a paridade da permutação (n - número de ciclos)."""
+    visitado = np.zeros(len(perm), dtype=bool)
+    ciclos = 0
+    for i in range(len(perm)):
+        if not visitado[i]:
+            ciclos += 1
+            j = i
+            while not visitado[j]:
+                visitado[j] = True
+                j = perm[j]
+    return -1.0 if (len(perm) - ciclos) % 2 else 1.0
+
+
+class CacheFatoracoes:
+    """
+    Cache de fatorações por variável, com política de descarte LRU limitada em bytes.
+
+    As entradas são identificadas pelo nome da variável, pelo tipo de fatoração e
+    pelo formato da matriz fatorada (a matriz completa ou apenas os coeficientes de
+    um sistema aumentado). Reatribuir a variável deve chamar 'invalidar'.
+    Matrizes esparsas usam as fatorações de FATORACOES_ESPARSAS.
+
+    O cache pode ser usado por várias threads: a mesma fatoração pedida ao mesmo
+    tempo é calculada uma única vez, e fatorações diferentes rodam em paralelo.
+
+    Attributes:
+        limite_bytes (int): Memória máxima ocupada pelos fatores em cache
+        bytes_usados (int): Memória ocupada atualmente
+    """
+
+    FATORACOES = {
+        'lu': FatoracaoLU,
+        'cholesky': FatoracaoCholesky,
+        'diagonal': FatoracaoDiagonal,
+        'triangular_inferior': lambda A: FatoracaoTriangular(A, inferior=True),
+        'triangular_superior': lambda A: FatoracaoTriangular(A, inferior=False),
+        'banda': FatoracaoBanda,
+    }
+
+    FATORACOES_ESPARSAS = {
+        'lu': FatoracaoLUEsparsa,
+        'lu_natural': lambda A: FatoracaoLUEsparsa(A, ordem='NATURAL'),
+        'diagonal': FatoracaoDiagonal,
+        'triangular_inferior': lambda A: FatoracaoTriangular(A, inferior=True),
+        'triangular_superior': lambda A: FatoracaoTriangular(A, inferior=False),
+    }
+
+    def __init__(self, limite_bytes=256 * 1024 ** 2):
+        self.limite_bytes = limite_bytes
+        self.bytes_usados = 0
+        self._entradas = OrderedDict()
+        # Chaves de cada variável: 'invalidar' é chamado a cada declaração e não pode
+        # percorrer o cache inteiro
+        self._por_variavel = {}
+        self._trava = threading.Lock()
+        self._calculando = {}
+
+    def obter(self, nome_var, tipo, A, *argumentos):
+        """
+        Retorna a fatoração de A, calculando-a apenas se ainda não estiver em cache.
+
+        Args:
+            nome_var (str): Nome da variável de onde A foi extraída
+            tipo (str): Tipo da fatoração ('lu', 'lu_natural', 'cholesky', 'diagonal',
+                        'triangular_inferior', 'triangular_superior' ou 'banda')
+            A (np.ndarray or sparse): Matriz a ser fatorada
+            *argumentos: Argumentos extras da fatoração (larguras de banda, em 'banda')
+
+        Returns:
+            Fatores da matriz (FatoracaoLU, FatoracaoCholesky, FatoracaoLUEsparsa, ...)
+
+        Raises:
+            np.linalg.LinAlgError: Se a fatoração não se aplicar à matriz (ex.: Cholesky
+                        de uma matriz que não é definida positiva)
+        """
+        esparsa = sp.issparse(A)
+        if not esparsa and tipo == 'lu_natural':
+            # A LU densa não reordena colunas; compartilha a entrada de 'lu'
+            tipo = 'lu'
+        chave = (nome_var, tipo, A.shape)
+        with self._trava:
+            fatores = self._buscar(chave)
+            if fatores is not None:
+                return fatores
+            calculando = self._calculando.setdefault(chave, threading.Lock())
+
+        with calculando:
+            with self._trava:
+                fatores = self._buscar(chave)
+            if fatores is not None:
+                return fatores
+            fabricas = self.FATORACOES_ESPARSAS if esparsa else self.FATORACOES
+            try:
+                fatores = fabricas[tipo](A, *argumentos)
+            except BaseException:
+                with self._trava:
+                    self._calculando.pop(chave, None)
+                raise
+            with self._trava:
+                self._calculando.pop(chave, None)
+                if fatores.nbytes <= self.limite_bytes:
+                    self._entradas[chave] = fatores
+                    self._por_variavel.setdefault(nome_var, set()).add(chave)
+                    self.bytes_usados += fatores.nbytes
+                    self._descartar_ate(self.limite_bytes)
+        return fatores
+
+    def _descartar_ate(self, limite_bytes):
+        while self._entradas and self.bytes_usados > limite_bytes:
+            chave, descartado = self._entradas.popitem(last=False)
+            self._remover_indice(chave)
+            self.bytes_usados -= descartado.nbytes
+
+    def _remover_indice(self, chave):
+        chaves = self._por_variavel.get(chave[0])
+        if chaves is not None:
+            chaves.discard(chave)
+            if not chaves:
+                del self._por_variavel[chave[0]]
+
+    def _buscar(self, chave):
+        fatores = self._entradas.get(chave)
+        if fatores is not None:
+            self._entradas.move_to_end(chave)
+        return fatores
+
+    def reduzir(self, limite_bytes):
+        """Descarta as fatorações menos usadas recentemente até ocupar no máximo 'limite_bytes'."""
+        with self._trava:
+            self._descartar_ate(limite_bytes)
+
+    def invalidar(self, nome_var):
+        """Remove todas as fatorações associadas à variável."""
+        with self._trava:
+            for chave in self._por_variavel.pop(nome_var, ()):
+                self.bytes_usados -= self._entradas.pop(chave).nbytes
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self._por_variavel.clear()
+            self.bytes_usados = 0
+
+    def __len__(self):
+        return len(self._entradas)
@@ -0,0 +1,95 @@
+from lark import Token
+from lark.exceptions import UnexpectedEOF, UnexpectedInput, UnexpectedToken
+
+ABERTURAS = '{[('
+FECHAMENTOS = '}])'
+
+
+def _saldo(linha):
+    """Delimitadores abertos menos fechados na linha, ignorando comentários e textos."""
+    if '"' not in linha and '//' not in linha:
+        return sum(map(linha.count, ABERTURAS)) - sum(map(linha.count, FECHAMENTOS))
+    saldo = 0
+    em_texto = False
+    for i, c in enumerate(linha):
+        if c == '"':
+            em_texto = not em_texto
+        elif em_texto:
+            continue
+        elif c == '/' and linha.startswith('//', i):
+            break
+        elif c in ABERTURAS:
+            saldo += 1
+        elif c in FECHAMENTOS:
+            saldo -= 1
+    return saldo
+
+
+def _fim_inesperado(erro):
+    # O LALR indica a entrada incompleta com o token '$END'; o Earley, com UnexpectedEOF
+    return isinstance(erro, UnexpectedEOF) or (isinstance(erro, UnexpectedToken) and erro.token.type == '$END')
+
+
+def _analisar(analisar, trecho, desvio):
+    """Analisa um trecho e corrige as linhas (da árvore ou do erro) para as do arquivo."""
+    try:
+        arvore = analisar(trecho)
+    except UnexpectedInput as e:
+        if desvio and isinstance(e.line, int) and e.line > 0:
+            e.line += desvio
+            if isinstance(getattr(e, 'token', None), Token) and isinstance(e.token.line, int):
+                e.token.line += desvio
+        raise
+    if desvio:
+        for token in arvore.scan_values(lambda v: isinstance(v, Token)):
+            token.line += desvio
+            if token.end_line is not None:
+                token.end_line += desvio
+    return arvore
+
+
+def instrucoes_em_fluxo(linhas, analisar):
+    """
+    Divide um código PRO-SIS lido linha a linha em instruções já analisadas.
+
+    As linhas são acumuladas até que todos os delimitadores ('{', '[', '(') estejam
+    fechados e o trecho forme instruções completas; então o trecho é analisado e cada
+    instrução é entregue, com as linhas numeradas como no arquivo. Apenas a instrução
+    em andamento fica em memória, e um erro de sintaxe é reportado assim que a
+    instrução com o erro termina, sem ler o resto da entrada.
+
+    Args:
+        linhas (iterable): Linhas do código fonte (um arquivo aberto, sys.stdin, ...)
+        analisar (callable): Parser que recebe um trecho e retorna a árvore 'programa'
+
+    Yields:
+        Tree: Árvore de cada instrução ('declaracao' ou 'comando'), na ordem do código
+
+    Raises:
+        UnexpectedInput: Se houver erro de sintaxe (ou o código terminar no meio de uma instrução)
+    """
+    pendentes = []
+    saldo = 0
+    linha_inicial = 1
+    for numero, linha in enumerate(linhas, 1):
+        if not pendentes:
+            if not linha.strip() or linha.lstrip().startswith('//'):
+                continue
+            linha_inicial = numero
+        pendentes.append(linha)
+        saldo += _saldo(linha)
+        if saldo > 0:
+            continue
+        try:
+            arvore = _analisar(analisar, ''.join(pendentes), linha_inicial - 1)
+        except UnexpectedInput as e:
+            if saldo == 0 and _fim_inesperado(e):
+                continue
+            raise
+        pendentes = []
+        saldo = 0
+        yield from arvore.children
+        del arvore
+
+    if pendentes:
+        yield from _analisar(analisar, ''.join(pendentes), linha_inicial - 1).children
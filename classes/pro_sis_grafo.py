@@ -0,0 +1,204 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def leituras(instrucao):
+    """
+    Variáveis lidas por uma instrução do ProgramaIR.
+
+    Args:
+        instrucao (tuple): Instrução 'declarar' ou 'comando'
+
+    Returns:
+        tuple: Nomes das variáveis, na ordem em que aparecem
+    """
+    if instrucao[0] == 'comando':
+        return (instrucao[3],) if instrucao[3] is not None else ()
+    expressao = instrucao[4]
+    if expressao[0] == 'ref':
+        return (expressao[1],)
+    if expressao[0] == 'chamada':
+        return (expressao[2],) + tuple(expressao[3])
+    return ()
+
+
+def dependencias(programa):
+    """
+    Monta o grafo de dependências entre as instruções de um programa.
+
+    Cada leitura é ligada à declaração mais recente da variável antes da instrução
+    (uma variável redeclarada gera uma nova definição, como em SSA).
+
+    Args:
+        programa (ProgramaIR): Programa compilado
+
+    Returns:
+        list: Para cada instrução, uma tupla de pares (nome, índice da declaração lida),
+              com índice None quando a variável não é declarada antes no programa
+    """
+    definicao = {}
+    grafo = []
+    for i, instrucao in enumerate(programa.instrucoes):
+        grafo.append(tuple((nome, definicao.get(nome)) for nome in leituras(instrucao)))
+        if instrucao[0] == 'declarar':
+            definicao[instrucao[3]] = i
+    return grafo
+
+
+def chave_conteudo(*partes):
+    """
+    Hash de conteúdo das partes (strings, números, arrays, None ou tuplas delas).
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    h = hashlib.sha256()
+    _atualizar(h, partes)
+    return h.hexdigest()
+
+
+def _atualizar(h, parte):
+    if isinstance(parte, np.ndarray):
+        h.update(f"<array {parte.dtype.str} {parte.shape}>".encode('utf-8'))
+        h.update(np.ascontiguousarray(parte).data)
+    elif isinstance(parte, (tuple, list)):
+        h.update(b"(")
+        for p in parte:
+            _atualizar(h, p)
+            h.update(b",")
+        h.update(b")")
+    else:
+        h.update(f"{type(parte).__name__}:{parte!r};".encode('utf-8'))
+
+
+def tamanho_valor(valor):
+    """Memória ocupada por um valor do interpretador, em bytes."""
+    if sp.issparse(valor):
+        csr = valor.tocsr()
+        return csr.data.nbytes + csr.indices.nbytes + csr.indptr.nbytes
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    return 8
+
+
+class MemoIncremental:
+    """
+    Memoização de declarações e comandos pelo hash de conteúdo de suas entradas.
+
+    A chave de uma instrução combina seu próprio conteúdo (função, literais, arquivo
+    carregado, opções do solver) com as chaves das declarações que ela lê, seguindo o
+    grafo de dependências. Editar uma linha muda a chave dela e de tudo que depende
+    dela; as demais instruções são atendidas pela memoização sem recálculo.
+
+    A memoização sobrevive ao interpretador (ProSisCompiler.reiniciar) e, com um
+    diretório, também a execuções separadas do programa.
+
+    Attributes:
+        limite_bytes (int): Memória máxima dos valores mantidos (LRU)
+        diretorio (str): Diretório dos valores persistidos ('<chave>.npz'), ou None
+        bytes_usados (int): Memória ocupada pelos valores em memória
+    """
+
+    def __init__(self, limite_bytes=512 * 1024 ** 2, diretorio=None):
+        self.limite_bytes = limite_bytes
+        self.diretorio = diretorio
+        self.bytes_usados = 0
+        self._entradas = OrderedDict()
+        if diretorio is not None:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave[:32]}.npz")
+
+    def obter(self, chave):
+        """
+        Retorna a entrada (tipo, valor) memoizada para a chave, ou None.
+
+        'tipo' é o tipo declarado ('int', 'float', 'eq', 'sis') ou None para comandos.
+        """
+        entrada = self._entradas.get(chave)
+        if entrada is not None:
+            self._entradas.move_to_end(chave)
+            return entrada
+        if self.diretorio is None or not os.path.isfile(self._caminho(chave)):
+            return None
+        try:
+            entrada = _carregar_entrada(self._caminho(chave))
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # Arquivo truncado ou corrompido: tratado como ausente (a instrução é recalculada)
+            return None
+        self._inserir(chave, entrada)
+        return entrada
+
+    def guardar(self, chave, tipo, valor):
+        """Memoiza o valor de uma declaração (com seu tipo) ou de um comando (tipo None)."""
+        entrada = (tipo, valor)
+        self._inserir(chave, entrada)
+        if self.diretorio is not None:
+            _salvar_entrada(self._caminho(chave), entrada)
+
+    def _inserir(self, chave, entrada):
+        tamanho = tamanho_valor(entrada[1])
+        if tamanho > self.limite_bytes:
+            return
+        if chave in self._entradas:
+            self.bytes_usados -= tamanho_valor(self._entradas.pop(chave)[1])
+        self._entradas[chave] = entrada
+        self.bytes_usados += tamanho
+        while self.bytes_usados > self.limite_bytes:
+            _, descartada = self._entradas.popitem(last=False)
+            self.bytes_usados -= tamanho_valor(descartada[1])
+
+    def valores(self):
+        """Valores mantidos em memória (ver GerenciadorMemoria)."""
+        return [valor for _, valor in self._entradas.values()]
+
+    def limpar(self):
+        self._entradas.clear()
+        self.bytes_usados = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+def _salvar_entrada(caminho, entrada):
+    tipo, valor = entrada
+    conteudo = {'tipo': np.array(tipo or '')}
+    if sp.issparse(valor):
+        csr = sp.csr_matrix(valor)
+        conteudo.update(formato=np.array('csr'), data=csr.data, indices=csr.indices, indptr=csr.indptr,
+                        forma=np.array(csr.shape))
+    elif isinstance(valor, np.ndarray):
+        conteudo.update(formato=np.array('denso'), valor=valor)
+    else:
+        conteudo.update(formato=np.array(type(valor).__name__), valor=np.array(valor))
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'wb') as f:
+            np.savez(f, **conteudo)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def _carregar_entrada(caminho):
+    with np.load(caminho, allow_pickle=False) as dados:
+        tipo = str(dados['tipo']) or None
+        formato = str(dados['formato'])
+        if formato == 'csr':
+            valor = sp.csr_matrix((dados['data'], dados['indices'], dados['indptr']), shape=tuple(dados['forma']))
+        elif formato == 'denso':
+            valor = dados['valor']
+        elif formato == 'int':
+            valor = int(dados['valor'])
+        else:
+            valor = np.float64(dados['valor']) if formato == 'float64' else float(dados['valor'])
+    return tipo, valor
@@ -1,9 +1,29 @@
 import argparse
+import contextlib
+import hashlib
 import os
+import sys
 import numpy as np
-from scipy.linalg import lu
+import scipy.sparse as sp
 from lark import Lark, Transformer, v_args, Token, Tree
 
+from pro_sis_adiado import Adiado, tipo_resultado
+from pro_sis_carga import carregar_matriz
+from pro_sis_esparso import (SOLVERS_ITERATIVOS, converter_se_esparsa, matriz_diagonal, montar_esparsa,
+                             resolver_iterativo, termos_independentes)
+from pro_sis_estrutura import FATORACAO_POR_ESTRUTURA, descrever, detectar_estrutura
+from pro_sis_fatoracao import CacheFatoracoes
+from pro_sis_fluxo import instrucoes_em_fluxo
+from pro_sis_grafo import MemoIncremental, chave_conteudo, dependencias
+from pro_sis_ir import CacheIR, compilar_arvore
+from pro_sis_literais import (converter_carga, converter_equacao, converter_numero, converter_triplas, empilhar_equacoes,
+                              expandir_arvore, expandir_tokens)
+from pro_sis_memoria import MATRIZES_POR_FUNCAO, GerenciadorMemoria, converter_tamanho
+from pro_sis_paralelo import EscalonadorParalelo, limitar_threads_blas, threads_blas_padrao
+from pro_sis_perfil import Perfilador
+from pro_sis_resultados import Resultado, criar_saida
+from pro_sis_simbolos import Simbolo, tipo_do_valor, verificar_programa
+
 class ProSisLexer:
     """
     Responsável por executar a análise lexical e imprimir a sequência de tokens
@@ -12,21 +32,26 @@ class ProSisLexer:
     def __init__(self, lark_parser):
         self.parser = lark_parser
 
-    def lex_and_print(self, code, caminho_saida_txt="analise_lexica.txt"):
+    def lex_and_print(self, code, caminho_saida_txt="analise_lexica.txt", tokens=None):
         """
         Executa a análise lexical, imprime os tokens e salva em um arquivo.txt.
         O caminho de saída pode ser especificado (usado para refletir o nome do arquivo de entrada).
+
+        Se 'tokens' for informado (tokens já consumidos pelo parser), eles são usados
+        diretamente e o código não é tokenizado uma segunda vez. As linhas numéricas
+        reconhecidas inteiras (TK_LINHA_NUMERICA) são listadas token a token.
         """
         linhas_saida = []
         header = "------- Análise Léxica (Tokens Reconhecidos) --------"
         footer = "---------------------------------------------------\n"
-        
+
         print(header)
         linhas_saida.append(header)
 
         try:
-            tokens = list(self.parser.lex(code))
-            for token in tokens:
+            if tokens is None:
+                tokens = list(self.parser.lex(code))
+            for token in expandir_tokens(tokens):
                 linha = f"Linha: {token.line}, Coluna: {token.column}, Código: {token.type}, Lexema: {repr(token.value)}"
                 print(linha)
                 linhas_saida.append(linha)
@@ -38,8 +63,7 @@ class ProSisLexer:
             linhas_saida.append(erro_msg)
 
         with open(caminho_saida_txt, "w", encoding="utf-8") as f:
-            for linha in linhas_saida:
-                f.write(linha + "\n")
+            f.write("\n".join(linhas_saida) + "\n")
 
 
 
@@ -49,17 +73,179 @@ class ProSisInterpreter(Transformer):
     Interpretador completo e funcional.
     Diferencia 'sis' (matriz 2D) de 'eq' (vetor 1D) nos retornos de função.
     """
+
+    # Os tokens chegam intactos às regras; não há callbacks por terminal, o que
+    # evita uma chamada (ou AttributeError) por número em sistemas grandes.
+    __visit_tokens__ = False
+
+    # Comandos que operam sobre uma matriz quadrada, com a descrição usada nos erros
+    OPERACOES_QUADRADAS = {
+        'det': "calcular determinante",
+        'inv': "calcular a inversa",
+        'retP': "decomposição LU",
+        'retL': "decomposição LU",
+        'retU': "decomposição LU",
+        'retD': "extrair diagonal",
+    }
+
+    # Declarações cujo cálculo vale a pena memoizar no modo incremental; literais e
+    # cópias de variáveis são baratos de refazer
+    EXPRESSOES_MEMOIZAVEIS = ('chamada', 'carga')
+
+    # Padrões resolvidos no modo preguiçoso sem calcular a chamada adiada:
+    # (função que consome o valor, função adiada) -> descrição exibida no log
+    FUSOES = {
+        ('det', 'inv'): "det(inv(A)) = 1 / det(A)",
+        ('inv', 'inv'): "inv(inv(A)) = A",
+        ('solve', 'inv'): "solve(inv(A), b) = A b",
+        ('det', 'trans'): "det(trans(A)) = det(A)",
+        ('inv', 'trans'): "inv(trans(A)) = trans(inv(A)), com a LU de A",
+        ('solve', 'trans'): "solve(trans(A), b) com a LU de A",
+    }
     
-    def __init__(self):
+    def __init__(self, limite_cache_fatoracoes=256 * 1024 ** 2, solver='direto', tolerancia=1e-8,
+                 limiar_esparsidade=0.05, tamanho_minimo_esparso=10_000, saida_resultados=None,
+                 guardar_resultados=True, verboso=True, perfilador=None, memo=None,
+                 preguicoso=False, threads=1, threads_blas=None, precisao='float64', limite_memoria=None,
+                 diretorio_despejo=None):
         """
         Inicializa o interpretador PRO-SIS.
         
+        Args:
+            limite_cache_fatoracoes (int): Memória máxima (em bytes) do cache de fatorações
+            solver (str): Método usado por 'solve': 'direto' (LU), 'cg' ou 'gmres'
+            tolerancia (float): Tolerância relativa dos métodos iterativos
+            limiar_esparsidade (float): Densidade máxima para um 'sis' literal ser
+                        armazenado como matriz esparsa (None desativa a conversão)
+            tamanho_minimo_esparso (int): Número mínimo de elementos para a conversão
+            saida_resultados: Destino dos resultados dos comandos (ver criar_saida): None
+                        imprime como texto; 'nula', '<arquivo>.jsonl', '<arquivo>.npz',
+                        um diretório (um .npy por resultado) ou um objeto de saída
+            guardar_resultados (bool): Se True, mantém os resultados em 'resultados'
+            verboso (bool): Se False, não imprime as mensagens de acompanhamento
+                        (declarações, chamadas de função, cabeçalhos dos comandos)
+            perfilador (Perfilador): Se informado, mede cada declaração, carga,
+                        chamada de função e comando, com a linha no código fonte
+            memo (MemoIncremental): Se informado, 'executar_ir' reaproveita declarações
+                        calculadas (chamadas de função e 'load') e comandos cujas entradas
+                        não mudaram desde uma execução anterior
+            preguicoso (bool): Se True, chamadas de função em declarações são adiadas até
+                        que um comando ou outra chamada use o valor (ver 'adiar_funcao');
+                        declarações nunca usadas não são calculadas, e os padrões de
+                        FUSOES são resolvidos sem calcular a chamada adiada
+            threads (int): Com mais de uma thread, 'executar_ir' executa ao mesmo tempo as
+                        instruções sem dependência de dados entre si (ver pro_sis_paralelo)
+            threads_blas (int): Limite de threads do BLAS durante cada execução (None mantém
+                        o padrão da biblioteca, ou divide os núcleos entre as 'threads')
+            precisao (str): 'float64' (padrão) ou 'float32', que guarda sistemas, equações e
+                        resultados com metade da memória (e fatora com LAPACK em precisão
+                        simples); arquivos mapeados em memória por 'load' não são convertidos
+            limite_memoria (int or str): Memória máxima do workspace, em bytes ou como '2G';
+                        ao ser excedida, fatorações em cache são descartadas e valores grandes
+                        despejados em disco (ver GerenciadorMemoria). None apenas contabiliza
+            diretorio_despejo (str): Onde gravar os valores despejados (None: diretório temporário)
+
         Attributes:
             vars (dict): Dicionário que armazena as variáveis declaradas no programa,
                         com seus tipos e valores.
+            fatoracoes (CacheFatoracoes): Fatorações LU reaproveitadas entre as funções
+                        que operam sobre a mesma variável.
+            diretorio_base (str): Diretório usado para resolver caminhos relativos em 'load'
+                        (normalmente o diretório do arquivo .psis).
+            resultados (list): Resultado de cada comando executado, com o valor como
+                        np.ndarray, matriz esparsa ou float.
+            chaves_vars (dict): Hash de conteúdo do valor atual de cada variável (modo incremental).
+            reaproveitadas (int): Instruções atendidas pela memoização nesta execução.
+            chamadas_adiadas (int): Chamadas de função adiadas (modo preguiçoso).
+            chamadas_calculadas (int): Chamadas adiadas que precisaram ser calculadas.
+            fusoes (int): Usos de chamadas adiadas resolvidos por um padrão de FUSOES.
+            relatorio_escalonador (RelatorioEscalonador): O que rodou em paralelo na última
+                        execução com 'threads' > 1 (None nas demais).
+            memoria (GerenciadorMemoria): Contabilidade e limite de memória do workspace
+                        (ver 'memoria_workspace').
         """
+        if solver != 'direto' and solver not in SOLVERS_ITERATIVOS:
+            raise Exception(f"Erro: Solver '{solver}' inválido. Opções: direto, {', '.join(SOLVERS_ITERATIVOS)}.")
+        if precisao not in ('float64', 'float32'):
+            raise Exception(f"Erro: Precisão '{precisao}' inválida. Opções: float64, float32.")
+        if isinstance(limite_memoria, str):
+            limite_memoria = converter_tamanho(limite_memoria)
         self.vars = {}
-        print("Interpretador (versão final e funcional) iniciado.")
+        self.diretorio_base = None
+        self.fatoracoes = CacheFatoracoes(limite_cache_fatoracoes)
+        self.solver = solver
+        self.tolerancia = tolerancia
+        self.limiar_esparsidade = limiar_esparsidade
+        self.tamanho_minimo_esparso = tamanho_minimo_esparso
+        self.saida_resultados = criar_saida(saida_resultados)
+        self.guardar_resultados = guardar_resultados
+        self.verboso = verboso
+        self.perfilador = perfilador
+        self.memo = memo
+        self.chaves_vars = {}
+        self.reaproveitadas = 0
+        self.preguicoso = preguicoso
+        self.chamadas_adiadas = 0
+        self.chamadas_calculadas = 0
+        self.fusoes = 0
+        self.threads = threads
+        self.threads_blas = threads_blas if threads_blas is not None or threads <= 1 else threads_blas_padrao(threads)
+        self.relatorio_escalonador = None
+        self._mensagens = None
+        self.dtype = np.dtype(precisao)
+        self.memoria = GerenciadorMemoria(limite_memoria, diretorio_despejo)
+        self.resultados = []
+        self.comandos_executados = 0
+        self._log("Interpretador (versão final e funcional) iniciado.")
+
+    def _log(self, mensagem):
+        if not self.verboso:
+            return
+        if self._mensagens is not None:
+            # Instrução executada em uma thread: as mensagens são exibidas na ordem do programa
+            self._mensagens.append(mensagem)
+        else:
+            print(mensagem)
+
+    def memoria_workspace(self):
+        """
+        Memória ocupada pelo workspace (variáveis, resultados, memoização e fatorações).
+
+        Returns:
+            dict: Ver GerenciadorMemoria.relatorio (valores em bytes)
+        """
+        return self.memoria.relatorio(self)
+
+    def _verificar_memoria(self, valor=None):
+        """Registra o valor que entrou no workspace e aplica o limite de memória, se houver."""
+        if self.memoria.limite_bytes is not None:
+            self.memoria.registrar(valor)
+            self.memoria.aplicar_limite(self)
+
+    def _reservar_memoria(self, nome_funcao, matriz, nome_var):
+        """Garante, antes do cálculo, espaço no limite para as matrizes densas que a função cria."""
+        if self.memoria.limite_bytes is None or sp.issparse(matriz):
+            return
+        n = matriz.shape[0]
+        necessario = MATRIZES_POR_FUNCAO.get(nome_funcao, 1) * n * n * matriz.dtype.itemsize
+        self.memoria.aplicar_limite(self, necessario, f"'{nome_funcao}({nome_var})'")
+
+    def _ajustar_precisao(self, valor):
+        # Arquivos mapeados em memória ficam como estão: convertê-los os traria para a RAM
+        if self.dtype == np.float64 or isinstance(valor, np.memmap):
+            return valor
+        if (sp.issparse(valor) or isinstance(valor, np.ndarray)) and valor.dtype == np.float64:
+            return valor.astype(self.dtype)
+        return valor
+
+    def limite_blas(self):
+        """Contexto que aplica 'threads_blas' às chamadas do BLAS (ver limitar_threads_blas)."""
+        return limitar_threads_blas(self.threads_blas)
+
+    def _medir(self, categoria, nome, linha=None):
+        if self.perfilador is None:
+            return contextlib.nullcontext()
+        return self.perfilador.medir(nome, categoria, linha)
         
     def programa(self, *args):
         """
@@ -68,8 +254,19 @@ class ProSisInterpreter(Transformer):
         
         Args:
             *args: Argumentos variados vindos da árvore sintática.
+
+        Returns:
+            list: Resultados (Resultado) dos comandos executados
         """
-        print("\nPrograma executado com sucesso!")
+        if self.memoria.limite_bytes is not None:
+            uso = self.memoria_workspace()
+            self._log(f"\n-> Memória do workspace: {uso['total'] / 1024 ** 2:.1f} MiB de "
+                      f"{self.memoria.limite_bytes / 1024 ** 2:.1f} MiB ({uso['despejada'] / 1024 ** 2:.1f} MiB despejados em disco).")
+        if self.preguicoso:
+            self._log(f"\n-> Avaliação preguiçosa: {self.chamadas_adiadas} chamada(s) adiada(s), "
+                      f"{self.chamadas_calculadas} calculada(s), {self.fusoes} fusão(ões).")
+        self._log("\nPrograma executado com sucesso!")
+        return self.resultados
         
     @v_args(inline=True)
     def declaracao(self, tipo_token, nome_var_token, operador_token, valor):
@@ -91,45 +288,80 @@ class ProSisInterpreter(Transformer):
         tipo_declarado = tipo_token.children[0].value
         nome_var = nome_var_token.value
 
-        if isinstance(valor, Token):
-            if valor.type == 'TK_NUMERO':
-                valor = float(valor.value)
-                valor = int(valor) if valor.is_integer() else valor
-            elif valor.type == 'ID':
-                nome_var_existente = valor.value
-                if nome_var_existente not in self.vars:
-                    raise Exception(f"Erro Semântico: A variável '{nome_var_existente}' usada na atribuição não foi definida.")
-                valor = self.vars[nome_var_existente]['valor']
-
-        valor_final = valor
-
-        tipo_do_valor = None
-        if isinstance(valor_final, np.ndarray):
-            if valor_final.ndim == 2:
-                tipo_do_valor = 'sis'
-            elif valor_final.ndim == 1:
-                tipo_do_valor = 'eq'
-        elif isinstance(valor_final, list):
-            tipo_do_valor = 'eq'
-        elif isinstance(valor_final, float):
-            tipo_do_valor = 'float'
-        elif isinstance(valor_final, int):
-            tipo_do_valor = 'int'
-
-        if tipo_do_valor is None:
-            raise Exception(f"Erro Interno: Tipo de valor desconhecido para '{valor_final}' (tipo real: {type(valor_final)}).")
-
-        if tipo_declarado == 'int' and tipo_do_valor == 'float':
-            if not valor_final.is_integer():
-                raise Exception(f"Erro Semântico: Impossível atribuir o float com casas decimais '{valor_final}' a uma variável do tipo 'int'.")
-            valor_final = int(valor_final)
-            tipo_do_valor = 'int'
-
-        if tipo_declarado != tipo_do_valor:
-            raise Exception(f"Erro Semântico: Impossível atribuir um valor do tipo '{tipo_do_valor}' a uma variável do tipo '{tipo_declarado}'.")
-
-        self.vars[nome_var] = {'tipo': tipo_declarado, 'valor': valor_final}
-        print(f"-> Variável '{nome_var}' (tipo: {tipo_declarado}) declarada e inicializada.")
+        with self._medir('declaracao', nome_var, nome_var_token.line):
+            if isinstance(valor, Token):
+                if valor.type == 'TK_NUMERO':
+                    valor = converter_numero(valor)
+                elif valor.type == 'ID':
+                    valor = self.valor_de(valor.value)
+            self.declarar(tipo_declarado, nome_var, valor)
+
+    def valor_de(self, nome_var_existente):
+        """
+        Retorna o valor de uma variável usada do lado direito de uma atribuição.
+
+        Uma chamada adiada não é calculada: a nova variável compartilha o mesmo Adiado.
+
+        Raises:
+            Exception: Se a variável não foi definida
+        """
+        if nome_var_existente not in self.vars:
+            raise Exception(f"Erro Semântico: A variável '{nome_var_existente}' usada na atribuição não foi definida.")
+        return self.vars[nome_var_existente].valor
+
+    def declarar(self, tipo_declarado, nome_var, valor, verificada=False):
+        """
+        Verifica o tipo de 'valor' e o atribui à variável (ver 'declaracao').
+
+        Args:
+            tipo_declarado (str): Tipo da declaração (int, float, eq, sis)
+            nome_var (str): Nome da variável
+            valor: Valor já avaliado (número, np.ndarray ou matriz esparsa)
+            verificada (bool): Se True, o tipo já foi verificado pela análise estática
+                        (ver pro_sis_simbolos.verificar_programa) e não é verificado de novo
+
+        Raises:
+            Exception: Se houver incompatibilidade de tipos
+        """
+        valor_final = self._ajustar_precisao(valor)
+        if not verificada:
+            valor_final = self._verificar_tipo(tipo_declarado, valor_final)
+
+        # Valores são imutáveis: 'sis B = A' compartilha o array de A, e quem precisar
+        # alterar um valor deve copiá-lo antes (cópia na escrita)
+        self.vars[nome_var] = Simbolo(tipo_declarado, _somente_leitura(valor_final))
+        self.fatoracoes.invalidar(nome_var)
+        self._log(f"-> Variável '{nome_var}' (tipo: {tipo_declarado}) declarada e inicializada.")
+        self._verificar_memoria(self.vars[nome_var].valor)
+
+    def _verificar_tipo(self, tipo_declarado, valor):
+        """
+        Verifica se o valor pode ser atribuído a uma variável do tipo declarado.
+
+        Returns:
+            O valor a atribuir (um float inteiro convertido para 'int', uma chamada adiada
+            calculada quando o tipo depende do valor)
+
+        Raises:
+            Exception: Se houver incompatibilidade de tipos
+        """
+        if isinstance(valor, Adiado) and valor.tipo != tipo_declarado:
+            # Conversões (ex.: float inteiro para 'int') e erros de tipo dependem do valor
+            valor = self._forcar(valor)
+        tipo_valor = valor.tipo if isinstance(valor, Adiado) else tipo_do_valor(valor)
+
+        if tipo_valor is None:
+            raise Exception(f"Erro Interno: Tipo de valor desconhecido para '{valor}' (tipo real: {type(valor)}).")
+
+        if tipo_declarado == 'int' and tipo_valor == 'float':
+            if not valor.is_integer():
+                raise Exception(f"Erro Semântico: Impossível atribuir o float com casas decimais '{valor}' a uma variável do tipo 'int'.")
+            valor = int(valor)
+            tipo_valor = 'int'
+
+        if tipo_declarado != tipo_valor:
+            raise Exception(f"Erro Semântico: Impossível atribuir um valor do tipo '{tipo_valor}' a uma variável do tipo '{tipo_declarado}'.")
+        return valor
 
     def valor(self, v):
         """
@@ -147,55 +379,93 @@ class ProSisInterpreter(Transformer):
         """
         Processa uma lista de equações e cria uma matriz, usando numpy, que representa um sistema.
         
-        Filtra apenas os elementos que são listas (equações válidas) e converte
-        para uma matriz NumPy bidimensional.
+        Filtra apenas as equações (vetores float64) e copia cada uma diretamente
+        para uma matriz pré-alocada, sem passar por listas de objetos Python.
+        Matrizes grandes com poucos elementos não nulos são convertidas para o
+        formato esparso (ver 'limiar_esparsidade').
         
         Args:
-            equacoes (list): Lista contendo equações (listas de números)
+            equacoes (list): Lista contendo equações (vetores de números)
             
         Returns:
-            np.ndarray: Matriz representando o sistema de equações
+            np.ndarray or sp.csr_matrix: Matriz representando o sistema de equações
             
         Raises:
             Exception: Se as equações não tiverem o mesmo número de elementos
         """
+        return self.armazenar_sistema(empilhar_equacoes(equacoes))
+
+    def armazenar_sistema(self, matriz):
+        """Formato em que um 'sis' literal é guardado: a matriz densa ou, se for esparsa o bastante, CSR."""
+        return converter_se_esparsa(matriz, self.limiar_esparsidade, self.tamanho_minimo_esparso)
+
+    def sistema_esparso(self, itens):
+        """
+        Cria uma matriz esparsa a partir da forma 'sparse(m, n) {(i, j, v), ...}'.
+        
+        Os índices começam em 0 e as posições não listadas valem zero.
         
-        #print(f"[DEBUG] Equações recebidas no sistema: {equacoes}")
+        Args:
+            itens (list): Tokens com as dimensões e as triplas (TK_TRIPLA)
+            
+        Returns:
+            sp.csr_matrix: Matriz esparsa m x n
+            
+        Raises:
+            Exception: Se as dimensões não forem inteiros positivos ou algum índice estiver fora delas
+        """
+        return montar_esparsa(*converter_triplas(itens))
 
-        equacoes_filtradas = [n for n in equacoes if isinstance(n, list)]
+    def carga(self, itens):
+        """
+        Carrega uma matriz de arquivo externo sem passar pelo parser.
         
-        #print(f"[DEBUG] Equações filtradas no sistema: {equacoes_filtradas}")
+        Arquivos .npy e binários crus são mapeados em memória (somente leitura), de modo
+        que a variável aponta diretamente para os dados em disco; arquivos de texto são
+        lidos em blocos. Caminhos relativos partem do diretório do programa .psis.
         
+        Args:
+            itens (list): Tokens da chamada (TK_TEXTO com o caminho e, opcionalmente, as dimensões)
+            
+        Returns:
+            np.ndarray or sp.csr_matrix: Dados carregados
+        """
+        token_caminho, caminho, forma = converter_carga(itens)
+        return self.carregar(caminho, forma, token_caminho.line)
 
-        try:
-            matriz = np.array(equacoes_filtradas, dtype=float)
-            return matriz
-        except ValueError as e:
-            #print(f"[DEBUG] Erro de conversão: {e}")
-            raise Exception("Erro Sintático: Todas as linhas em um sistema devem ter o mesmo número de elementos.")
+    def carregar(self, caminho, forma=None, linha=None):
+        """
+        Carrega 'caminho' (relativo ao diretório do programa) com carregar_matriz (ver 'carga').
+
+        Args:
+            caminho (str): Caminho do arquivo, como escrito no código
+            forma (tuple): Dimensões declaradas, se houver
+            linha (int): Linha da chamada no código fonte
+
+        Returns:
+            np.ndarray or sp.csr_matrix: Dados carregados
+        """
+        if self.diretorio_base and not os.path.isabs(caminho):
+            caminho = os.path.join(self.diretorio_base, caminho)
+        self._log(f"-> Carregando dados de '{caminho}'")
+        with self._medir('carga', os.path.basename(caminho), linha):
+            return carregar_matriz(caminho, forma)
 
-    
     def equacao(self, numeros):
         """
-        Processa uma lista de tokens numéricos e os converte para uma lista de números.
+        Processa os tokens de uma equação e os converte para um vetor float64.
         
-        Filtra tokens do tipo TK_NUMERO e os converte para int ou float conforme apropriado.
+        Uma linha numérica reconhecida inteira pelo lexer (TK_LINHA_NUMERICA) é lida
+        de uma vez por np.fromstring; a forma token a token converte todos os
+        TK_NUMERO em uma única chamada ao numpy.
         
         Args:
-            numeros (list): Lista de tokens contendo números
+            numeros (list): Lista de tokens da equação
             
         Returns:
-            list: Lista de números convertidos (int ou float)
-        """
-        numeros_convertidos = []
-        for n in numeros:
-            if isinstance(n, Token) and n.type == 'TK_NUMERO':
-                valor = float(n.value)
-                valor = int(valor) if valor.is_integer() else valor
-                #print(f"[DEBUG] Convertendo token '{n.value}' para valor: {valor}")
-                
-                numeros_convertidos.append(valor)
-        return numeros_convertidos
+            np.ndarray: Vetor com os números da equação
+        """
+        return converter_equacao(numeros)
 
 
     @v_args(inline=True)
@@ -209,21 +479,23 @@ class ProSisInterpreter(Transformer):
         Returns:
             int or float: Valor convertido (int se for inteiro, float caso contrário)
         """
-        s = token.value
-        val = float(s)
-        return int(val) if val.is_integer() else val
+        return converter_numero(token)
     
     @v_args(inline=True)
-    def funcao_chamada(self, func_token, nome_var_token):
+    def funcao_chamada(self, func_token, nome_var_token, *args_extras):
         """
         Executa uma chamada de função matemática sobre uma matriz/sistema.
         
         Suporta funções: inv (inversa), trans (transposta), retP/retL/retU (decomposição LU),
         retD (diagonal), det (determinante), solve (resolução do sistema).
+
+        'solve' aceita termos independentes extras: 'solve(A, b1, b2, ...)' resolve A
+        contra cada 'eq' (ou cada coluna de um 'sis') com uma única fatoração.
         
         Args:
-            func_token: Token contendo o nome da função
+            func_token: Token (ou árvore 'funcao_retorno') contendo o nome da função
             nome_var_token: Token contendo o nome da variável (deve ser tipo 'sis')
+            *args_extras: Tokens dos argumentos adicionais (apenas em 'solve')
             
         Returns:
             np.ndarray or float: Resultado da operação matemática
@@ -232,41 +504,190 @@ class ProSisInterpreter(Transformer):
             Exception: Se a variável não for do tipo 'sis', matriz não for quadrada
                       (quando necessário), ou ocorrer erro de álgebra linear
         """
+        if isinstance(func_token, Tree):
+            func_token = func_token.children[0]
         nome_funcao = func_token.value
         nome_var = nome_var_token.value
-        print(f"-> Resolvendo chamada de função: {nome_funcao}({nome_var})")
-        if nome_var not in self.vars or self.vars[nome_var]['tipo'] != 'sis':
-            raise Exception(f"Erro: A função '{nome_funcao}' requer uma variável do tipo 'sis', mas '{nome_var}' não é.")
-        matriz_aumentada = self.vars[nome_var]['valor']
+        nomes_termos = [t.value for t in args_extras if t.type == 'ID']
+        return self._chamada(nome_funcao, nome_var, nomes_termos, nome_var_token.line)
+
+    def _chamada(self, nome_funcao, nome_var, nomes_termos, linha, verificada=False):
+        if self.preguicoso:
+            return self.adiar_funcao(nome_funcao, nome_var, nomes_termos, linha, verificada)
+        with self._medir('funcao_chamada', nome_funcao, linha):
+            return self.chamar_funcao(nome_funcao, nome_var, nomes_termos, verificada)
+
+    def chamar_funcao(self, nome_funcao, nome_var, nomes_termos=(), verificada=False):
+        """
+        Calcula o valor de 'nome_funcao(nome_var, *nomes_termos)' (ver 'funcao_chamada').
+
+        Com 'verificada', os argumentos e a forma da matriz já foram verificados pela
+        análise estática e não são verificados de novo.
+
+        Returns:
+            np.ndarray or float: Resultado da operação matemática
+
+        Raises:
+            Exception: Se a chamada for inválida ou ocorrer erro de álgebra linear
+        """
+        self._anunciar_chamada("Resolvendo chamada de função", nome_funcao, nome_var, nomes_termos, verificada)
+        if nome_funcao == 'solve' and nomes_termos:
+            fundido = self._fundir('solve', nome_var, nomes_termos)
+            if fundido is not None:
+                return fundido
+        matriz_aumentada = self._valor(nome_var)
         A = matriz_aumentada[:, :-1]
-        b = matriz_aumentada[:, -1]
-        if A.shape[0] != A.shape[1] and nome_funcao not in ['trans', 'solve']:
+        if not verificada and A.shape[0] != A.shape[1] and nome_funcao not in ['trans', 'solve']:
              raise Exception(f"Erro: A matriz de coeficientes (A) não é quadrada para a função '{nome_funcao}'.")
+        self._reservar_memoria(nome_funcao, matriz_aumentada, nome_var)
         try:
-            if nome_funcao == 'inv': return np.linalg.inv(A)
             if nome_funcao == 'trans': return A.T
-            if nome_funcao in ['retP', 'retL', 'retU']:
-                P, L, U = lu(A)
-                if nome_funcao == 'retP': return P
-                if nome_funcao == 'retL': return L
-                if nome_funcao == 'retU': return U
-            if nome_funcao == 'retD': return np.diag(np.diag(A))
-            if nome_funcao == 'det': return np.linalg.det(A)
-            if nome_funcao == 'solve': return np.linalg.solve(A, b)
+            if nome_funcao == 'retD': return matriz_diagonal(A)
+            if nome_funcao == 'solve':
+                A, B = self._coeficientes_e_termos(matriz_aumentada, nomes_termos)
+                return self._resolver(nome_var, A, B)
+            if nome_funcao == 'inv': return self._fatoracao(nome_var, A).inversa()
+            if nome_funcao == 'retP': return self._lu(nome_var, A, natural=True).P()
+            if nome_funcao == 'retL': return self._lu(nome_var, A, natural=True).L()
+            if nome_funcao == 'retU': return self._lu(nome_var, A, natural=True).U()
+            if nome_funcao == 'det': return self._fatoracao(nome_var, A).det()
             raise Exception(f"Erro Semântico: A função '{nome_funcao}' não pode ser usada em uma atribuição pois não retorna um valor.")
         except np.linalg.LinAlgError:
             raise Exception(f"Erro de Álgebra Linear: A operação '{nome_funcao}' não pôde ser concluída (matriz singular?).")
 
+    def _anunciar_chamada(self, acao, nome_funcao, nome_var, nomes_termos, verificada=False):
+        """
+        Valida os argumentos de uma chamada de função (se ainda não 'verificada') e exibe
+        a mensagem de acompanhamento.
+
+        Raises:
+            Exception: Se houver termos extras fora de 'solve' ou a variável não for 'sis'
+        """
+        if nomes_termos and nome_funcao != 'solve' and not verificada:
+            raise Exception(f"Erro Semântico: A função '{nome_funcao}' aceita apenas um argumento.")
+        self._log(f"-> {acao}: {nome_funcao}({', '.join([nome_var, *nomes_termos])})")
+        if verificada:
+            return
+        simbolo = self.vars.get(nome_var)
+        if simbolo is None or simbolo.tipo != 'sis':
+            raise Exception(f"Erro: A função '{nome_funcao}' requer uma variável do tipo 'sis', mas '{nome_var}' não é.")
+
+    def adiar_funcao(self, nome_funcao, nome_var, nomes_termos=(), linha=None, verificada=False):
+        """
+        Modo preguiçoso: registra 'nome_funcao(nome_var, *nomes_termos)' sem calculá-la.
+
+        A chamada é calculada na primeira vez em que um comando ou outra chamada lê o
+        valor (ver '_valor'). Se o tipo do resultado depender do próprio cálculo
+        (ex.: 'solve' sobre outra chamada adiada), a função é calculada na hora.
+
+        Returns:
+            Adiado or valor: Chamada adiada (ou o resultado, se calculado na hora)
+
+        Raises:
+            Exception: Se a chamada for inválida (ver '_anunciar_chamada')
+        """
+        self._anunciar_chamada("Chamada de função adiada", nome_funcao, nome_var, nomes_termos, verificada)
+        tipos_termos = [self.vars[nome].tipo if nome in self.vars else None for nome in nomes_termos]
+        tipo = tipo_resultado(nome_funcao, self.vars[nome_var].valor, tipos_termos)
+        if tipo is None:
+            with self._medir('funcao_chamada', nome_funcao, linha):
+                return self.chamar_funcao(nome_funcao, nome_var, nomes_termos, verificada)
+        entradas = {nome: self.vars[nome] for nome in (nome_var, *nomes_termos)}
+        self.chamadas_adiadas += 1
+        return Adiado(nome_funcao, nome_var, nomes_termos, linha, tipo, entradas)
+
+    def _valor(self, nome_var):
+        """Valor de uma variável existente, calculando-o se for uma chamada adiada."""
+        simbolo = self.vars[nome_var]
+        if isinstance(simbolo.valor, Adiado):
+            simbolo.definir(self._forcar(simbolo.valor))
+        return simbolo.valor
+
+    def _forcar(self, adiado):
+        """
+        Calcula uma chamada adiada (uma única vez, mesmo que compartilhada por cópias).
+
+        Se alguma variável lida foi redeclarada depois da chamada, ela é calculada sobre
+        as entradas capturadas, com um cache de fatorações próprio (o cache é indexado
+        pelo nome da variável, que hoje se refere a outro valor).
+        """
+        if adiado.calculado:
+            return adiado.valor
+        atuais = all(self.vars.get(nome) is entrada for nome, entrada in adiado.entradas.items())
+        variaveis, fatoracoes = self.vars, self.fatoracoes
+        if not atuais:
+            self.vars = dict(adiado.entradas)
+            self.fatoracoes = CacheFatoracoes(fatoracoes.limite_bytes)
+        try:
+            with self._medir('funcao_chamada', adiado.funcao, adiado.linha):
+                adiado.valor = self.chamar_funcao(adiado.funcao, adiado.nome_var, adiado.nomes_termos)
+        finally:
+            self.vars, self.fatoracoes = variaveis, fatoracoes
+        adiado.calculado = True
+        adiado.entradas = None
+        if self.memoria.limite_bytes is not None:
+            self.memoria.registrar(adiado.valor)
+        self.chamadas_calculadas += 1
+        return adiado.valor
+
+    def _fundir(self, consumidor, nome_var, nomes_termos=()):
+        """
+        Resolve o uso de uma chamada adiada por um padrão de FUSOES, sem calculá-la.
+
+        Só se aplica quando a variável lida pela chamada adiada ainda tem o mesmo valor
+        e quando o cálculo direto não falharia (matriz quadrada e não singular): nos
+        demais casos a chamada é calculada normalmente, com as mesmas mensagens de erro.
+
+        Args:
+            consumidor (str): Função que usa o valor ('det', 'inv' ou 'solve')
+            nome_var (str): Variável que contém a chamada adiada
+            nomes_termos (list): Termos independentes de 'solve'
+
+        Returns:
+            Valor do uso fundido, ou None se nenhum padrão se aplicar
+        """
+        adiado = self.vars[nome_var].valor
+        if not isinstance(adiado, Adiado) or adiado.calculado:
+            return None
+        padrao = self.FUSOES.get((consumidor, adiado.funcao))
+        origem = adiado.nome_var
+        if padrao is None or self.vars.get(origem) is not adiado.entradas[origem]:
+            return None
+        if consumidor == 'solve' and adiado.funcao == 'trans' and self.solver != 'direto':
+            return None
+        A = self._valor(origem)[:, :-1]
+        if A.shape[0] != A.shape[1]:
+            return None
+        fatores = self._fatoracao(origem, A)
+        if fatores.singular():
+            return None
+
+        if consumidor == 'solve':
+            _, B = self._coeficientes_e_termos(A, nomes_termos)
+            valor = A @ B if adiado.funcao == 'inv' else fatores.resolver(B, transposta=True)
+        elif consumidor == 'det':
+            valor = 1.0 / fatores.det() if adiado.funcao == 'inv' else fatores.det()
+        elif adiado.funcao == 'inv':
+            valor = A.tocsr(copy=True) if sp.issparse(A) else np.array(A)
+        else:
+            inversa = fatores.inversa()
+            valor = inversa.T.tocsr() if sp.issparse(inversa) else inversa.T
+        self.fusoes += 1
+        self._log(f"-> Fusão: {padrao}")
+        return valor
+
     def comando(self, items):
         """
         Processa e executa um comando de função sobre uma variável.
         
-        Extrai o token da função e o nome da variável dos itens fornecidos,
-        valida se a variável existe e executa a função correspondente,
-        exibindo o resultado.
+        Extrai o token da função e o nome da variável dos itens fornecidos
+        e executa a função correspondente (ver executar_comando).
         
         Args:
             items (list): Lista contendo tokens e árvores sintáticas do comando
+
+        Returns:
+            Resultado: Resultado do comando
             
         Raises:
             Exception: Se o comando estiver mal formado ou a variável não existir
@@ -290,131 +711,367 @@ class ProSisInterpreter(Transformer):
         if not func_token or not id_token:
             raise Exception("Erro Sintático: Comando mal formado. Esperado: funcao_comando ID end_comando")
 
-        nome_funcao = func_token.value
-        nome_var_principal = id_token.value
+        with self._medir('comando', func_token.value, id_token.line):
+            return self.executar_comando(func_token.value, id_token.value, id_token.line)
+
+    def executar_comando(self, nome_funcao, nome_var_principal, linha=None, verificada=False):
+        """
+        Executa 'nome_funcao' sobre a variável e registra o resultado.
+        
+        O valor calculado é guardado em 'resultados' e entregue à saída de
+        resultados configurada (impressão, .npz, JSON por linha ou nenhuma).
+        
+        Args:
+            nome_funcao (str): Nome da função do comando
+            nome_var_principal (str): Nome da variável 'sis'
+            linha (int): Linha do comando no código fonte
+            verificada (bool): Se True, a variável já foi verificada pela análise estática
+            
+        Returns:
+            Resultado: Resultado registrado
+            
+        Raises:
+            Exception: Se a variável não existir, não for 'sis' ou a operação falhar
+        """
+        valor = self.calcular_comando(nome_funcao, nome_var_principal, verificada)
+        return self._registrar_resultado(nome_funcao, nome_var_principal, linha, valor)
 
-        if nome_var_principal not in self.vars:
+    def calcular_comando(self, nome_funcao, nome_var_principal, verificada=False):
+        """
+        Calcula o valor de um comando, sem registrá-lo (ver 'executar_comando').
+
+        Returns:
+            np.ndarray, matriz esparsa ou float: Valor do comando
+        """
+        if not verificada and nome_var_principal not in self.vars:
             raise Exception(f"Erro Semântico: A variável '{nome_var_principal}' não foi definida.")
 
-        print(f"\n-=-=- Executando '{nome_funcao}' no sistema '{nome_var_principal}' -=-=-")
+        self._log(f"\n-=-=- Executando '{nome_funcao}' no sistema '{nome_var_principal}' -=-=-")
         
-        if self.vars[nome_var_principal]['tipo'] != 'sis':
+        if not verificada and self.vars[nome_var_principal].tipo != 'sis':
             raise Exception(f"Erro: A função '{nome_funcao}' requer uma variável do tipo 'sis'.")
-        
-        matriz_aumentada = self.vars[nome_var_principal]['valor']
+
+        if nome_funcao in ('det', 'inv'):
+            fundido = self._fundir(nome_funcao, nome_var_principal)
+            if fundido is not None:
+                return fundido
+        matriz_aumentada = self._valor(nome_var_principal)
+        self._reservar_memoria(nome_funcao, matriz_aumentada, nome_var_principal)
         
         try:
             if nome_funcao == 'solve':
                 if matriz_aumentada.shape[1] < 2:
                     raise Exception("Erro: Matriz deve ter pelo menos 2 colunas para resolução de sistema.")
-                A = matriz_aumentada[:, :-1]  
-                b = matriz_aumentada[:, -1]  
-                if A.shape[0] != A.shape[1]:
-                    raise Exception("Erro: Para resolver o sistema, a matriz de coeficientes deve ser quadrada.")
-                solucao = np.linalg.solve(A, b)
-                print("Solução do sistema:")
-                print(solucao)
-                
-            elif nome_funcao == 'det':
-                if matriz_aumentada.shape[0] == matriz_aumentada.shape[1]:
-                    A = matriz_aumentada
-                else:
-                    A = matriz_aumentada[:, :-1]
-                    if A.shape[0] != A.shape[1]:
-                        raise Exception("Erro: Para calcular determinante, a matriz de coeficientes deve ser quadrada.")
-                determinante = np.linalg.det(A)
-                print(f"Determinante: {determinante}")
-                
-            elif nome_funcao == 'inv':
-                if matriz_aumentada.shape[0] == matriz_aumentada.shape[1]:
-                    A = matriz_aumentada
-                else:
-                    A = matriz_aumentada[:, :-1]
-                    if A.shape[0] != A.shape[1]:
-                        raise Exception("Erro: Para calcular a inversa, a matriz de coeficientes deve ser quadrada.")
-                inversa = np.linalg.inv(A)
-                print("Matriz inversa:")
-                print(inversa)
-                
+                A, B = self._coeficientes_e_termos(matriz_aumentada)
+                valor = self._resolver(nome_var_principal, A, B)
             elif nome_funcao == 'trans':
-                transposta = matriz_aumentada.T
-                print("Matriz transposta:")
-                print(transposta)
-                
-            elif nome_funcao == 'retP':
-                if matriz_aumentada.shape[0] == matriz_aumentada.shape[1]:
-                    A = matriz_aumentada
-                else:
-                    A = matriz_aumentada[:, :-1]
-                    if A.shape[0] != A.shape[1]:
-                        raise Exception("Erro: Para decomposição LU, a matriz de coeficientes deve ser quadrada.")
-                P, L, U = lu(A)
-                print("Matriz P (permutação):")
-                print(P)
-                
-            elif nome_funcao == 'retL':
-                if matriz_aumentada.shape[0] == matriz_aumentada.shape[1]:
-                    A = matriz_aumentada
-                else:
-                    A = matriz_aumentada[:, :-1]
-                    if A.shape[0] != A.shape[1]:
-                        raise Exception("Erro: Para decomposição LU, a matriz de coeficientes deve ser quadrada.")
-                P, L, U = lu(A)
-                print("Matriz L (triangular inferior):")
-                print(L)
-                
-            elif nome_funcao == 'retU':
-                if matriz_aumentada.shape[0] == matriz_aumentada.shape[1]:
-                    A = matriz_aumentada
-                else:
-                    A = matriz_aumentada[:, :-1]
-                    if A.shape[0] != A.shape[1]:
-                        raise Exception("Erro: Para decomposição LU, a matriz de coeficientes deve ser quadrada.")
-                P, L, U = lu(A)
-                print("Matriz U (triangular superior):")
-                print(U)
-                
-            elif nome_funcao == 'retD':
-                if matriz_aumentada.shape[0] == matriz_aumentada.shape[1]:
-                    A = matriz_aumentada
+                valor = matriz_aumentada.T
+            elif nome_funcao in self.OPERACOES_QUADRADAS:
+                A = self._matriz_quadrada(matriz_aumentada, self.OPERACOES_QUADRADAS[nome_funcao])
+                if nome_funcao == 'det':
+                    valor = self._fatoracao(nome_var_principal, A).det()
+                elif nome_funcao == 'inv':
+                    valor = self._fatoracao(nome_var_principal, A).inversa()
+                elif nome_funcao == 'retP':
+                    valor = self._lu(nome_var_principal, A, natural=True).P()
+                elif nome_funcao == 'retL':
+                    valor = self._lu(nome_var_principal, A, natural=True).L()
+                elif nome_funcao == 'retU':
+                    valor = self._lu(nome_var_principal, A, natural=True).U()
                 else:
-                    A = matriz_aumentada[:, :-1]
-                    if A.shape[0] != A.shape[1]:
-                        raise Exception("Erro: Para extrair diagonal, a matriz de coeficientes deve ser quadrada.")
-                diagonal = np.diag(np.diag(A))
-                print("Matriz diagonal:")
-                print(diagonal)
-                
+                    valor = matriz_diagonal(A)
             else:
                 raise Exception(f"Erro: Função '{nome_funcao}' não reconhecida.")
                 
         except np.linalg.LinAlgError as e:
             raise Exception(f"Erro de Álgebra Linear: {e} (matriz pode ser singular)")
-        
 
+        return valor
 
-    def TK_OPE_ATB(self, token):
-        return token.value
+    def _registrar_resultado(self, nome_funcao, nome_var_principal, linha, valor):
+        resultado = Resultado(self.comandos_executados, nome_funcao, nome_var_principal, linha, valor)
+        self.comandos_executados += 1
+        if self.guardar_resultados:
+            self.resultados.append(resultado)
+        self.saida_resultados.escrever(resultado)
+        self._verificar_memoria(valor)
+        return resultado
 
-    def TK_DELIM_MULT(self, token):
-        return token.value
-    
-    def TK_DELIM_INIT_SISTEMA(self, token):
-        return token.value
+    @staticmethod
+    def _matriz_quadrada(matriz_aumentada, operacao):
+        """
+        Retorna a matriz quadrada sobre a qual um comando opera: a própria matriz,
+        se for quadrada, ou a matriz de coeficientes (sem a última coluna).
 
-    def TK_DELIM_END_SISTEMA(self, token):
-        return token.value
-        
-    def TK_DELIM_INIT_EQ(self, token):
-        return token.value
+        Raises:
+            Exception: Se nenhuma das duas for quadrada
+        """
+        if matriz_aumentada.shape[0] == matriz_aumentada.shape[1]:
+            return matriz_aumentada
+        A = matriz_aumentada[:, :-1]
+        if A.shape[0] != A.shape[1]:
+            raise Exception(f"Erro: Para {operacao}, a matriz de coeficientes deve ser quadrada.")
+        return A
+
+    def _lu(self, nome_var, A, natural=False):
+        """
+        Retorna a decomposição LU de A, reaproveitando a que estiver em cache para a variável.
+
+        Args:
+            nome_var (str): Nome da variável de onde A foi extraída
+            A (np.ndarray or sparse): Matriz quadrada de coeficientes
+            natural (bool): Exige A = P L U sem reordenar colunas (só muda algo em matrizes esparsas)
+
+        Returns:
+            FatoracaoLU or FatoracaoLUEsparsa: Fatores P, L, U de A
+        """
+        return self.fatoracoes.obter(nome_var, 'lu_natural' if natural else 'lu', A)
+
+    def _fatoracao(self, nome_var, A):
+        """
+        Retorna a fatoração de A adequada à sua estrutura (ver pro_sis_estrutura): divisão
+        pela diagonal, substituição triangular, LU em banda, Cholesky ou LU geral.
+
+        A estrutura é detectada uma única vez e guardada junto com a variável (uma
+        redeclaração cria uma nova entrada); a primeira detecção é exibida nas mensagens.
+        Uma matriz simétrica com diagonal positiva tenta Cholesky e, se não for
+        definida positiva, passa a usar a LU.
+
+        Args:
+            nome_var (str): Nome da variável de onde A foi extraída
+            A (np.ndarray or sparse): Matriz quadrada de coeficientes
+
+        Returns:
+            Fatores de A, com 'det', 'inversa', 'resolver' e 'singular' (ver pro_sis_fatoracao)
+        """
+        estruturas = self.vars[nome_var].estruturas
+        estrutura = estruturas.get(A.shape)
+        if estrutura is None:
+            estrutura = detectar_estrutura(A)
+            if estrutura.tipo == 'simetrica':
+                try:
+                    self.fatoracoes.obter(nome_var, 'cholesky', A)
+                    estrutura = estrutura._replace(tipo='simetrica_positiva')
+                except np.linalg.LinAlgError:
+                    estrutura = estrutura._replace(tipo='simetrica_indefinida')
+            estruturas[A.shape] = estrutura
+            self._log(f"-> Estrutura de '{nome_var}': {descrever(estrutura)}")
+        tipo = FATORACAO_POR_ESTRUTURA[estrutura.tipo]
+        if tipo == 'banda':
+            return self.fatoracoes.obter(nome_var, tipo, A, estrutura.inferior, estrutura.superior)
+        return self.fatoracoes.obter(nome_var, tipo, A)
+
+    def _coeficientes_e_termos(self, matriz, nomes_termos=()):
+        """
+        Separa a matriz de coeficientes e os termos independentes de um 'solve'.
+
+        Sem termos explícitos, um sistema n x (n + k) é lido como A (n x n) seguido de
+        k colunas de termos independentes. Com termos explícitos (variáveis 'eq' ou
+        'sis' com n linhas), eles são empilhados como colunas e A é a parte quadrada
+        da matriz.
+
+        Args:
+            matriz (np.ndarray or sparse): Valor da variável 'sis'
+            nomes_termos (list): Nomes das variáveis com termos independentes extras
+
+        Returns:
+            tuple: (A, B), com B vetor para um único termo ou matriz n x k
+
+        Raises:
+            Exception: Se A não for quadrada ou algum termo for incompatível
+        """
+        n = matriz.shape[0]
+        if matriz.shape[1] < n or (not nomes_termos and matriz.shape[1] == n):
+            raise Exception("Erro: Para resolver o sistema, a matriz de coeficientes deve ser quadrada.")
+        A = matriz if matriz.shape[1] == n else matriz[:, :n]
+        if not nomes_termos:
+            return A, termos_independentes(matriz, n)
+
+        colunas = []
+        for nome in nomes_termos:
+            if nome not in self.vars or self.vars[nome].tipo not in ('eq', 'sis'):
+                raise Exception(f"Erro Semântico: O termo independente '{nome}' deve ser uma variável do tipo 'eq' ou 'sis'.")
+            termo = self._valor(nome)
+            termo = termo.toarray() if sp.issparse(termo) else np.asarray(termo, dtype=self.dtype)
+            if termo.shape[0] != n:
+                raise Exception(f"Erro Semântico: O termo independente '{nome}' tem {termo.shape[0]} linhas, mas o sistema tem {n}.")
+            colunas.append(termo)
+        return A, colunas[0] if len(colunas) == 1 else np.column_stack(colunas)
+
+    def _resolver(self, nome_var, A, b):
+        """
+        Resolve A x = b com o solver configurado: fatoração em cache (escolhida pela
+        estrutura de A, ver '_fatoracao') ou método iterativo.
+
+        Com b matriz n x k, a fatoração resolve todas as colunas em uma única chamada ao LAPACK.
+
+        Args:
+            nome_var (str): Nome da variável de onde A foi extraída
+            A (np.ndarray or sparse): Matriz quadrada de coeficientes
+            b (np.ndarray): Vetor de termos independentes (ou matriz n x k)
+
+        Returns:
+            np.ndarray: Solução do sistema (vetor ou matriz n x k)
+        """
+        if self.solver in SOLVERS_ITERATIVOS:
+            if b.ndim == 2:
+                return np.column_stack([resolver_iterativo(A, coluna, self.solver, self.tolerancia) for coluna in b.T])
+            return resolver_iterativo(A, b, self.solver, self.tolerancia)
+        return self._fatoracao(nome_var, A).resolver(b)
 
-    def TK_DELIM_END_EQ(self, token):
-        return token.value
-        
     def end_comando(self, token):
         return token
+
+    def executar_ir(self, programa):
+        """
+        Executa um ProgramaIR, com o mesmo efeito de transformar a árvore sintática.
+
+        Args:
+            programa (ProgramaIR): Programa compilado (ver pro_sis_ir)
+
+        Returns:
+            list: Resultados (Resultado) dos comandos executados
+        """
+        if self.threads > 1 and self.memo is None:
+            escalonador = EscalonadorParalelo(self, self.threads)
+            self.relatorio_escalonador = escalonador.relatorio
+            escalonador.executar(programa)
+            return self.programa()
+
+        verificadas = verificar_programa(programa, self.vars)
+        grafo = dependencias(programa) if self.memo is not None else None
+        chaves = {}
+        self.reaproveitadas = 0
+        for i, instrucao in enumerate(programa.instrucoes):
+            chave = self._chave_incremental(programa, instrucao, grafo[i], chaves) if grafo is not None else None
+            if instrucao[0] == 'declarar':
+                _, linha, tipo_declarado, nome_var, expressao = instrucao
+                memoizavel = chave is not None and expressao[0] in self.EXPRESSOES_MEMOIZAVEIS
+                entrada = self.memo.obter(chave) if memoizavel else None
+                if entrada is not None:
+                    self._reaproveitar_declaracao(nome_var, entrada)
+                else:
+                    self.declarar_ir(instrucao, programa.arrays, verificadas[i])
+                    if memoizavel and not isinstance(self.vars[nome_var].valor, Adiado):
+                        self.memo.guardar(chave, tipo_declarado, _somente_leitura(self.vars[nome_var].valor))
+                if chave is not None:
+                    chaves[i] = chave
+                    self.chaves_vars[nome_var] = chave
+                else:
+                    self.chaves_vars.pop(nome_var, None)
+            else:
+                _, linha, nome_funcao, nome_var = instrucao
+                if nome_var is None:
+                    raise Exception("Erro Sintático: Comando mal formado. Esperado: funcao_comando ID end_comando")
+                entrada = self.memo.obter(chave) if chave is not None else None
+                if entrada is not None:
+                    self._log(f"\n-=-=- Executando '{nome_funcao}' no sistema '{nome_var}' (resultado reaproveitado) -=-=-")
+                    self._registrar_resultado(nome_funcao, nome_var, linha, entrada[1])
+                    self.reaproveitadas += 1
+                    continue
+                with self._medir('comando', nome_funcao, linha):
+                    resultado = self.executar_comando(nome_funcao, nome_var, linha, verificadas[i])
+                if chave is not None:
+                    self.memo.guardar(chave, None, _somente_leitura(resultado.valor))
+        return self.programa()
+
+    def declarar_ir(self, instrucao, arrays, verificada=False):
+        """
+        Executa uma instrução 'declarar' do ProgramaIR.
+
+        Args:
+            instrucao (tuple): ('declarar', linha, tipo, nome, expressao)
+            arrays (list): Literais do programa
+            verificada (bool): Se a instrução foi verificada pela análise estática
+        """
+        _, linha, tipo_declarado, nome_var, expressao = instrucao
+        valor = self._avaliar_ir(expressao, arrays, verificada)
+        with self._medir('declaracao', nome_var, linha):
+            if expressao[0] == 'ref':
+                valor = self.valor_de(valor)
+            self.declarar(tipo_declarado, nome_var, valor, verificada)
+
+    def _chave_incremental(self, programa, instrucao, leitura, chaves):
+        """
+        Hash de conteúdo de uma instrução: seu próprio conteúdo mais as chaves das
+        declarações que ela lê (arestas do grafo de dependências).
+
+        Returns:
+            str: Chave, ou None se a instrução não puder ser identificada pelo conteúdo
+                 (erros, variáveis indefinidas, arquivo inexistente)
+        """
+        entradas = []
+        for nome, indice in leitura:
+            chave = chaves.get(indice) if indice is not None else self.chaves_vars.get(nome)
+            if chave is None:
+                return None
+            entradas.append(chave)
+        # A precisão muda os valores de literais, 'load', chamadas e comandos
+        opcoes = (self.solver, self.tolerancia, self.dtype.name)
+
+        if instrucao[0] == 'comando':
+            return chave_conteudo('comando', instrucao[2], opcoes, entradas) if instrucao[3] is not None else None
+
+        expressao = instrucao[4]
+        tipo = expressao[0]
+        if tipo == 'erro':
+            return None
+        if tipo == 'vetor':
+            proprio = (tipo, programa.hash_array(expressao[1]))
+        elif tipo == 'sistema':
+            proprio = (tipo, programa.hash_array(expressao[1]), self.limiar_esparsidade, self.tamanho_minimo_esparso)
+        elif tipo == 'esparsa':
+            proprio = (tipo, expressao[1], expressao[2], programa.hash_array(expressao[3]))
+        elif tipo == 'carga':
+            caminho = expressao[1]
+            if self.diretorio_base and not os.path.isabs(caminho):
+                caminho = os.path.join(self.diretorio_base, caminho)
+            try:
+                estado = os.stat(caminho)
+            except OSError:
+                return None
+            proprio = (tipo, os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns, expressao[2])
+        elif tipo == 'chamada':
+            proprio = (tipo, expressao[1])
+        else:
+            proprio = expressao
+        return chave_conteudo('declarar', instrucao[2], proprio, opcoes, entradas)
+
+    def _reaproveitar_declaracao(self, nome_var, entrada):
+        tipo, valor = entrada
+        atual = self.vars.get(nome_var)
+        self.vars[nome_var] = Simbolo(tipo, valor)
+        if atual is None or atual.valor is not valor:
+            self.fatoracoes.invalidar(nome_var)
+        self.reaproveitadas += 1
+        self._log(f"-> Variável '{nome_var}' (tipo: {tipo}) reaproveitada da execução anterior.")
+        self._verificar_memoria(valor)
+
+    def _avaliar_ir(self, expressao, arrays, verificada=False):
+        tipo = expressao[0]
+        if tipo in ('numero', 'ref'):
+            return expressao[1]
+        if tipo == 'vetor':
+            return arrays[expressao[1]]
+        if tipo == 'sistema':
+            return self.armazenar_sistema(arrays[expressao[1]])
+        if tipo == 'esparsa':
+            return montar_esparsa(expressao[1], expressao[2], arrays[expressao[3]])
+        if tipo == 'carga':
+            return self.carregar(expressao[1], expressao[2], expressao[3])
+        if tipo == 'chamada':
+            _, nome_funcao, nome_var, nomes_termos, linha = expressao
+            return self._chamada(nome_funcao, nome_var, nomes_termos, linha, verificada)
+        raise Exception(expressao[1])
     
 
+def _somente_leitura(valor):
+    # Valores memoizados são compartilhados entre execuções e não podem ser alterados
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    return valor
+
+
 class ProSisCompiler:
     """
     Compilador principal para a linguagem PRO-SIS.
@@ -427,59 +1084,254 @@ class ProSisCompiler:
         pro_sis_parser (Lark): Parser Lark para análise sintática
         interpreter (ProSisInterpreter): Interpretador semântico
         lexer (ProSisLexer): Analisador léxico
+        perfilador (Perfilador): Instrumentação opcional das fases e instruções
+        cache_ir (CacheIR): Cache dos programas compilados (None sem 'usar_ir' e sem 'incremental')
+        memo (MemoIncremental): Memoização do modo incremental (None se desativado)
     """
-    def __init__(self, grammar_file):
+
+    PARSERS_SUPORTADOS = ('earley', 'lalr')
+
+    def __init__(self, grammar_file, parser='earley', cache_dir=None, opcoes_interpretador=None, perfilador=None,
+                 usar_ir=False, incremental=False, diretorio_incremental=None):
         """
         Inicializa o compilador carregando a gramática do .lark e criando os componentes.
-        
+
+        No modo 'lalr' as tabelas do parser são serializadas em um arquivo de cache
+        cujo nome contém o hash da gramática, de modo que execuções seguintes apenas
+        carregam as tabelas prontas. Alterar a gramática gera um novo arquivo de cache.
+
         Args:
             grammar_file (str): Caminho para o arquivo de gramática .lark
-            
+            parser (str): Algoritmo de análise sintática ('earley' ou 'lalr')
+            cache_dir (str): Diretório do cache do parser LALR e dos programas compilados.
+                             Por padrão, usa '__pycache__' ao lado do arquivo de gramática.
+            opcoes_interpretador (dict): Argumentos repassados ao ProSisInterpreter
+            perfilador (Perfilador): Se informado, mede a carga da gramática, cada fase
+                             de 'run' e cada instrução executada pelo interpretador
+            usar_ir (bool): Se True, 'run' sem diagnósticos executa o programa compilado
+                             (ver 'compilar'), guardado em cache pelo hash do código.
+                             Implícito com 'threads' > 1 nas opções do interpretador
+            incremental (bool): Se True, implica 'usar_ir' e memoiza chamadas de função,
+                             'load' e comandos pelo hash de conteúdo de suas entradas: ao
+                             reexecutar um programa editado, só as instruções afetadas pela
+                             edição são recalculadas
+            diretorio_incremental (str): Diretório onde a memoização é persistida entre
+                             execuções do processo (None mantém apenas em memória)
+
         Raises:
-            Exception: Se o arquivo de gramática não for encontrado
+            Exception: Se o arquivo de gramática não for encontrado ou o parser for inválido
         """
+        if parser not in self.PARSERS_SUPORTADOS:
+            raise Exception(f"Erro: Parser '{parser}' inválido. Opções: {', '.join(self.PARSERS_SUPORTADOS)}.")
+
         try:
             with open(grammar_file, 'r', encoding='utf-8') as f:
-                self.pro_sis_parser = Lark(f.read(), start='programa')
-            
-            self.interpreter = ProSisInterpreter()
-            self.lexer = ProSisLexer(self.pro_sis_parser)
-
+                gramatica = f.read()
         except FileNotFoundError:
             raise Exception(f"Erro: Arquivo de gramática '{grammar_file}' não encontrado.")
-    
-    def run(self, code_to_run, code_to_run_path):
+
+        self.modo_parser = parser
+        self.perfilador = perfilador
+        self.cache_parser = None
+        with self._medir('gramatica'):
+            if parser == 'lalr':
+                self.cache_parser = self._caminho_cache(grammar_file, gramatica, cache_dir)
+                self.pro_sis_parser = Lark(gramatica, start='programa', parser='lalr', cache=self.cache_parser)
+            else:
+                self.pro_sis_parser = Lark(gramatica, start='programa')
+
+        self.opcoes_interpretador = dict(opcoes_interpretador or {})
+        # A execução paralela é feita sobre o programa compilado
+        usar_ir = usar_ir or self.opcoes_interpretador.get('threads', 1) > 1
+        self.cache_ir = None
+        self.memo = MemoIncremental(diretorio=diretorio_incremental) if incremental else None
+        if usar_ir or incremental:
+            if cache_dir is None:
+                cache_dir = os.path.join(os.path.dirname(os.path.abspath(grammar_file)), '__pycache__')
+            self.cache_ir = CacheIR(cache_dir, gramatica)
+
+        self.interpreter = self._novo_interpretador()
+        self.lexer = ProSisLexer(self.pro_sis_parser)
+
+    def _novo_interpretador(self):
+        opcoes = dict(self.opcoes_interpretador)
+        opcoes.setdefault('perfilador', self.perfilador)
+        opcoes.setdefault('memo', self.memo)
+        return ProSisInterpreter(**opcoes)
+
+    def _medir(self, fase):
+        if self.perfilador is None:
+            return contextlib.nullcontext()
+        return self.perfilador.medir(fase)
+
+    def reiniciar(self):
+        """
+        Descarta as variáveis e fatorações do programa anterior, mantendo o parser construído
+        (e a memoização do modo incremental).
+
+        Permite reutilizar o mesmo compilador para executar vários programas independentes.
+        """
+        self.interpreter = self._novo_interpretador()
+
+    @staticmethod
+    def _caminho_cache(grammar_file, gramatica, cache_dir):
+        """
+        Monta o caminho do arquivo de cache do parser LALR, identificado pelo hash da gramática.
+
+        Args:
+            grammar_file (str): Caminho para o arquivo de gramática .lark
+            gramatica (str): Conteúdo da gramática
+            cache_dir (str): Diretório do cache (None para o padrão)
+
+        Returns:
+            str: Caminho do arquivo de cache
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(grammar_file)), '__pycache__')
+        os.makedirs(cache_dir, exist_ok=True)
+        digest = hashlib.sha256(gramatica.encode('utf-8')).hexdigest()[:16]
+        nome_base = os.path.splitext(os.path.basename(grammar_file))[0]
+        return os.path.join(cache_dir, f"{nome_base}.lalr.{digest}.cache")
+
+    def _iniciar_execucao(self, code_to_run_path):
+        # As variáveis continuam entre execuções (sessões do servidor), mas cada execução
+        # retorna apenas os resultados dos próprios comandos
+        self.interpreter.diretorio_base = os.path.dirname(os.path.abspath(code_to_run_path))
+        self.interpreter.resultados = []
+
+    def compilar(self, code_to_run):
+        """
+        Compila o código para um ProgramaIR: instruções compactas com os literais já
+        convertidos em arrays binários.
+
+        Com o cache de IR ativo, um código já compilado (nesta execução ou em outra,
+        pelo arquivo em disco) é reaproveitado sem análise léxica nem sintática.
+
+        Args:
+            code_to_run (str): Código fonte PRO-SIS
+
+        Returns:
+            ProgramaIR: Programa compilado
+        """
+        def compilar_codigo(codigo):
+            return compilar_arvore(self.pro_sis_parser.parse(codigo))
+
+        if self.cache_ir is None:
+            return compilar_codigo(code_to_run)
+        return self.cache_ir.obter(code_to_run, compilar_codigo)
+
+    def run(self, code_to_run, code_to_run_path, mostrar_arvore=True, salvar_tokens=True):
         """
         Executa todo o processo de compilação do código PRO-SIS.
         
         Realiza a análise sintática, gera e exibe a árvore sintática,
         executa a análise léxica salvando os tokens em arquivo,
         e por fim executa o interpretador semântico.
+
+        A árvore sintática e o arquivo de tokens são diagnósticos opcionais; com ambos
+        desativados (modo de produção) o código é analisado uma única vez e executado.
+        No modo 'lalr', os tokens salvos são os mesmos consumidos pelo parser, sem uma
+        segunda passada do lexer. No modo 'earley' o lexer dinâmico não expõe seus
+        tokens, então a análise léxica é refeita apenas quando 'salvar_tokens' é True.
+
+        Com um perfilador, cada fase é medida: 'analise_sintatica' (o lexer roda sob
+        demanda dentro do parser e está incluído nela), 'arvore', 'analise_lexica'
+        (listagem e arquivo de tokens) e 'transformacao'.
+
+        Com 'usar_ir' (ou 'incremental') e sem diagnósticos, o programa é obtido de
+        'compilar' (fase 'compilacao_ir') e executado sem árvore sintática (fase 'execucao_ir').
+        A execução paralela ('threads' > 1) só existe nesse caminho e não aceita diagnósticos.
         
         Args:
             code_to_run (str): Código fonte PRO-SIS a ser compilado
             code_to_run_path (str): Caminho do arquivo de entrada (para nomear arquivos de saída)
+            mostrar_arvore (bool): Se True, imprime a árvore sintática gerada
+            salvar_tokens (bool): Se True, imprime os tokens e os salva em '<nome>.txt'
             
         Returns:
-            O resultado da interpretação semântica
+            list: Resultados (Resultado) dos comandos executados nesta chamada, com os valores
+                  como np.ndarray, matriz esparsa ou float
             
         Raises:
-            Exception: Se houver erros durante qualquer fase da compilação
+            Exception: Se houver erros durante qualquer fase da compilação, ou se
+                       diagnósticos forem pedidos com 'threads' > 1
         """
 
-        tree = self.pro_sis_parser.parse(code_to_run)
+        if self.interpreter.threads > 1 and (mostrar_arvore or salvar_tokens):
+            raise Exception("Erro: A execução paralela (threads > 1) não gera a árvore sintática nem os tokens; "
+                            "use o modo de produção.")
+        self._iniciar_execucao(code_to_run_path)
+        if self.cache_ir is not None and not (mostrar_arvore or salvar_tokens):
+            with self._medir('compilacao_ir'):
+                programa = self.compilar(code_to_run)
+            try:
+                with self._medir('execucao_ir'), self.interpreter.limite_blas():
+                    return self.interpreter.executar_ir(programa)
+            finally:
+                self.interpreter.saida_resultados.fechar()
+
+        tokens = None
+        with self._medir('analise_sintatica'):
+            if salvar_tokens and self.modo_parser == 'lalr':
+                parser_interativo = self.pro_sis_parser.parse_interactive(code_to_run)
+                tokens = parser_interativo.exhaust_lexer()
+                tree = parser_interativo.feed_eof(tokens[-1] if tokens else None)
+            else:
+                tree = self.pro_sis_parser.parse(code_to_run)
 
-        print("------- Árvore Sintática Gerada --------")
-        print(tree.pretty())
-        print("----------------------------------------\n")
+        if mostrar_arvore:
+            with self._medir('arvore'):
+                # A árvore mostrada tem um token por lexema, como o arquivo de tokens
+                expandir_arvore(tree)
+                print("------- Árvore Sintática Gerada --------")
+                print(tree.pretty())
+                print("----------------------------------------\n")
 
-        nome_base = os.path.splitext(os.path.basename(code_to_run_path))[0]
-        saida_txt = f"{nome_base}.txt"
-        self.lexer.lex_and_print(code_to_run, caminho_saida_txt=saida_txt)
+        if salvar_tokens:
+            nome_base = os.path.splitext(os.path.basename(code_to_run_path))[0]
+            saida_txt = f"{nome_base}.txt"
+            with self._medir('analise_lexica'):
+                self.lexer.lex_and_print(code_to_run, caminho_saida_txt=saida_txt, tokens=tokens)
 
-        result = self.interpreter.transform(tree)
+        try:
+            with self._medir('transformacao'), self.interpreter.limite_blas():
+                result = self.interpreter.transform(tree)
+        finally:
+            self.interpreter.saida_resultados.fechar()
         return result
 
+    def executar_fluxo(self, linhas, code_to_run_path):
+        """
+        Analisa e executa o código instrução por instrução, à medida que é lido.
+
+        Ao contrário de 'run', o código não é lido nem analisado por inteiro antes da
+        execução: cada instrução é executada assim que termina na entrada e sua árvore
+        é descartada em seguida. A memória usada pela análise fica limitada à maior
+        instrução, e os primeiros resultados aparecem antes do fim da leitura, o que
+        permite executar programas gerados muito grandes ou recebidos pela entrada padrão.
+        Não há diagnósticos (árvore e tokens) nem programa compilado, e as instruções
+        são executadas em sequência (fase 'execucao_fluxo' do perfilador).
+
+        Args:
+            linhas (iterable): Linhas do código fonte (um arquivo aberto, sys.stdin, ...)
+            code_to_run_path (str): Caminho do arquivo de entrada (base dos caminhos de 'load')
+
+        Returns:
+            list: Resultados (Resultado) dos comandos executados, se o interpretador os guarda
+
+        Raises:
+            Exception: Se houver erros de sintaxe ou de execução; as instruções anteriores
+                       ao erro já terão sido executadas
+        """
+        self._iniciar_execucao(code_to_run_path)
+        try:
+            with self._medir('execucao_fluxo'), self.interpreter.limite_blas():
+                for instrucao in instrucoes_em_fluxo(linhas, self.pro_sis_parser.parse):
+                    self.interpreter.transform(instrucao)
+                return self.interpreter.programa()
+        finally:
+            self.interpreter.saida_resultados.fechar()
+
 def main():
     """
     Função principal do programa.
@@ -490,20 +1342,98 @@ def main():
     Trata erros de arquivo não encontrado e erros gerais de compilação.
     """
     cli_parser = argparse.ArgumentParser(description="Interpretador para a linguagem PRO-SIS")
-    cli_parser.add_argument("arquivo_entrada", help="Caminho para o arquivo .psis a ser executado.")
+    cli_parser.add_argument("arquivo_entrada", help="Caminho para o arquivo .psis a ser executado ('-' lê da entrada padrão, com --fluxo).")
+    cli_parser.add_argument("--parser", choices=ProSisCompiler.PARSERS_SUPORTADOS, default="earley",
+                            help="Algoritmo de análise sintática (padrão: earley). 'lalr' é mais rápido e usa cache das tabelas.")
+    cli_parser.add_argument("--cache-dir", default=None,
+                            help="Diretório do cache do parser LALR (padrão: __pycache__ ao lado da gramática).")
+    cli_parser.add_argument("--producao", action="store_true",
+                            help="Modo de produção: não imprime a árvore sintática nem gera o arquivo de tokens.")
+    cli_parser.add_argument("--sem-arvore", action="store_true", help="Não imprime a árvore sintática.")
+    cli_parser.add_argument("--sem-tokens", action="store_true", help="Não imprime nem salva a análise léxica.")
+    cli_parser.add_argument("--solver", choices=('direto',) + tuple(SOLVERS_ITERATIVOS), default="direto",
+                            help="Método usado por 'solve' (padrão: direto, decomposição LU).")
+    cli_parser.add_argument("--tolerancia", type=float, default=1e-8,
+                            help="Tolerância relativa dos solvers iterativos (padrão: 1e-8).")
+    cli_parser.add_argument("--resultados", default=None, metavar="DESTINO",
+                            help="Destino dos resultados dos comandos: arquivo .npz, arquivo .jsonl, "
+                                 "diretório (um .npy por resultado) ou 'nula' (padrão: impressão em texto).")
+    cli_parser.add_argument("--silencioso", action="store_true",
+                            help="Não imprime as mensagens de acompanhamento do interpretador.")
+    cli_parser.add_argument("--ir", action="store_true",
+                            help="No modo de produção, executa o programa compilado e guardado em cache "
+                                 "(execuções seguintes do mesmo código não passam pelo parser).")
+    cli_parser.add_argument("--incremental", default=None, metavar="DIR",
+                            help="Modo incremental (implica --ir): memoiza chamadas, 'load' e comandos em DIR pelo hash "
+                                 "de suas entradas; ao reexecutar um programa editado, só o que mudou é recalculado.")
+    cli_parser.add_argument("--fluxo", action="store_true",
+                            help="Lê, analisa e executa o programa instrução por instrução, sem carregá-lo inteiro "
+                                 "(implica --producao; os resultados não ficam guardados em memória).")
+    cli_parser.add_argument("--preguicoso", action="store_true",
+                            help="Adia as chamadas de função em declarações até que o valor seja usado: declarações "
+                                 "nunca usadas não são calculadas e padrões como solve(inv(A), b) são fundidos.")
+    cli_parser.add_argument("--threads", type=int, default=1,
+                            help="Executa ao mesmo tempo, em N threads, as instruções sem dependência de dados entre si "
+                                 "(implica --ir e --producao) e imprime o relatório do escalonamento.")
+    cli_parser.add_argument("--threads-blas", type=int, default=None, metavar="N",
+                            help="Limite de threads do BLAS por chamada (requer threadpoolctl; padrão: núcleos / --threads).")
+    cli_parser.add_argument("--precisao", choices=('float64', 'float32'), default='float64',
+                            help="Precisão dos sistemas e resultados; float32 usa metade da memória (padrão: float64).")
+    cli_parser.add_argument("--limite-memoria", default=None, metavar="TAMANHO",
+                            help="Memória máxima do workspace (ex.: 512M, 4G); ao excedê-la, fatorações em cache são "
+                                 "descartadas e valores grandes despejados em disco.")
+    cli_parser.add_argument("--perfil", action="store_true",
+                            help="Mede tempo de relógio, CPU e pico de memória de cada fase e instrução e imprime um resumo.")
+    cli_parser.add_argument("--perfil-trace", default=None, metavar="ARQUIVO",
+                            help="Grava as medidas do perfil em formato Chrome Trace (JSON); implica --perfil.")
     args = cli_parser.parse_args()
+    if args.fluxo and (args.incremental is not None or args.threads > 1):
+        cli_parser.error("--fluxo executa as instruções em sequência e não pode ser usado com --incremental ou --threads.")
     try:
-        with open(args.arquivo_entrada, 'r', encoding='utf-8') as f:
-            codigo_fonte = f.read()
+        if args.fluxo:
+            entrada = sys.stdin if args.arquivo_entrada == '-' else open(args.arquivo_entrada, 'r', encoding='utf-8')
+        else:
+            with open(args.arquivo_entrada, 'r', encoding='utf-8') as f:
+                codigo_fonte = f.read()
     except FileNotFoundError:
         print(f"Erro: Arquivo de entrada '{args.arquivo_entrada}' não encontrado.")
         return
+    perfilador = Perfilador() if (args.perfil or args.perfil_trace) else None
+    # A execução paralela não tem árvore sintática nem tokens
+    producao = args.producao or args.threads > 1
+    compiler = None
     try:
         print(f"Iniciando a compilação do arquivo '{args.arquivo_entrada}'...")
-        compiler = ProSisCompiler("pro_sis_grammar.lark")
-        compiler.run(codigo_fonte, args.arquivo_entrada)
+        compiler = ProSisCompiler("pro_sis_grammar.lark", parser=args.parser, cache_dir=args.cache_dir,
+                                  opcoes_interpretador={'solver': args.solver, 'tolerancia': args.tolerancia,
+                                                        'saida_resultados': args.resultados,
+                                                        'verboso': not args.silencioso,
+                                                        'preguicoso': args.preguicoso,
+                                                        'threads': args.threads, 'threads_blas': args.threads_blas,
+                                                        'precisao': args.precisao, 'limite_memoria': args.limite_memoria,
+                                                        'guardar_resultados': not args.fluxo},
+                                  perfilador=perfilador, usar_ir=args.ir, incremental=args.incremental is not None,
+                                  diretorio_incremental=args.incremental)
+        if args.fluxo:
+            with entrada:
+                compiler.executar_fluxo(entrada, args.arquivo_entrada)
+        else:
+            compiler.run(codigo_fonte, args.arquivo_entrada,
+                         mostrar_arvore=not (producao or args.sem_arvore),
+                         salvar_tokens=not (producao or args.sem_tokens))
     except Exception as e:
         print(f"\nOcorreu um erro durante a compilação: {e}")
+    finally:
+        if compiler is not None and compiler.interpreter.relatorio_escalonador is not None and not args.silencioso:
+            print()
+            compiler.interpreter.relatorio_escalonador.imprimir()
+        if perfilador is not None:
+            perfilador.encerrar()
+            print()
+            perfilador.imprimir_resumo()
+            if args.perfil_trace:
+                perfilador.exportar_chrome_trace(args.perfil_trace)
+                print(f"Trace salvo em '{args.perfil_trace}'.")
 
 if __name__ == "__main__":
     main()
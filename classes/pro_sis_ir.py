@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+from lark import Token, Transformer, v_args
+
+from pro_sis_grafo import chave_conteudo
+from pro_sis_literais import converter_carga, converter_equacao, converter_numero, converter_triplas, empilhar_equacoes
+
+# Alterar o formato das instruções exige mudar a versão, o que invalida os caches antigos
+VERSAO_IR = 1
+
+
+class ProgramaIR:
+    """
+    Programa PRO-SIS já analisado: uma lista compacta de instruções e os literais numéricos
+    em arrays binários.
+
+    Instruções:
+        ('declarar', linha, tipo, nome, expressao)
+        ('comando', linha, funcao, nome)          -- nome None se o comando for mal formado
+
+    Expressões:
+        ('numero', valor)                 ('ref', nome)
+        ('vetor', i)                      ('sistema', i)           -- i indexa 'arrays'
+        ('esparsa', linhas, colunas, i)   ('carga', caminho, forma, linha)
+        ('chamada', funcao, nome, termos, linha)
+        ('erro', mensagem)                -- erro semântico detectado na compilação, lançado
+                                             apenas quando a instrução é executada
+
+    Attributes:
+        instrucoes (list): Instruções na ordem do código fonte
+        arrays (list): Literais (equações, sistemas densos, triplas de sistemas esparsos)
+    """
+
+    def __init__(self, instrucoes, arrays):
+        self.instrucoes = instrucoes
+        self.arrays = arrays
+        # Um programa em cache é executado várias vezes: seus literais não podem ser alterados
+        for array in arrays:
+            array.flags.writeable = False
+        self._hashes = {}
+
+    def hash_array(self, indice):
+        """Hash de conteúdo do literal 'indice', calculado uma única vez por programa."""
+        h = self._hashes.get(indice)
+        if h is None:
+            h = self._hashes[indice] = chave_conteudo(self.arrays[indice])
+        return h
+
+    def salvar(self, caminho):
+        """
+        Grava o programa em um arquivo .npz (instruções em JSON, literais como arrays).
+
+        A gravação é atômica: processos concorrentes nunca leem um arquivo pela metade.
+        """
+        texto = json.dumps(self.instrucoes, ensure_ascii=False).encode('utf-8')
+        conteudo = {f"a{i}": array for i, array in enumerate(self.arrays)}
+        conteudo['instrucoes'] = np.frombuffer(texto, dtype=np.uint8)
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(descritor, 'wb') as f:
+                np.savez(f, **conteudo)
+            os.chmod(temporario, 0o644)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Lê um programa gravado por 'salvar'."""
+        with np.load(caminho, allow_pickle=False) as dados:
+            instrucoes = _como_tuplas(json.loads(dados['instrucoes'].tobytes().decode('utf-8')))
+            arrays = [dados[f"a{i}"] for i in range(len(dados.files) - 1)]
+        return cls(instrucoes, arrays)
+
+    def __len__(self):
+        return len(self.instrucoes)
+
+
+def _como_tuplas(valor):
+    if isinstance(valor, list):
+        return tuple(_como_tuplas(v) for v in valor)
+    return valor
+
+
+class GeradorIR(Transformer):
+    """
+    Converte a árvore sintática em um ProgramaIR, sem executar nada.
+
+    Os literais são convertidos aqui (uma única vez, ao compilar); a conversão de
+    sistemas densos para o formato esparso depende das opções do interpretador e
+    fica para a execução.
+    """
+
+    __visit_tokens__ = False
+
+    def __init__(self):
+        super().__init__()
+        self.arrays = []
+
+    def _array(self, array):
+        self.arrays.append(array)
+        return len(self.arrays) - 1
+
+    def programa(self, instrucoes):
+        return ProgramaIR(list(instrucoes), self.arrays)
+
+    @v_args(inline=True)
+    def declaracao(self, tipo_token, nome_var_token, operador_token, valor):
+        if isinstance(valor, Token):
+            valor = ('numero', converter_numero(valor)) if valor.type == 'TK_NUMERO' else ('ref', valor.value)
+        elif isinstance(valor, np.ndarray):
+            valor = ('vetor', self._array(valor))
+        return ('declarar', nome_var_token.line, tipo_token.children[0].value, nome_var_token.value, valor)
+
+    def valor(self, v):
+        return v[0]
+
+    def sistema(self, equacoes):
+        try:
+            return ('sistema', self._array(empilhar_equacoes(equacoes)))
+        except Exception as e:
+            return ('erro', str(e))
+
+    def sistema_esparso(self, itens):
+        try:
+            linhas, colunas, triplas = converter_triplas(itens)
+        except Exception as e:
+            return ('erro', str(e))
+        return ('esparsa', linhas, colunas, self._array(triplas))
+
+    def carga(self, itens):
+        try:
+            token_caminho, caminho, forma = converter_carga(itens)
+        except Exception as e:
+            return ('erro', str(e))
+        return ('carga', caminho, forma, token_caminho.line)
+
+    def equacao(self, numeros):
+        return converter_equacao(numeros)
+
+    @v_args(inline=True)
+    def funcao_chamada(self, func_token, nome_var_token, *args_extras):
+        nomes_termos = tuple(t.value for t in args_extras if t.type == 'ID')
+        return ('chamada', func_token.children[0].value, nome_var_token.value, nomes_termos, nome_var_token.line)
+
+    def comando(self, items):
+        func_token = items[0].children[0]
+        id_token = items[1] if isinstance(items[1], Token) and items[1].type == 'ID' else None
+        linha = id_token.line if id_token is not None else func_token.line
+        return ('comando', linha, func_token.value, id_token.value if id_token is not None else None)
+
+
+def compilar_arvore(tree):
+    """
+    Gera o ProgramaIR de uma árvore sintática PRO-SIS.
+
+    Args:
+        tree (Tree): Árvore produzida pelo parser Lark
+
+    Returns:
+        ProgramaIR: Programa compilado
+    """
+    return GeradorIR().transform(tree)
+
+
+class CacheIR:
+    """
+    Cache de programas compilados, em memória e em disco, como os arquivos .pyc.
+
+    A chave é o hash do código fonte, da gramática e de VERSAO_IR: um programa
+    inalterado é executado sem passar pelo lexer nem pelo parser.
+
+    Attributes:
+        diretorio (str): Diretório dos arquivos '<hash>.psir' (None desativa o disco)
+        limite_memoria (int): Número de programas mantidos em memória (LRU)
+    """
+
+    def __init__(self, diretorio, gramatica, limite_memoria=64):
+        self.diretorio = diretorio
+        self.limite_memoria = limite_memoria
+        self._prefixo = hashlib.sha256(f"{VERSAO_IR}\0{gramatica}\0".encode('utf-8'))
+        self._memoria = OrderedDict()
+        if diretorio is not None:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def chave(self, codigo):
+        h = self._prefixo.copy()
+        h.update(codigo.encode('utf-8'))
+        return h.hexdigest()
+
+    def obter(self, codigo, compilar):
+        """
+        Retorna o programa compilado de 'codigo', compilando-o apenas se não estiver em cache.
+
+        Args:
+            codigo (str): Código fonte PRO-SIS
+            compilar (callable): Função que recebe o código e retorna um ProgramaIR
+
+        Returns:
+            ProgramaIR: Programa compilado
+        """
+        chave = self.chave(codigo)
+        programa = self._memoria.get(chave)
+        if programa is not None:
+            self._memoria.move_to_end(chave)
+            return programa
+
+        caminho = os.path.join(self.diretorio, f"{chave[:32]}.psir") if self.diretorio is not None else None
+        if caminho is not None and os.path.isfile(caminho):
+            try:
+                programa = ProgramaIR.carregar(caminho)
+            except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+                # Arquivo truncado ou corrompido: tratado como ausente e recompilado
+                programa = None
+        if programa is None:
+            programa = compilar(codigo)
+            if caminho is not None:
+                programa.salvar(caminho)
+
+        self._memoria[chave] = programa
+        if len(self._memoria) > self.limite_memoria:
+            self._memoria.popitem(last=False)
+        return programa
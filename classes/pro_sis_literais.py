@@ -0,0 +1,143 @@
+import re
+
+import numpy as np
+from lark import Token
+
+# Partes de uma TK_LINHA_NUMERICA, com os terminais da forma token a token
+_PARTES_LINHA = re.compile(r'-?\d+(?:\.\d+)?|[\[\],]')
+_TIPOS_PARTES = {'[': 'TK_DELIM_INIT_EQ', ']': 'TK_DELIM_END_EQ', ',': 'TK_DELIM_MULT'}
+
+
+def converter_numero(token):
+    """Converte um TK_NUMERO para int (se não tiver parte fracionária) ou float."""
+    valor = float(token.value)
+    return int(valor) if valor.is_integer() else valor
+
+
+def converter_equacao(numeros):
+    """
+    Converte os tokens de uma equação para um vetor float64.
+
+    Uma linha numérica reconhecida inteira pelo lexer (TK_LINHA_NUMERICA) é lida
+    de uma vez por np.fromstring; a forma token a token converte todos os
+    TK_NUMERO em uma única chamada ao numpy.
+
+    Args:
+        numeros (list): Tokens da regra 'equacao'
+
+    Returns:
+        np.ndarray: Vetor com os números da equação
+    """
+    if len(numeros) == 1 and numeros[0].type == 'TK_LINHA_NUMERICA':
+        return np.fromstring(numeros[0].value[1:-1], dtype=np.float64, sep=',')
+    return np.array([n.value for n in numeros if n.type == 'TK_NUMERO'], dtype=np.float64)
+
+
+def expandir_linha_numerica(token):
+    """
+    Divide uma TK_LINHA_NUMERICA nos tokens da forma token a token ('[', números, ',' e ']').
+
+    Usado apenas pelos diagnósticos (árvore sintática e arquivo de tokens), que
+    continuam mostrando um token por lexema; a execução lê a linha inteira.
+
+    Args:
+        token (Token): Token TK_LINHA_NUMERICA
+
+    Returns:
+        list: Tokens com as posições (linha, coluna) de cada parte no código fonte
+    """
+    partes = []
+    for m in _PARTES_LINHA.finditer(token.value):
+        anteriores = token.value[:m.start()]
+        quebras = anteriores.count('\n')
+        linha = token.line + quebras
+        coluna = token.column + m.start() if not quebras else m.start() - anteriores.rindex('\n')
+        fim = m.end() - m.start()
+        partes.append(Token(_TIPOS_PARTES.get(m.group(), 'TK_NUMERO'), m.group(), token.start_pos + m.start(),
+                            linha, coluna, linha, coluna + fim, token.start_pos + m.end()))
+    return partes
+
+
+def expandir_tokens(tokens):
+    """Tokens com cada TK_LINHA_NUMERICA dividida (ver 'expandir_linha_numerica')."""
+    for token in tokens:
+        if token.type == 'TK_LINHA_NUMERICA':
+            yield from expandir_linha_numerica(token)
+        else:
+            yield token
+
+
+def expandir_arvore(arvore):
+    """Divide, na própria árvore, as TK_LINHA_NUMERICA das regras 'equacao' (ver 'expandir_linha_numerica')."""
+    for subarvore in arvore.iter_subtrees():
+        if subarvore.data == 'equacao':
+            subarvore.children = list(expandir_tokens(subarvore.children))
+    return arvore
+
+
+def empilhar_equacoes(equacoes):
+    """
+    Copia as equações (vetores float64) para uma matriz pré-alocada.
+
+    Args:
+        equacoes (list): Filhos da regra 'sistema'; apenas os np.ndarray são usados
+
+    Returns:
+        np.ndarray: Matriz densa com uma equação por linha
+
+    Raises:
+        Exception: Se as equações não tiverem o mesmo número de elementos
+    """
+    linhas = [n for n in equacoes if isinstance(n, np.ndarray)]
+    colunas = linhas[0].shape[0]
+    if any(linha.shape[0] != colunas for linha in linhas):
+        raise Exception("Erro Sintático: Todas as linhas em um sistema devem ter o mesmo número de elementos.")
+
+    matriz = np.empty((len(linhas), colunas), dtype=np.float64)
+    for i, linha in enumerate(linhas):
+        matriz[i] = linha
+    return matriz
+
+
+def converter_triplas(itens):
+    """
+    Lê as dimensões e as triplas de 'sparse(m, n) {(i, j, v), ...}'.
+
+    Args:
+        itens (list): Tokens da regra 'sistema_esparso'
+
+    Returns:
+        tuple: (linhas, colunas, triplas), com as triplas em uma matriz k x 3
+
+    Raises:
+        Exception: Se as dimensões não forem inteiros positivos
+    """
+    linhas, colunas = (float(t.value) for t in itens if t.type == 'TK_NUMERO')
+    if not (linhas.is_integer() and colunas.is_integer() and linhas > 0 and colunas > 0):
+        raise Exception("Erro Semântico: As dimensões de um sistema esparso devem ser inteiros positivos.")
+    texto = ','.join(t.value[1:-1] for t in itens if t.type == 'TK_TRIPLA')
+    triplas = np.fromstring(texto, dtype=np.float64, sep=',').reshape(-1, 3)
+    return int(linhas), int(colunas), triplas
+
+
+def converter_carga(itens):
+    """
+    Lê o caminho e as dimensões opcionais de 'load("arquivo", linhas, colunas)'.
+
+    Args:
+        itens (list): Tokens da regra 'carga'
+
+    Returns:
+        tuple: (token do caminho, caminho sem aspas, forma ou None)
+
+    Raises:
+        Exception: Se as dimensões não forem inteiros positivos
+    """
+    token_caminho = next(t for t in itens if t.type == 'TK_TEXTO')
+    dimensoes = [float(t.value) for t in itens if t.type == 'TK_NUMERO']
+    forma = None
+    if dimensoes:
+        if not all(d.is_integer() and d > 0 for d in dimensoes):
+            raise Exception("Erro Semântico: As dimensões em 'load' devem ser inteiros positivos.")
+        forma = tuple(int(d) for d in dimensoes)
+    return token_caminho, token_caminho.value[1:-1], forma
@@ -0,0 +1,223 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pro_sis_interpreter import ProSisCompiler
+from pro_sis_paralelo import threads_blas_padrao
+
+GRAMATICA_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pro_sis_grammar.lark")
+
+# Compilador do processo trabalhador, construído uma única vez por inicializar_trabalhador
+_compilador = None
+_guardar_saida = False
+_guardar_resultados = False
+
+
+def listar_programas(entrada):
+    """
+    Resolve a entrada do lote em uma lista ordenada de arquivos .psis.
+
+    Args:
+        entrada (str): Diretório (busca recursiva por *.psis), padrão glob ou
+                       manifesto (arquivo texto com um caminho por linha; linhas
+                       vazias ou iniciadas por '#' são ignoradas)
+
+    Returns:
+        list: Caminhos dos programas
+
+    Raises:
+        Exception: Se nenhum programa for encontrado
+    """
+    if os.path.isdir(entrada):
+        caminhos = glob.glob(os.path.join(entrada, "**", "*.psis"), recursive=True)
+    elif os.path.isfile(entrada) and not entrada.endswith(".psis"):
+        base = os.path.dirname(os.path.abspath(entrada))
+        with open(entrada, 'r', encoding='utf-8') as f:
+            linhas = [linha.strip() for linha in f]
+        caminhos = [linha if os.path.isabs(linha) else os.path.join(base, linha)
+                    for linha in linhas if linha and not linha.startswith('#')]
+    else:
+        caminhos = glob.glob(entrada, recursive=True)
+
+    if not caminhos:
+        raise Exception(f"Erro: Nenhum programa .psis encontrado em '{entrada}'.")
+    return sorted(caminhos)
+
+
+def inicializar_trabalhador(grammar_file, parser, opcoes_interpretador, guardar_saida, guardar_resultados=False,
+                            usar_ir=False, diretorio_incremental=None):
+    """
+    Constrói o compilador (gramática e tabelas do parser) uma vez por processo.
+
+    Com 'diretorio_incremental', o compilador roda no modo incremental e os processos
+    compartilham a memoização persistida nesse diretório.
+    """
+    global _compilador, _guardar_saida, _guardar_resultados
+    with contextlib.redirect_stdout(io.StringIO()):
+        _compilador = ProSisCompiler(grammar_file, parser=parser, opcoes_interpretador=opcoes_interpretador,
+                                     usar_ir=usar_ir, incremental=diretorio_incremental is not None,
+                                     diretorio_incremental=diretorio_incremental)
+    _guardar_saida = guardar_saida
+    _guardar_resultados = guardar_resultados
+
+
+def executar_programa(caminho):
+    """
+    Executa um programa com o compilador do processo atual, sem diagnósticos.
+
+    Args:
+        caminho (str): Caminho do arquivo .psis
+
+    Returns:
+        dict: Resultado estruturado ('arquivo', 'status', 'tempo_s', 'erro' e, se pedido, 'saida')
+    """
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+    except OSError as e:
+        return {'arquivo': caminho, 'status': 'erro', 'erro': str(e), 'tempo_s': 0.0}
+    return executar_codigo(codigo, caminho)
+
+
+def executar_codigo(codigo, caminho, reiniciar=True):
+    """
+    Executa um código PRO-SIS com o compilador do processo atual, capturando a saída impressa.
+
+    Args:
+        codigo (str): Código fonte PRO-SIS
+        caminho (str): Caminho associado ao código (nomeia o resultado e resolve 'load')
+        reiniciar (bool): Se False, mantém as variáveis de execuções anteriores no processo
+
+    Returns:
+        dict: Resultado estruturado ('arquivo', 'status', 'tempo_s', 'erro' e, se pedidos,
+              'saida' e 'resultados', com o valor de cada comando em JSON)
+    """
+    resultado = {'arquivo': caminho, 'status': 'ok', 'erro': None}
+    saida = io.StringIO()
+    inicio = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(saida):
+            if reiniciar:
+                _compilador.reiniciar()
+            resultados = _compilador.run(codigo, caminho, mostrar_arvore=False, salvar_tokens=False)
+        if _guardar_resultados:
+            resultado['resultados'] = [r.como_dict() for r in resultados]
+    except Exception as e:
+        resultado['status'] = 'erro'
+        resultado['erro'] = str(e).strip()
+    resultado['tempo_s'] = time.perf_counter() - inicio
+    if _guardar_saida:
+        resultado['saida'] = saida.getvalue()
+    return resultado
+
+
+def executar_lote(caminhos, workers=None, parser='lalr', grammar_file=GRAMATICA_PADRAO,
+                  opcoes_interpretador=None, guardar_saida=False, guardar_resultados=False, usar_ir=False,
+                  diretorio_incremental=None, threads_blas=None):
+    """
+    Executa vários programas PRO-SIS em um pool de processos.
+
+    Cada processo trabalhador constrói o ProSisCompiler uma única vez e o reutiliza
+    (com variáveis reiniciadas) para todos os programas que receber. Para os processos
+    não disputarem os núcleos, cada programa limita o BLAS a 'threads_blas' threads
+    (padrão: núcleos / processos; requer threadpoolctl).
+
+    Args:
+        caminhos (list): Arquivos .psis a executar
+        workers (int): Número de processos (None usa todos os núcleos; 1 executa no próprio processo)
+        parser (str): Algoritmo de análise sintática ('earley' ou 'lalr')
+        grammar_file (str): Caminho da gramática .lark
+        opcoes_interpretador (dict): Argumentos repassados ao ProSisInterpreter
+        guardar_saida (bool): Se True, inclui a saída impressa de cada programa no resumo;
+                              senão, nada é impresso (os valores continuam em 'resultados')
+        guardar_resultados (bool): Se True, inclui no resumo o valor de cada comando (JSON)
+        usar_ir (bool): Se True, executa os programas compilados em cache (ver ProSisCompiler.compilar)
+        diretorio_incremental (str): Diretório da memoização do modo incremental (None desativa)
+        threads_blas (int): Threads do BLAS por programa (None divide os núcleos entre os processos)
+
+    Returns:
+        dict: Resumo com totais e a lista de resultados por arquivo, na ordem de 'caminhos'
+    """
+    inicio = time.perf_counter()
+    n_workers = workers or os.cpu_count() or 1
+    opcoes_interpretador = dict(opcoes_interpretador or {})
+    opcoes_interpretador.setdefault('threads_blas', threads_blas or threads_blas_padrao(n_workers))
+    if not guardar_saida:
+        # A saída impressa seria descartada: os resultados não são formatados em texto
+        opcoes_interpretador.setdefault('saida_resultados', 'nula')
+        opcoes_interpretador.setdefault('verboso', False)
+    argumentos_inicializacao = (grammar_file, parser, opcoes_interpretador, guardar_saida, guardar_resultados, usar_ir,
+                                diretorio_incremental)
+
+    if workers == 1:
+        inicializar_trabalhador(*argumentos_inicializacao)
+        resultados = [executar_programa(caminho) for caminho in caminhos]
+    else:
+        # Blocos de tarefas reduzem a troca de mensagens com muitos programas pequenos
+        chunksize = max(1, min(64, len(caminhos) // (4 * n_workers)))
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=inicializar_trabalhador,
+                                 initargs=argumentos_inicializacao) as executor:
+            resultados = list(executor.map(executar_programa, caminhos, chunksize=chunksize))
+
+    falhas = sum(1 for r in resultados if r['status'] != 'ok')
+    return {
+        'total': len(resultados),
+        'sucesso': len(resultados) - falhas,
+        'falhas': falhas,
+        'tempo_total_s': time.perf_counter() - inicio,
+        'arquivos': resultados,
+    }
+
+
+def main():
+    """
+    Executa um lote de programas .psis e imprime (ou salva) o resumo em JSON.
+
+    Termina com código 1 se algum programa falhar.
+    """
+    cli_parser = argparse.ArgumentParser(description="Executa vários programas PRO-SIS em paralelo")
+    cli_parser.add_argument("entrada", help="Diretório, padrão glob (ex.: 'scripts/*.psis') ou manifesto com um caminho por linha.")
+    cli_parser.add_argument("--workers", type=int, default=None, help="Número de processos (padrão: número de núcleos).")
+    cli_parser.add_argument("--parser", choices=ProSisCompiler.PARSERS_SUPORTADOS, default="lalr",
+                            help="Algoritmo de análise sintática (padrão: lalr).")
+    cli_parser.add_argument("--resumo", default=None, help="Arquivo JSON onde salvar o resumo (padrão: saída padrão).")
+    cli_parser.add_argument("--guardar-saida", action="store_true", help="Inclui no resumo a saída impressa de cada programa.")
+    cli_parser.add_argument("--guardar-resultados", action="store_true",
+                            help="Inclui no resumo o valor de cada comando de cada programa.")
+    cli_parser.add_argument("--ir", action="store_true",
+                            help="Executa os programas compilados e guardados em cache (pula o parser em programas inalterados).")
+    cli_parser.add_argument("--incremental", default=None, metavar="DIR",
+                            help="Modo incremental: memoiza em DIR as instruções já executadas; reexecutar um lote "
+                                 "editado recalcula só o que mudou.")
+    cli_parser.add_argument("--threads-blas", type=int, default=None, metavar="N",
+                            help="Threads do BLAS por programa (padrão: núcleos / workers; requer threadpoolctl).")
+    args = cli_parser.parse_args()
+
+    try:
+        caminhos = listar_programas(args.entrada)
+    except Exception as e:
+        print(e)
+        sys.exit(2)
+
+    resumo = executar_lote(caminhos, workers=args.workers, parser=args.parser, guardar_saida=args.guardar_saida,
+                           guardar_resultados=args.guardar_resultados, usar_ir=args.ir,
+                           diretorio_incremental=args.incremental, threads_blas=args.threads_blas)
+    texto = json.dumps(resumo, ensure_ascii=False, indent=2)
+    if args.resumo:
+        with open(args.resumo, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+        print(f"{resumo['sucesso']}/{resumo['total']} programas executados com sucesso "
+              f"em {resumo['tempo_total_s']:.2f}s. Resumo salvo em '{args.resumo}'.")
+    else:
+        print(texto)
+    sys.exit(1 if resumo['falhas'] else 0)
+
+
+if __name__ == "__main__":
+    main()
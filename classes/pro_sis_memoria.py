@@ -0,0 +1,261 @@
+import os
+import re
+import tempfile
+import threading
+import weakref
+
+import numpy as np
+import scipy.sparse as sp
+
+UNIDADES = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+# Matrizes n x n criadas por cada função (fatoração, resultado e temporários), usadas
+# para verificar o limite de memória antes do cálculo
+MATRIZES_POR_FUNCAO = {
+    'solve': 1, 'det': 1, 'retD': 1,
+    'retP': 2, 'retL': 2, 'retU': 2,
+    'inv': 3,
+    'trans': 0,
+}
+
+# Arrays menores que isso não valem a escrita em disco
+TAMANHO_MINIMO_DESPEJO = 1024 ** 2
+
+
+def converter_tamanho(texto):
+    """
+    Converte um tamanho de memória ('512M', '2G', '1.5GiB', '1048576') para bytes.
+
+    Raises:
+        Exception: Se o texto não for um tamanho válido
+    """
+    m = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*', str(texto), re.IGNORECASE)
+    if m is None:
+        raise Exception(f"Erro: Tamanho de memória inválido: '{texto}'. Use, por exemplo, 512M ou 2G.")
+    return int(float(m.group(1)) * UNIDADES[m.group(2).upper()])
+
+
+def _raiz(array):
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def despejavel(valor):
+    """Indica se o valor é um array denso dono do próprio buffer, grande o bastante para ir para o disco."""
+    return (isinstance(valor, np.ndarray) and not isinstance(valor, np.memmap) and _raiz(valor) is valor
+            and valor.nbytes >= TAMANHO_MINIMO_DESPEJO)
+
+
+def buffers(valor):
+    """
+    Buffers de memória que mantêm um valor vivo.
+
+    Views (ex.: 'sis B = A', 'trans(A)', a matriz de coeficientes de um sistema)
+    apontam para o buffer do array original e são identificadas por ele.
+
+    Returns:
+        list: Tuplas (buffer, bytes, mapeado), com 'mapeado' True para arquivos
+              mapeados em memória ('load' de .npy/.bin, valores despejados em disco)
+    """
+    if sp.issparse(valor):
+        arrays = [getattr(valor, nome) for nome in ('data', 'indices', 'indptr', 'row', 'col', 'offsets')
+                  if isinstance(getattr(valor, nome, None), np.ndarray)]
+    elif isinstance(valor, np.ndarray):
+        arrays = [valor]
+    else:
+        return []
+    return [(raiz, raiz.nbytes, isinstance(raiz, np.memmap)) for raiz in map(_raiz, arrays)]
+
+
+class GerenciadorMemoria:
+    """
+    Contabilidade e limite de memória do workspace de um ProSisInterpreter.
+
+    A memória contada é a das variáveis, dos resultados guardados, da memoização do
+    modo incremental e do cache de fatorações. Buffers compartilhados entre variáveis
+    (cópias e views) são contados uma única vez; arquivos mapeados em memória são
+    informados à parte, pois o sistema operacional pode descartar suas páginas.
+
+    Com 'limite_bytes', o interpretador registra cada valor que entra no workspace
+    ('registrar') e chama 'aplicar_limite' antes de cada cálculo grande e depois de
+    cada declaração e comando. A verificação usa o total corrente dos buffers
+    registrados, em O(1); o relatório completo só é calculado quando esse total passa
+    do limite. Para voltar ao limite são liberados,
+    nesta ordem: fatorações em cache (LRU), valores da memoização em memória e, por
+    fim, os maiores resultados e variáveis densos, despejados em arquivos .npy em
+    disco e reabertos como mapas de memória somente leitura (o valor continua
+    acessível, apenas fora da RAM). Se nada disso bastar, a execução é interrompida
+    com um erro, em vez de o processo esgotar a memória da máquina.
+
+    Attributes:
+        limite_bytes (int): Memória máxima do workspace (None apenas contabiliza)
+        diretorio (str): Diretório dos valores despejados (None usa um diretório temporário)
+        bytes_despejados (int): Total de bytes despejados em disco
+        fatoracoes_descartadas (int): Bytes de fatorações descartados pelo limite
+        bytes_registrados (int): Bytes residentes dos buffers registrados ainda vivos
+    """
+
+    def __init__(self, limite_bytes=None, diretorio=None):
+        self.limite_bytes = limite_bytes
+        self.diretorio = diretorio
+        self.bytes_despejados = 0
+        self.fatoracoes_descartadas = 0
+        self._temporario = None
+        self._despejos = 0
+        self.bytes_registrados = 0
+        self._registrados = {}
+        self._trava = threading.RLock()
+
+    def registrar(self, valor):
+        """
+        Soma ao total corrente os buffers residentes do valor que ainda não foram contados.
+
+        Cada buffer é contado uma única vez e descontado quando é liberado (ao sair do
+        workspace e de qualquer outra referência). Como buffers liberados só saem do
+        total quando deixam de existir, o total nunca é menor que o do 'relatorio'.
+        """
+        with self._trava:
+            for raiz, n_bytes, mapeado in buffers(valor):
+                if mapeado or id(raiz) in self._registrados:
+                    continue
+                liberacao = weakref.finalize(raiz, self._liberar, id(raiz), n_bytes)
+                liberacao.atexit = False
+                self._registrados[id(raiz)] = liberacao
+                self.bytes_registrados += n_bytes
+
+    def _liberar(self, chave, n_bytes):
+        with self._trava:
+            self._registrados.pop(chave, None)
+            self.bytes_registrados -= n_bytes
+
+    def excesso(self, interpretador, adicional=0):
+        """
+        Bytes em que o workspace mais 'adicional' passa do limite (<= 0 se couber).
+
+        O total corrente (ver 'registrar') é verificado primeiro; o relatório completo,
+        que percorre todo o workspace, só é calculado quando ele passa do limite.
+        """
+        excesso = self.bytes_registrados + interpretador.fatoracoes.bytes_usados + adicional - self.limite_bytes
+        if excesso <= 0:
+            return excesso
+        return self.relatorio(interpretador)['total'] + adicional - self.limite_bytes
+
+    def relatorio(self, interpretador):
+        """
+        Memória atual do workspace.
+
+        Returns:
+            dict: Bytes de 'variaveis', 'resultados', 'memo' e 'fatoracoes', o 'total'
+                  residente, a memória 'compartilhada' (economizada por views e cópias
+                  entre variáveis) e a 'mapeada' em arquivos
+        """
+        vistos = {}
+        compartilhada = 0
+
+        def contar(valores):
+            nonlocal compartilhada
+            total = 0
+            for valor in valores:
+                for raiz, n_bytes, mapeado in buffers(valor):
+                    if id(raiz) in vistos:
+                        compartilhada += 0 if mapeado else n_bytes
+                        continue
+                    vistos[id(raiz)] = (raiz, n_bytes, mapeado)
+                    total += 0 if mapeado else n_bytes
+            return total
+
+        variaveis = contar(simbolo.valor for simbolo in interpretador.vars.values())
+        resultados = contar(r.valor for r in interpretador.resultados)
+        memo = contar(interpretador.memo.valores()) if interpretador.memo is not None else 0
+        fatoracoes = interpretador.fatoracoes.bytes_usados
+        return {
+            'variaveis': variaveis,
+            'resultados': resultados,
+            'memo': memo,
+            'fatoracoes': fatoracoes,
+            'total': variaveis + resultados + memo + fatoracoes,
+            'compartilhada': compartilhada,
+            'mapeada': sum(n for _, n, mapeado in vistos.values() if mapeado),
+            'despejada': self.bytes_despejados,
+        }
+
+    def aplicar_limite(self, interpretador, adicional=0, descricao=None):
+        """
+        Libera memória até que o workspace mais 'adicional' bytes caibam no limite.
+
+        Args:
+            interpretador (ProSisInterpreter): Interpretador cujo workspace é verificado
+            adicional (int): Bytes que o próximo cálculo deve alocar
+            descricao (str): Cálculo que precisa de 'adicional' (usado no erro)
+
+        Raises:
+            Exception: Se o limite não puder ser respeitado
+        """
+        if self.limite_bytes is None:
+            return
+        excesso = self.excesso(interpretador, adicional)
+        if excesso <= 0:
+            return
+
+        fatoracoes = interpretador.fatoracoes
+        if fatoracoes.bytes_usados:
+            antes = fatoracoes.bytes_usados
+            fatoracoes.reduzir(max(0, antes - excesso))
+            self.fatoracoes_descartadas += antes - fatoracoes.bytes_usados
+            excesso -= antes - fatoracoes.bytes_usados
+        if excesso > 0 and interpretador.memo is not None and len(interpretador.memo):
+            interpretador.memo.limpar()
+            excesso = self.relatorio(interpretador)['total'] + adicional - self.limite_bytes
+
+        for valor in self._candidatos(interpretador) if excesso > 0 else ():
+            self._despejar_referencias(interpretador, valor)
+            # Views de outro valor mantêm o buffer original vivo: mede de novo
+            excesso = self.relatorio(interpretador)['total'] + adicional - self.limite_bytes
+            if excesso <= 0:
+                break
+
+        if excesso > 0:
+            necessario = self.relatorio(interpretador)['total'] + adicional
+            alvo = descricao or "o workspace"
+            raise Exception(f"Erro: Limite de memória excedido: {alvo} precisa de {necessario / 1024 ** 2:.1f} MiB, "
+                            f"mas o limite é {self.limite_bytes / 1024 ** 2:.1f} MiB.")
+
+    @staticmethod
+    def _candidatos(interpretador):
+        # Arrays densos que são donos do próprio buffer, do maior para o menor
+        valores = {}
+        for valor in [s.valor for s in interpretador.vars.values()] + [r.valor for r in interpretador.resultados]:
+            if despejavel(valor):
+                valores[id(valor)] = valor
+        return sorted(valores.values(), key=lambda v: v.nbytes, reverse=True)
+
+    def _despejar_referencias(self, interpretador, valor):
+        mapeado = self.despejar(valor)
+        for nome, simbolo in interpretador.vars.items():
+            if simbolo.valor is valor:
+                simbolo.definir(mapeado)
+                interpretador._log(f"-> Memória: variável '{nome}' ({valor.nbytes / 1024 ** 2:.1f} MiB) despejada em disco.")
+        for resultado in interpretador.resultados:
+            if resultado.valor is valor:
+                resultado.valor = mapeado
+
+    def despejar(self, array):
+        """
+        Grava o array em um arquivo .npy e o reabre mapeado em memória, somente leitura.
+
+        Returns:
+            np.memmap: Array com o mesmo conteúdo, fora da RAM
+        """
+        if self.diretorio is None:
+            if self._temporario is None:
+                self._temporario = tempfile.TemporaryDirectory(prefix='pro_sis_')
+            diretorio = self._temporario.name
+        else:
+            os.makedirs(self.diretorio, exist_ok=True)
+            diretorio = self.diretorio
+        self._despejos += 1
+        caminho = os.path.join(diretorio, f"despejo_{os.getpid()}_{self._despejos}.npy")
+        np.save(caminho, array)
+        self.bytes_despejados += array.nbytes
+        return np.load(caminho, mmap_mode='r')
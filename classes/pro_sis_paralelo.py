@@ -0,0 +1,413 @@
+import contextlib
+import copy
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pro_sis_fatoracao import CacheFatoracoes
+from pro_sis_grafo import dependencias
+from pro_sis_memoria import GerenciadorMemoria, buffers, despejavel
+from pro_sis_simbolos import Simbolo, verificar_programa
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # dependência opcional: sem ela o BLAS usa seu próprio número de threads
+    threadpool_limits = None
+
+# Indica se 'limitar_threads_blas' consegue alterar o BLAS já carregado pelo NumPy
+LIMITE_BLAS_DISPONIVEL = threadpool_limits is not None
+
+
+def limitar_threads_blas(threads):
+    """
+    Contexto que limita o número de threads do BLAS/LAPACK usado pelo NumPy e pelo SciPy.
+
+    Usa o threadpoolctl, que ajusta a biblioteca já carregada e restaura o valor
+    anterior ao sair do bloco. Sem o threadpoolctl instalado, o limite não é aplicado.
+
+    Args:
+        threads (int): Número máximo de threads por chamada ao BLAS (None não altera nada)
+    """
+    if threads is None or threadpool_limits is None:
+        return contextlib.nullcontext()
+    return threadpool_limits(limits=threads, user_api='blas')
+
+
+def threads_blas_padrao(concorrentes):
+    """Threads do BLAS por tarefa quando 'concorrentes' tarefas dividem os núcleos da máquina."""
+    return max(1, (os.cpu_count() or 1) // max(1, concorrentes))
+
+
+class RelatorioEscalonador:
+    """
+    O que o EscalonadorParalelo executou, em que thread e ao lado de quê.
+
+    O nível de uma instrução é o comprimento do maior caminho de dependências até
+    ela: instruções do mesmo nível não dependem umas das outras e podem rodar juntas.
+
+    Attributes:
+        threads (int): Threads do pool
+        threads_blas (int): Limite de threads do BLAS por chamada (None = padrão da biblioteca)
+        instrucoes (list): Um dict por instrução executada ('indice', 'linha', 'descricao',
+                           'nivel', 'thread', 'inicio_s', 'fim_s')
+        tempo_total_s (float): Tempo de relógio da execução
+    """
+
+    def __init__(self, threads, threads_blas):
+        self.threads = threads
+        self.threads_blas = threads_blas
+        self.instrucoes = []
+        self.tempo_total_s = 0.0
+
+    def simultaneas_max(self):
+        """Maior número de instruções em execução ao mesmo tempo."""
+        marcos = sorted([(i['inicio_s'], 1) for i in self.instrucoes] + [(i['fim_s'], -1) for i in self.instrucoes])
+        maximo = atual = 0
+        for _, delta in marcos:
+            atual += delta
+            maximo = max(maximo, atual)
+        return maximo
+
+    def como_dict(self):
+        return {'threads': self.threads, 'threads_blas': self.threads_blas,
+                'limite_blas_aplicado': LIMITE_BLAS_DISPONIVEL and self.threads_blas is not None,
+                'tempo_total_s': self.tempo_total_s, 'simultaneas_max': self.simultaneas_max(),
+                'instrucoes': sorted(self.instrucoes, key=lambda i: i['indice'])}
+
+    def imprimir(self):
+        """Imprime as instruções agrupadas por nível, com thread, início e duração."""
+        print("------- Escalonamento Paralelo --------")
+        if self.threads_blas is None:
+            blas = "padrão da biblioteca"
+        elif LIMITE_BLAS_DISPONIVEL:
+            blas = f"{self.threads_blas} por chamada"
+        else:
+            blas = f"{self.threads_blas} por chamada (não aplicado: threadpoolctl não instalado)"
+        print(f"Threads: {self.threads} | Threads do BLAS: {blas}")
+        print(f"{'Nível':>5} {'Linha':>6} {'Instrução':<28} {'Thread':<12} {'Início (ms)':>12} {'Duração (ms)':>13}")
+        for i in sorted(self.instrucoes, key=lambda i: (i['nivel'], i['indice'])):
+            print(f"{i['nivel']:>5} {i['linha'] if i['linha'] is not None else '-':>6} {i['descricao']:<28} "
+                  f"{i['thread']:<12} {i['inicio_s'] * 1e3:12.3f} {(i['fim_s'] - i['inicio_s']) * 1e3:13.3f}")
+        soma = sum(i['fim_s'] - i['inicio_s'] for i in self.instrucoes)
+        niveis = len({i['nivel'] for i in self.instrucoes})
+        print(f"\n{len(self.instrucoes)} instrução(ões) em {niveis} nível(is); até {self.simultaneas_max()} ao mesmo tempo.")
+        if self.tempo_total_s > 0:
+            print(f"Soma das durações: {soma * 1e3:.3f} ms; relógio: {self.tempo_total_s * 1e3:.3f} ms "
+                  f"(paralelismo efetivo {soma / self.tempo_total_s:.2f}x).")
+        print("---------------------------------------\n")
+
+
+class _FatoracoesVersionadas:
+    """
+    Visão do cache de fatorações para uma instrução executada em paralelo.
+
+    No cache do interpretador as fatorações são indexadas pelo nome da variável, que
+    pode ser redeclarada enquanto instruções anteriores ainda rodam; aqui a chave
+    inclui a declaração (índice no programa) de onde veio o valor lido.
+    """
+
+    def __init__(self, cache, versoes):
+        self.cache = cache
+        self.versoes = versoes
+        self.limite_bytes = cache.limite_bytes
+
+    def obter(self, nome_var, tipo, A, *argumentos):
+        return self.cache.obter((nome_var, self.versoes.get(nome_var)), tipo, A, *argumentos)
+
+    def invalidar(self, nome_var):
+        # Cada declaração é uma nova versão: nada a invalidar
+        pass
+
+
+class _OrcamentoMemoria:
+    """
+    Limite de memória do workspace (--limite-memoria) compartilhado pelas instruções em paralelo.
+
+    Além do workspace do interpretador, conta a memória reservada pelos cálculos em
+    andamento (ver ProSisInterpreter._reservar_memoria), os valores já calculados que
+    ainda não foram aplicados e as fatorações da execução. Um cálculo só começa se tudo
+    isso, mais o que ele vai alocar, couber no limite. Para caber são liberadas, nesta
+    ordem: as fatorações da execução, os valores pendentes (despejados em disco) e a
+    memória do workspace (GerenciadorMemoria.aplicar_limite). Se não bastar, o cálculo
+    espera os que estão em andamento terminarem; sem nenhum em andamento, o erro de
+    limite excedido é lançado, como na execução sequencial. O workspace só é lido e
+    alterado com a condição adquirida.
+    """
+
+    def __init__(self, interpretador, fatoracoes):
+        self.interpretador = interpretador
+        self.fatoracoes = fatoracoes
+        self.condicao = threading.Condition()
+        self.em_calculo = 0
+        self.pendentes = 0
+        self.execucoes = {}
+
+    def _extra(self, adicional):
+        return self.em_calculo + self.pendentes + self.fatoracoes.bytes_usados + adicional
+
+    def _excesso(self, adicional):
+        return self.interpretador.memoria.excesso(self.interpretador, self._extra(adicional))
+
+    def reservar(self, adicional, descricao):
+        with self.condicao:
+            while True:
+                excesso = self._excesso(adicional)
+                if excesso > 0 and self.fatoracoes.bytes_usados:
+                    self.fatoracoes.reduzir(max(0, self.fatoracoes.bytes_usados - excesso))
+                    excesso = self._excesso(adicional)
+                if excesso > 0:
+                    self._despejar_pendentes(excesso)
+                try:
+                    self.interpretador.memoria.aplicar_limite(self.interpretador, self._extra(adicional), descricao)
+                    break
+                except Exception:
+                    if not self.em_calculo:
+                        raise
+                    self.condicao.wait()
+            self.em_calculo += adicional
+
+    def _despejar_pendentes(self, excesso):
+        for execucao in sorted(self.execucoes.values(), key=lambda e: e.pendente, reverse=True):
+            simbolo = execucao.valor if isinstance(execucao.valor, Simbolo) else None
+            valor = simbolo.valor if simbolo is not None else execucao.valor
+            if not despejavel(valor):
+                continue
+            mapeado = self.interpretador.memoria.despejar(valor)
+            if simbolo is not None:
+                simbolo.definir(mapeado)
+            else:
+                execucao.valor = mapeado
+            self.pendentes -= execucao.pendente
+            excesso -= execucao.pendente
+            execucao.pendente = 0
+            if excesso <= 0:
+                break
+
+    def concluir(self, reservado, execucao):
+        """Troca a reserva de um cálculo terminado pelo valor que ele produziu, até ser aplicado."""
+        with self.condicao:
+            self.em_calculo -= reservado
+            self.pendentes += execucao.pendente
+            self.execucoes[id(execucao)] = execucao
+            self.condicao.notify_all()
+
+    def aplicado(self, execucao):
+        self.execucoes.pop(id(execucao), None)
+        self.pendentes -= execucao.pendente
+
+
+class _MemoriaInstrucao:
+    """Gerenciador de memória da cópia do interpretador que executa uma instrução em paralelo."""
+
+    def __init__(self, orcamento):
+        self.orcamento = orcamento
+        self.limite_bytes = orcamento.interpretador.memoria.limite_bytes
+        self.reservado = 0
+
+    def aplicar_limite(self, interpretador, adicional=0, descricao=None):
+        # Sem 'adicional' é a verificação depois da instrução, feita em _aplicar
+        if adicional:
+            self.orcamento.reservar(adicional, descricao)
+            self.reservado += adicional
+
+    def registrar(self, valor):
+        # O valor é contado pelo orçamento (pendente) e registrado no workspace em _aplicar
+        pass
+
+
+def _bytes_novos(valor, entradas):
+    """Bytes residentes do valor que não são views das entradas da instrução."""
+    if valor is None:
+        return 0
+    compartilhados = {id(raiz) for entrada in entradas for raiz, _, _ in buffers(entrada.valor)}
+    return sum(n_bytes for raiz, n_bytes, mapeado in buffers(getattr(valor, 'valor', valor))
+               if not mapeado and id(raiz) not in compartilhados)
+
+
+class _Execucao:
+    __slots__ = ('valor', 'mensagens', 'erro', 'thread', 'inicio_s', 'fim_s', 'pendente')
+
+    def __init__(self, valor, mensagens, erro, thread, inicio_s, fim_s):
+        self.valor = valor
+        self.mensagens = mensagens
+        self.erro = erro
+        self.thread = thread
+        self.inicio_s = inicio_s
+        self.fim_s = fim_s
+        self.pendente = 0
+
+
+class EscalonadorParalelo:
+    """
+    Executa um ProgramaIR em um pool de threads, respeitando as dependências de dados.
+
+    Uma instrução é enviada ao pool assim que as declarações que ela lê terminam
+    (grafo de pro_sis_grafo.dependencias); instruções independentes rodam ao mesmo
+    tempo, e o NumPy/SciPy liberam o GIL durante as chamadas ao BLAS/LAPACK. Cada
+    instrução roda em uma cópia rasa do interpretador que enxerga apenas os valores
+    que lê, na versão correta mesmo que a variável seja redeclarada depois.
+
+    O efeito visível é o da execução sequencial: mensagens, declarações em 'vars' e
+    resultados dos comandos são aplicados na ordem do programa, e um erro interrompe a
+    execução na instrução que falhou (as anteriores são aplicadas, as seguintes não).
+    O limite de memória do workspace vale para o conjunto das instruções em andamento
+    (ver _OrcamentoMemoria).
+
+    Attributes:
+        interpretador (ProSisInterpreter): Interpretador cujo estado é atualizado
+        threads (int): Threads do pool
+        relatorio (RelatorioEscalonador): O que rodou em paralelo
+    """
+
+    def __init__(self, interpretador, threads):
+        self.interpretador = interpretador
+        self.threads = threads
+        self.relatorio = RelatorioEscalonador(threads, interpretador.threads_blas)
+        self.orcamento = None
+
+    def executar(self, programa):
+        """
+        Executa o programa, aplicando seu efeito ao interpretador.
+
+        Raises:
+            Exception: O erro da primeira instrução (na ordem do programa) que falhar
+        """
+        instrucoes = programa.instrucoes
+        grafo = dependencias(programa)
+        faltando = []
+        dependentes = [[] for _ in instrucoes]
+        niveis = []
+        for i, leitura in enumerate(grafo):
+            origens = {d for _, d in leitura if d is not None}
+            faltando.append(len(origens))
+            for d in origens:
+                dependentes[d].append(i)
+            niveis.append(1 + max((niveis[d] for d in origens), default=-1))
+
+        # Valores de variáveis declaradas antes deste programa (ex.: sessões do servidor)
+        existentes = dict(self.interpretador.vars)
+        verificadas = verificar_programa(programa, existentes)
+        # Fatorações indexadas por versão (ver _FatoracoesVersionadas), descartadas ao final
+        fatoracoes = CacheFatoracoes(self.interpretador.fatoracoes.limite_bytes)
+        self.orcamento = None
+        if self.interpretador.memoria.limite_bytes is not None:
+            self.orcamento = _OrcamentoMemoria(self.interpretador, fatoracoes)
+        entradas = {}
+        concluidas = {}
+        prontas = deque(i for i, n in enumerate(faltando) if n == 0)
+        limite = len(instrucoes)
+        proxima = 0
+        origem = time.perf_counter()
+
+        pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='pro_sis')
+        try:
+            em_execucao = {}
+            while proxima < limite:
+                while prontas:
+                    i = prontas.popleft()
+                    if i < limite:
+                        visiveis = {nome: entradas[d] if d is not None else existentes.get(nome)
+                                    for nome, d in grafo[i]}
+                        futuro = pool.submit(self._executar_instrucao, programa, i, grafo[i], visiveis,
+                                             fatoracoes, origem, verificadas[i])
+                        em_execucao[futuro] = i
+                if not em_execucao:
+                    break
+                feitas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in feitas:
+                    i = em_execucao.pop(futuro)
+                    execucao = concluidas[i] = futuro.result()
+                    self.relatorio.instrucoes.append(self._linha_relatorio(instrucoes[i], i, niveis[i], execucao))
+                    if execucao.erro is not None:
+                        limite = min(limite, i)
+                        continue
+                    if instrucoes[i][0] == 'declarar':
+                        entradas[i] = execucao.valor
+                    for j in dependentes[i]:
+                        faltando[j] -= 1
+                        if faltando[j] == 0:
+                            prontas.append(j)
+                while proxima < limite and proxima in concluidas:
+                    self._aplicar(instrucoes[proxima], concluidas.pop(proxima))
+                    proxima += 1
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.relatorio.tempo_total_s = time.perf_counter() - origem
+
+        if limite < len(instrucoes):
+            execucao = concluidas[limite]
+            for mensagem in execucao.mensagens:
+                print(mensagem)
+            raise execucao.erro
+
+    def _executar_instrucao(self, programa, indice, leitura, visiveis, fatoracoes, origem, verificada):
+        instrucao = programa.instrucoes[indice]
+        interpretador = copy.copy(self.interpretador)
+        interpretador.vars = {nome: entrada for nome, entrada in visiveis.items() if entrada is not None}
+        interpretador.fatoracoes = _FatoracoesVersionadas(fatoracoes, dict(leitura))
+        interpretador.preguicoso = False
+        interpretador.memo = None
+        # O limite vale para o workspace real mais as instruções em andamento (ver _OrcamentoMemoria)
+        if self.orcamento is not None:
+            interpretador.memoria = _MemoriaInstrucao(self.orcamento)
+        else:
+            interpretador.memoria = GerenciadorMemoria()
+        interpretador._mensagens = []
+
+        inicio = time.perf_counter() - origem
+        valor = erro = None
+        try:
+            if instrucao[0] == 'declarar':
+                interpretador.declarar_ir(instrucao, programa.arrays, verificada)
+                valor = interpretador.vars[instrucao[3]]
+            else:
+                _, linha, nome_funcao, nome_var = instrucao
+                if nome_var is None:
+                    raise Exception("Erro Sintático: Comando mal formado. Esperado: funcao_comando ID end_comando")
+                with interpretador._medir('comando', nome_funcao, linha):
+                    valor = interpretador.calcular_comando(nome_funcao, nome_var, verificada)
+        except Exception as e:
+            erro = e
+        fim = time.perf_counter() - origem
+        execucao = _Execucao(valor, interpretador._mensagens, erro, threading.current_thread().name, inicio, fim)
+        if self.orcamento is not None:
+            if erro is None:
+                execucao.pendente = _bytes_novos(valor, [v for v in visiveis.values() if v is not None])
+            self.orcamento.concluir(interpretador.memoria.reservado, execucao)
+        return execucao
+
+    def _aplicar(self, instrucao, execucao):
+        if self.orcamento is None:
+            self._aplicar_valor(instrucao, execucao)
+            return
+        with self.orcamento.condicao:
+            self.orcamento.aplicado(execucao)
+            self._aplicar_valor(instrucao, execucao)
+            self.orcamento.condicao.notify_all()
+
+    def _aplicar_valor(self, instrucao, execucao):
+        for mensagem in execucao.mensagens:
+            print(mensagem)
+        if instrucao[0] == 'declarar':
+            nome_var = instrucao[3]
+            self.interpretador.vars[nome_var] = execucao.valor
+            self.interpretador.fatoracoes.invalidar(nome_var)
+            self.interpretador._verificar_memoria(execucao.valor.valor)
+        else:
+            _, linha, nome_funcao, nome_var = instrucao
+            self.interpretador._registrar_resultado(nome_funcao, nome_var, linha, execucao.valor)
+
+    @staticmethod
+    def _linha_relatorio(instrucao, indice, nivel, execucao):
+        if instrucao[0] == 'declarar':
+            expressao = instrucao[4]
+            if expressao[0] == 'chamada':
+                descricao = f"{instrucao[3]} = {expressao[1]}({', '.join([expressao[2], *expressao[3]])})"
+            else:
+                descricao = f"{instrucao[3]} = {expressao[0]}"
+        else:
+            descricao = f"{instrucao[2]} {instrucao[3]}"
+        return {'indice': indice, 'linha': instrucao[1], 'descricao': descricao, 'nivel': nivel,
+                'thread': execucao.thread, 'inicio_s': execucao.inicio_s, 'fim_s': execucao.fim_s}
@@ -0,0 +1,206 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class Evento:
+    """
+    Intervalo medido pelo Perfilador.
+
+    Attributes:
+        nome (str): Nome do evento (fase, função ou variável)
+        categoria (str): Grupo do evento ('fase', 'comando', 'funcao_chamada', ...)
+        linha (int): Linha do código fonte PRO-SIS (None para fases)
+        inicio_s (float): Início, em segundos desde a criação do perfilador
+        parede_s (float): Tempo de relógio
+        cpu_s (float): Tempo de CPU do processo
+        pico_bytes (int): Pico de memória alocada durante o evento (None sem tracemalloc)
+        thread (int): Identificador da thread que executou o evento
+    """
+
+    __slots__ = ('nome', 'categoria', 'linha', 'inicio_s', 'parede_s', 'cpu_s', 'pico_bytes', 'thread')
+
+    def __init__(self, nome, categoria, linha, inicio_s, parede_s, cpu_s, pico_bytes, thread):
+        self.nome = nome
+        self.categoria = categoria
+        self.linha = linha
+        self.inicio_s = inicio_s
+        self.parede_s = parede_s
+        self.cpu_s = cpu_s
+        self.pico_bytes = pico_bytes
+        self.thread = thread
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+class Perfilador:
+    """
+    Registra tempo de relógio, tempo de CPU e pico de memória de trechos da execução.
+
+    É passado ao ProSisCompiler (e, por ele, ao ProSisInterpreter), que mede a carga
+    da gramática, a análise sintática, a análise léxica, a transformação e cada
+    declaração, chamada de função e comando, com a linha correspondente do .psis.
+
+    O pico de memória usa o tracemalloc, que também acompanha as alocações do NumPy;
+    ele deixa a execução visivelmente mais lenta e pode ser desligado com memoria=False.
+    O tracemalloc mede o processo inteiro: com instruções executadas em paralelo, o
+    pico de um evento inclui as alocações das outras threads no mesmo intervalo.
+    No Python 3.8, sem tracemalloc.reset_peak, o rastreamento é reiniciado a cada
+    evento, e a memória alocada antes do reinício passa a ser somada às leituras.
+
+    Attributes:
+        eventos (list): Eventos (Evento) na ordem em que terminaram
+    """
+
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.eventos = []
+        self._origem = time.perf_counter()
+        self._local = threading.local()
+        self._deslocamento = 0
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def encerrar(self):
+        """Desliga o tracemalloc, se ele foi ligado por este perfilador."""
+        if self.memoria and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def medir(self, nome, categoria='fase', linha=None):
+        """
+        Mede o bloco 'with' como um evento.
+
+        Eventos podem ser aninhados: o pico de um evento inclui o de seus internos.
+
+        Args:
+            nome (str): Nome do evento
+            categoria (str): Grupo do evento
+            linha (int): Linha do código fonte associada
+        """
+        memoria = self.memoria and tracemalloc.is_tracing()
+        pilha = self._pilha()
+        if memoria:
+            atual, pico = self._memoria_rastreada()
+            if pilha:
+                pilha[-1][1] = max(pilha[-1][1], pico)
+            self._reiniciar_pico()
+            pilha.append([atual, atual])
+        inicio_cpu = time.process_time()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            parede = time.perf_counter() - inicio
+            cpu = time.process_time() - inicio_cpu
+            pico_bytes = None
+            if memoria:
+                _, pico = self._memoria_rastreada()
+                base, pico_interno = pilha.pop()
+                pico = max(pico, pico_interno)
+                pico_bytes = max(pico - base, 0)
+                if pilha:
+                    pilha[-1][1] = max(pilha[-1][1], pico)
+            self.eventos.append(Evento(nome, categoria, linha, inicio - self._origem, parede, cpu,
+                                       pico_bytes, threading.get_ident()))
+
+    def _memoria_rastreada(self):
+        atual, pico = tracemalloc.get_traced_memory()
+        return atual + self._deslocamento, pico + self._deslocamento
+
+    def _reiniciar_pico(self):
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+            return
+        # Python 3.8: reiniciar o rastreamento zera o pico (e a memória atual, que
+        # passa ao deslocamento para manter as leituras na mesma escala)
+        atual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        tracemalloc.start()
+        self._deslocamento += atual
+
+    def _pilha(self):
+        # Eventos aninhados são acompanhados por thread (ver execução paralela)
+        pilha = getattr(self._local, 'pilha', None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def resumo(self):
+        """
+        Agrega os eventos por (categoria, nome).
+
+        Returns:
+            list: Um dict por grupo com 'chamadas', tempos totais e o maior pico,
+                  ordenados pelo tempo de relógio total (decrescente)
+        """
+        grupos = {}
+        for evento in self.eventos:
+            grupo = grupos.setdefault((evento.categoria, evento.nome), {
+                'categoria': evento.categoria, 'nome': evento.nome, 'chamadas': 0,
+                'parede_s': 0.0, 'cpu_s': 0.0, 'pico_bytes': None, 'linhas': []})
+            grupo['chamadas'] += 1
+            grupo['parede_s'] += evento.parede_s
+            grupo['cpu_s'] += evento.cpu_s
+            if evento.pico_bytes is not None:
+                grupo['pico_bytes'] = max(grupo['pico_bytes'] or 0, evento.pico_bytes)
+            if evento.linha is not None:
+                grupo['linhas'].append(evento.linha)
+        return sorted(grupos.values(), key=lambda g: g['parede_s'], reverse=True)
+
+    def imprimir_resumo(self, limite_linhas=10):
+        """
+        Imprime a tabela das fases e a das instruções mais lentas, com suas linhas no .psis.
+
+        Args:
+            limite_linhas (int): Número de instruções listadas
+        """
+        print("------- Perfil de Execução --------")
+        print(f"{'Fase':<22} {'Relógio (ms)':>13} {'CPU (ms)':>10} {'Pico (MiB)':>11}")
+        for evento in self.eventos:
+            if evento.categoria == 'fase':
+                print(f"{evento.nome:<22} {evento.parede_s * 1e3:13.3f} {evento.cpu_s * 1e3:10.3f} "
+                      f"{_mib(evento.pico_bytes):>11}")
+
+        instrucoes = sorted((e for e in self.eventos if e.categoria != 'fase'),
+                            key=lambda e: e.parede_s, reverse=True)[:limite_linhas]
+        if instrucoes:
+            print(f"\n{'Linha':>6} {'Instrução':<30} {'Relógio (ms)':>13} {'CPU (ms)':>10} {'Pico (MiB)':>11}")
+            for evento in instrucoes:
+                descricao = f"{evento.categoria} {evento.nome}"
+                print(f"{evento.linha if evento.linha is not None else '-':>6} {descricao:<30} "
+                      f"{evento.parede_s * 1e3:13.3f} {evento.cpu_s * 1e3:10.3f} {_mib(evento.pico_bytes):>11}")
+        print("-----------------------------------\n")
+
+    def chrome_trace(self):
+        """
+        Converte os eventos para o formato Chrome Trace (chrome://tracing, Perfetto).
+
+        Returns:
+            dict: Objeto com 'traceEvents' (eventos completos 'X', tempos em microssegundos)
+        """
+        pid = os.getpid()
+        eventos = []
+        for evento in self.eventos:
+            args = {'cpu_ms': evento.cpu_s * 1e3}
+            if evento.linha is not None:
+                args['linha'] = evento.linha
+            if evento.pico_bytes is not None:
+                args['pico_bytes'] = evento.pico_bytes
+            nome = evento.nome if evento.linha is None else f"{evento.nome} (linha {evento.linha})"
+            eventos.append({'name': nome, 'cat': evento.categoria, 'ph': 'X', 'pid': pid, 'tid': evento.thread,
+                            'ts': evento.inicio_s * 1e6, 'dur': evento.parede_s * 1e6, 'args': args})
+        return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+    def exportar_chrome_trace(self, caminho):
+        """Grava chrome_trace() em 'caminho' (JSON)."""
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+def _mib(n_bytes):
+    return '-' if n_bytes is None else f"{n_bytes / 1024 ** 2:.2f}"
@@ -0,0 +1,211 @@
+import json
+import math
+import os
+import sys
+
+import numpy as np
+import scipy.sparse as sp
+
+ROTULOS = {
+    'solve': "Solução do sistema:",
+    'det': "Determinante:",
+    'inv': "Matriz inversa:",
+    'trans': "Matriz transposta:",
+    'retP': "Matriz P (permutação):",
+    'retL': "Matriz L (triangular inferior):",
+    'retU': "Matriz U (triangular superior):",
+    'retD': "Matriz diagonal:",
+}
+
+# Representação JSON dos valores não finitos, pela representação do float no Python
+NAO_FINITOS = {'nan': "NaN", 'inf': "Infinity", '-inf': "-Infinity"}
+
+
+class Resultado:
+    """
+    Resultado de um comando PRO-SIS ('funcao variavel end').
+
+    Attributes:
+        indice (int): Posição do comando entre os comandos executados
+        funcao (str): Nome da função executada
+        variavel (str): Variável sobre a qual o comando foi executado
+        linha (int): Linha do comando no código fonte (None se desconhecida)
+        valor (np.ndarray, sparse ou float): Valor calculado
+    """
+
+    __slots__ = ('indice', 'funcao', 'variavel', 'linha', 'valor')
+
+    def __init__(self, indice, funcao, variavel, linha, valor):
+        self.indice = indice
+        self.funcao = funcao
+        self.variavel = variavel
+        self.linha = linha
+        self.valor = valor
+
+    @property
+    def chave(self):
+        """Nome único do resultado, usado como nome de arquivo/entrada nas saídas binárias."""
+        return f"{self.indice:04d}_{self.funcao}_{self.variavel}"
+
+    def como_dict(self):
+        """Representação serializável em JSON (matrizes como listas aninhadas)."""
+        return {
+            'indice': self.indice,
+            'funcao': self.funcao,
+            'variavel': self.variavel,
+            'linha': self.linha,
+            'valor': valor_para_json(self.valor),
+        }
+
+    def __repr__(self):
+        return f"Resultado({self.funcao} {self.variavel}, linha={self.linha})"
+
+
+def valor_para_json(valor):
+    """
+    Converte um valor do interpretador para tipos JSON.
+
+    Matrizes esparsas viram um objeto com as triplas (linhas, colunas, valores).
+    Valores não finitos (ex.: determinante de um sistema mal escalonado) viram as
+    strings "NaN", "Infinity" e "-Infinity", pois o JSON não tem NaN nem infinito.
+    """
+    if sp.issparse(valor):
+        coo = valor.tocoo()
+        return {'formato': 'esparso', 'forma': list(coo.shape), 'linhas': coo.row.tolist(),
+                'colunas': coo.col.tolist(), 'valores': _lista_json(coo.data)}
+    if isinstance(valor, np.ndarray):
+        return _lista_json(valor)
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return NAO_FINITOS[str(valor)]
+    return valor
+
+
+def _lista_json(array):
+    if not np.issubdtype(array.dtype, np.floating) or np.isfinite(array).all():
+        return array.tolist()
+    objetos = array.astype(object)
+    for nao_finito in zip(*np.nonzero(~np.isfinite(array))):
+        objetos[nao_finito] = NAO_FINITOS[str(float(array[nao_finito]))]
+    return objetos.tolist()
+
+
+class SaidaTexto:
+    """Imprime cada resultado com seu rótulo, como o interpretador sempre fez."""
+
+    def __init__(self, fluxo=None):
+        self.fluxo = fluxo
+
+    def escrever(self, resultado):
+        fluxo = self.fluxo or sys.stdout
+        rotulo = ROTULOS.get(resultado.funcao, f"{resultado.funcao}:")
+        if np.ndim(resultado.valor) == 0 and not sp.issparse(resultado.valor):
+            print(f"{rotulo} {resultado.valor}", file=fluxo)
+        else:
+            print(rotulo, file=fluxo)
+            print(resultado.valor, file=fluxo)
+
+    def fechar(self):
+        pass
+
+
+class SaidaNula:
+    """Descarta os resultados (útil para medir apenas o custo de execução)."""
+
+    def escrever(self, resultado):
+        pass
+
+    def fechar(self):
+        pass
+
+
+class SaidaJsonl:
+    """Grava um objeto JSON por linha para cada resultado."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+
+    def escrever(self, resultado):
+        if self._arquivo is None:
+            # Execuções seguintes na mesma sessão continuam o mesmo arquivo
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        self._arquivo.write(json.dumps(resultado.como_dict(), ensure_ascii=False, allow_nan=False) + "\n")
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+class SaidaNpz:
+    """
+    Acumula os resultados e os grava em um único arquivo .npz ao fechar.
+
+    Os resultados gravados são descartados: um compilador reutilizado grava, a cada
+    execução, apenas os resultados dela (o arquivo é sobrescrito).
+
+    Cada resultado vira a entrada '<indice>_<funcao>_<variavel>'; matrizes esparsas
+    são gravadas como '<chave>.data', '<chave>.indices', '<chave>.indptr' e '<chave>.shape' (CSR).
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arrays = {}
+
+    def escrever(self, resultado):
+        valor = resultado.valor
+        if sp.issparse(valor):
+            csr = sp.csr_matrix(valor)
+            for parte in ('data', 'indices', 'indptr'):
+                self._arrays[f"{resultado.chave}.{parte}"] = getattr(csr, parte)
+            self._arrays[f"{resultado.chave}.shape"] = np.array(csr.shape)
+        else:
+            self._arrays[resultado.chave] = np.asarray(valor)
+
+    def fechar(self):
+        np.savez(self.caminho, **self._arrays)
+        self._arrays = {}
+
+
+class SaidaNpy:
+    """Grava cada resultado denso como '<diretorio>/<chave>.npy' (esparsos em '<chave>.npz')."""
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+
+    def escrever(self, resultado):
+        caminho = os.path.join(self.diretorio, resultado.chave)
+        if sp.issparse(resultado.valor):
+            sp.save_npz(caminho + ".npz", sp.csr_matrix(resultado.valor))
+        else:
+            np.save(caminho + ".npy", np.asarray(resultado.valor))
+
+    def fechar(self):
+        pass
+
+
+def criar_saida(destino):
+    """
+    Cria a saída de resultados a partir de uma descrição.
+
+    Args:
+        destino: None ou 'texto' (impressão), 'nula', um caminho '.jsonl', um caminho
+                 '.npz', um diretório (um .npy por resultado) ou um objeto de saída pronto
+
+    Returns:
+        Objeto com os métodos 'escrever(resultado)' e 'fechar()'
+    """
+    if destino is None or destino == 'texto':
+        return SaidaTexto()
+    if not isinstance(destino, str):
+        return destino
+    if destino in ('nula', 'null'):
+        return SaidaNula()
+    if destino.endswith('.jsonl'):
+        return SaidaJsonl(destino)
+    if destino.endswith('.npz'):
+        return SaidaNpz(destino)
+    return SaidaNpy(destino)
@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pro_sis_interpreter import ProSisCompiler
+from pro_sis_lote import GRAMATICA_PADRAO, executar_codigo, inicializar_trabalhador
+from pro_sis_paralelo import threads_blas_padrao
+
+CAMINHO_PADRAO = "<servidor>"
+LIMITE_LINHA = 1 << 30
+
+
+def _aquecer():
+    """Tarefa vazia usada para iniciar os processos do pool antes da primeira requisição."""
+    return os.getpid()
+
+
+class ProSisServidor:
+    """
+    Servidor PRO-SIS de longa duração sobre socket Unix ou TCP local.
+
+    O protocolo é JSON por linha: cada requisição é um objeto com o campo 'codigo'
+    (e, opcionalmente, 'sessao', 'arquivo' e 'reiniciar'); cada resposta é o resultado
+    estruturado da execução. As conexões são atendidas pelo asyncio e a execução
+    (análise sintática e álgebra linear) ocorre em um pool de processos já aquecidos,
+    cada um com o parser construído uma única vez.
+
+    Requisições com 'sessao' são executadas em um processo dedicado àquela sessão,
+    que mantém as variáveis entre requisições; sem 'sessao', cada requisição parte
+    de um workspace vazio.
+
+    Attributes:
+        workers (int): Número de processos do pool compartilhado
+        max_sessoes (int): Número máximo de sessões com workspace mantido (LRU)
+
+    Com usar_ir=True, código repetido (ex.: o mesmo programa enviado várias vezes)
+    é executado a partir do programa compilado em cache, sem passar pelo parser.
+    Com diretorio_incremental, um programa reenviado após uma edição recalcula apenas
+    as instruções afetadas por ela (ver ProSisCompiler, modo incremental).
+    Cada requisição limita o BLAS a threads_blas threads (padrão: núcleos / workers,
+    requer threadpoolctl), para que os processos não disputem os mesmos núcleos.
+    A 'saida' das respostas traz as mensagens do interpretador; os valores dos
+    comandos vão apenas em 'resultados', a menos que saida_texto=True.
+    """
+
+    def __init__(self, workers=None, parser='lalr', grammar_file=GRAMATICA_PADRAO,
+                 opcoes_interpretador=None, max_sessoes=8, usar_ir=False,
+                 diretorio_incremental=None, threads_blas=None, saida_texto=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_sessoes = max_sessoes
+        opcoes_interpretador = dict(opcoes_interpretador or {})
+        opcoes_interpretador.setdefault('threads_blas', threads_blas or threads_blas_padrao(self.workers))
+        # Os valores já vão em 'resultados': formatá-los em texto na 'saida' é opcional
+        opcoes_interpretador.setdefault('saida_resultados', None if saida_texto else 'nula')
+        self._argumentos_inicializacao = (grammar_file, parser, opcoes_interpretador, True, True, usar_ir,
+                                          diretorio_incremental)
+        self._pool = None
+        self._sessoes = OrderedDict()
+
+    def _novo_executor(self, workers):
+        return ProcessPoolExecutor(max_workers=workers, initializer=inicializar_trabalhador,
+                                   initargs=self._argumentos_inicializacao)
+
+    async def iniciar(self):
+        """Cria o pool compartilhado e aquece todos os seus processos."""
+        loop = asyncio.get_running_loop()
+        self._pool = self._novo_executor(self.workers)
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _aquecer) for _ in range(self.workers)))
+
+    def encerrar(self):
+        for executor in self._sessoes.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._sessoes.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _executor_da_sessao(self, sessao):
+        """Retorna o processo dedicado à sessão, descartando a sessão mais antiga se necessário."""
+        executor = self._sessoes.get(sessao)
+        if executor is not None:
+            self._sessoes.move_to_end(sessao)
+            return executor
+        if len(self._sessoes) >= self.max_sessoes:
+            _, antigo = self._sessoes.popitem(last=False)
+            antigo.shutdown(wait=False)
+        executor = self._novo_executor(1)
+        self._sessoes[sessao] = executor
+        return executor
+
+    def _recriar_executor(self, executor, sessao):
+        """Descarta um executor quebrado; o pool compartilhado é recriado, a sessão, removida."""
+        executor.shutdown(wait=False, cancel_futures=True)
+        if sessao is not None:
+            if self._sessoes.get(str(sessao)) is executor:
+                del self._sessoes[str(sessao)]
+        elif self._pool is executor:
+            self._pool = self._novo_executor(self.workers)
+
+    async def processar(self, requisicao):
+        """
+        Executa uma requisição e devolve a resposta estruturada.
+
+        Args:
+            requisicao (dict): Requisição decodificada
+
+        Returns:
+            dict: Resposta com 'status', 'erro', 'saida', 'resultados' e 'tempo_s'
+        """
+        codigo = requisicao.get('codigo')
+        if not isinstance(codigo, str):
+            return {'status': 'erro', 'erro': "Erro: Requisição sem o campo 'codigo'."}
+
+        sessao = requisicao.get('sessao')
+        caminho = requisicao.get('arquivo') or CAMINHO_PADRAO
+        if sessao is None:
+            executor, reiniciar = self._pool, True
+        else:
+            executor, reiniciar = self._executor_da_sessao(str(sessao)), bool(requisicao.get('reiniciar', False))
+
+        loop = asyncio.get_running_loop()
+        try:
+            resposta = await loop.run_in_executor(executor, executar_codigo, codigo, caminho, reiniciar)
+        except BrokenProcessPool:
+            # O processo morreu (falha, falta de memória): o executor não aceita mais
+            # tarefas e é recriado; o workspace de uma sessão é perdido
+            self._recriar_executor(executor, sessao)
+            resposta = {'status': 'erro', 'erro': "Erro: O processo que executava o programa foi encerrado "
+                                                  "inesperadamente; o workspace foi reiniciado."}
+        except Exception as e:
+            resposta = {'status': 'erro', 'erro': f"Erro: Falha ao executar o programa ({e})."}
+        if sessao is not None:
+            resposta['sessao'] = sessao
+        return resposta
+
+    async def _atender(self, leitor, escritor):
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    requisicao = json.loads(linha)
+                    if not isinstance(requisicao, dict):
+                        raise ValueError("a requisição deve ser um objeto JSON")
+                except ValueError as e:
+                    resposta = {'status': 'erro', 'erro': f"Erro: Requisição inválida ({e})."}
+                else:
+                    resposta = await self.processar(requisicao)
+                escritor.write(json.dumps(resposta, ensure_ascii=False).encode('utf-8') + b"\n")
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, caminho_socket=None, porta=None, host='127.0.0.1'):
+        """
+        Atende conexões até ser interrompido.
+
+        Args:
+            caminho_socket (str): Caminho do socket Unix (tem prioridade sobre 'porta')
+            porta (int): Porta TCP em 'host'
+            host (str): Endereço TCP (padrão: apenas local)
+        """
+        await self.iniciar()
+        if caminho_socket:
+            if os.path.exists(caminho_socket):
+                os.unlink(caminho_socket)
+            servidor = await asyncio.start_unix_server(self._atender, path=caminho_socket, limit=LIMITE_LINHA)
+            endereco = caminho_socket
+        else:
+            servidor = await asyncio.start_server(self._atender, host=host, port=porta, limit=LIMITE_LINHA)
+            endereco = f"{host}:{porta}"
+        print(f"Servidor PRO-SIS ouvindo em {endereco} com {self.workers} processos.")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            self.encerrar()
+
+
+def enviar_programa(codigo, caminho_socket=None, porta=None, host='127.0.0.1', **campos):
+    """
+    Cliente simples: envia um programa ao servidor e retorna a resposta decodificada.
+
+    Args:
+        codigo (str): Código fonte PRO-SIS
+        caminho_socket (str): Socket Unix do servidor
+        porta (int): Porta TCP do servidor (usada se 'caminho_socket' não for dado)
+        host (str): Endereço TCP do servidor
+        **campos: Campos extras da requisição ('sessao', 'arquivo', 'reiniciar')
+
+    Returns:
+        dict: Resposta do servidor
+    """
+    if caminho_socket:
+        conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conexao.connect(caminho_socket)
+    else:
+        conexao = socket.create_connection((host, porta))
+    with conexao, conexao.makefile('rwb') as canal:
+        canal.write(json.dumps(dict(campos, codigo=codigo), ensure_ascii=False).encode('utf-8') + b"\n")
+        canal.flush()
+        return json.loads(canal.readline())
+
+
+def main():
+    """
+    Inicia o servidor PRO-SIS, ou envia um arquivo a um servidor em execução (--enviar).
+    """
+    cli_parser = argparse.ArgumentParser(description="Servidor persistente do interpretador PRO-SIS")
+    cli_parser.add_argument("--socket", default=None, help="Caminho do socket Unix.")
+    cli_parser.add_argument("--porta", type=int, default=8765, help="Porta TCP local (padrão: 8765), se --socket não for usado.")
+    cli_parser.add_argument("--workers", type=int, default=None, help="Processos do pool (padrão: número de núcleos).")
+    cli_parser.add_argument("--parser", choices=ProSisCompiler.PARSERS_SUPORTADOS, default="lalr",
+                            help="Algoritmo de análise sintática (padrão: lalr).")
+    cli_parser.add_argument("--max-sessoes", type=int, default=8, help="Sessões com workspace mantido (padrão: 8).")
+    cli_parser.add_argument("--ir", action="store_true",
+                            help="Executa programas compilados e guardados em cache (código repetido não passa pelo parser).")
+    cli_parser.add_argument("--incremental", default=None, metavar="DIR",
+                            help="Modo incremental: reenvios de um programa editado recalculam só o que mudou "
+                                 "(memoização compartilhada em DIR).")
+    cli_parser.add_argument("--threads-blas", type=int, default=None, metavar="N",
+                            help="Threads do BLAS por requisição (padrão: núcleos / workers; requer threadpoolctl).")
+    cli_parser.add_argument("--saida-texto", action="store_true",
+                            help="Inclui na 'saida' das respostas os resultados impressos em texto (padrão: só em 'resultados').")
+    cli_parser.add_argument("--enviar", metavar="ARQUIVO", default=None,
+                            help="Modo cliente: envia o arquivo .psis ao servidor e imprime a resposta.")
+    cli_parser.add_argument("--sessao", default=None, help="Modo cliente: sessão cujo workspace deve ser usado.")
+    args = cli_parser.parse_args()
+
+    if args.enviar:
+        with open(args.enviar, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+        campos = {'arquivo': os.path.abspath(args.enviar)}
+        if args.sessao:
+            campos['sessao'] = args.sessao
+        inicio = time.perf_counter()
+        resposta = enviar_programa(codigo, caminho_socket=args.socket, porta=args.porta, **campos)
+        resposta['latencia_s'] = time.perf_counter() - inicio
+        print(json.dumps(resposta, ensure_ascii=False, indent=2))
+        return
+
+    servidor = ProSisServidor(workers=args.workers, parser=args.parser, max_sessoes=args.max_sessoes, usar_ir=args.ir,
+                              diretorio_incremental=args.incremental, threads_blas=args.threads_blas,
+                              saida_texto=args.saida_texto)
+    try:
+        asyncio.run(servidor.servir(caminho_socket=args.socket, porta=args.porta))
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.")
+
+
+if __name__ == "__main__":
+    main()
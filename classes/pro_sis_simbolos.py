@@ -0,0 +1,157 @@
+import numpy as np
+import scipy.sparse as sp
+
+TIPOS_NUMERICOS = ('int', 'float')
+
+# Tipos exatos mais comuns, resolvidos sem percorrer a cadeia de isinstance
+_TIPOS_ESCALARES = {int: 'int', bool: 'int', float: 'float', np.float64: 'float'}
+
+
+class Simbolo:
+    """
+    Entrada da tabela de símbolos do interpretador (ProSisInterpreter.vars).
+
+    Os metadados do valor são calculados uma única vez, ao declarar a variável, e
+    atualizados apenas quando o valor é trocado ('definir'): uma chamada adiada que é
+    calculada ou um array despejado em disco.
+
+    Attributes:
+        tipo (str): Tipo declarado ('int', 'float', 'eq' ou 'sis')
+        valor: Número, np.ndarray, matriz esparsa ou chamada adiada (Adiado)
+        forma (tuple): Dimensões do valor (None para números e chamadas adiadas)
+        dtype (np.dtype): Tipo dos elementos (None para números e chamadas adiadas)
+        esparsa (bool): Indica se o valor é uma matriz esparsa
+        estruturas (dict): Estruturas detectadas (ver pro_sis_estrutura), pela forma da
+                           matriz analisada (o sistema completo ou os coeficientes)
+    """
+
+    __slots__ = ('tipo', 'valor', 'forma', 'dtype', 'esparsa', 'estruturas')
+
+    def __init__(self, tipo, valor):
+        self.tipo = tipo
+        self.estruturas = {}
+        self.definir(valor)
+
+    def definir(self, valor):
+        """Troca o valor (de mesmo tipo) e recalcula os metadados."""
+        self.valor = valor
+        if self.tipo in TIPOS_NUMERICOS:
+            self.forma = self.dtype = None
+            self.esparsa = False
+            return
+        self.forma = getattr(valor, 'shape', None)
+        self.dtype = getattr(valor, 'dtype', None)
+        self.esparsa = sp.issparse(valor)
+
+    def __repr__(self):
+        return f"Simbolo({self.tipo}, forma={self.forma})"
+
+
+def tipo_do_valor(valor):
+    """
+    Tipo PRO-SIS de um valor já avaliado.
+
+    Returns:
+        str: 'int', 'float', 'eq' ou 'sis', ou None se o valor não tiver tipo na linguagem
+    """
+    tipo = _TIPOS_ESCALARES.get(type(valor))
+    if tipo is not None:
+        return tipo
+    if isinstance(valor, np.ndarray):
+        return {2: 'sis', 1: 'eq'}.get(valor.ndim)
+    if sp.issparse(valor):
+        return 'sis'
+    if isinstance(valor, list):
+        return 'eq'
+    if isinstance(valor, float):
+        return 'float'
+    if isinstance(valor, int):
+        return 'int'
+    return None
+
+
+def verificar_programa(programa, simbolos):
+    """
+    Análise semântica estática de um ProgramaIR, antes da execução.
+
+    Percorre as instruções na ordem, acompanhando o tipo e a forma de cada variável a
+    partir dos literais e das regras de cada função, sem calcular nada. Uma instrução
+    é marcada como verificada quando todas as suas verificações semânticas (variáveis
+    definidas, tipos, argumentos e matriz de coeficientes quadrada) passam com certeza;
+    a execução dessas instruções pula as verificações. As demais (valores de 'load',
+    conversões que dependem do valor, erros) são verificadas durante a execução, que
+    reporta os erros na ordem do programa, com as mensagens de sempre.
+
+    Args:
+        programa (ProgramaIR): Programa compilado
+        simbolos (dict): Tabela de símbolos antes do programa (nome -> Simbolo)
+
+    Returns:
+        list: Para cada instrução, True se ela foi verificada estaticamente
+    """
+    tabela = {nome: (simbolo.tipo, simbolo.forma) for nome, simbolo in simbolos.items()}
+    verificadas = []
+    for instrucao in programa.instrucoes:
+        if instrucao[0] == 'comando':
+            simbolo = tabela.get(instrucao[3])
+            verificadas.append(simbolo is not None and simbolo[0] == 'sis')
+            continue
+        _, _, tipo_declarado, nome_var, expressao = instrucao
+        tipo, forma = _tipo_expressao(expressao, tabela, programa.arrays)
+        verificada = tipo == tipo_declarado
+        verificadas.append(verificada)
+        # Se a declaração não for verificada e falhar, a execução para nela: depois dela,
+        # a variável sempre tem o tipo declarado
+        tabela[nome_var] = (tipo_declarado, forma if verificada else None)
+    return verificadas
+
+
+def _tipo_expressao(expressao, tabela, arrays):
+    """Tipo e forma do valor de uma expressão do IR, ou (None, None) se só a execução pode dizer."""
+    tipo = expressao[0]
+    if tipo == 'numero':
+        return _TIPOS_ESCALARES.get(type(expressao[1])), None
+    if tipo == 'ref':
+        return tabela.get(expressao[1], (None, None))
+    if tipo == 'vetor':
+        return 'eq', arrays[expressao[1]].shape
+    if tipo == 'sistema':
+        return 'sis', arrays[expressao[1]].shape
+    if tipo == 'esparsa':
+        return 'sis', (expressao[1], expressao[2])
+    if tipo == 'chamada':
+        return _tipo_chamada(expressao[1], expressao[2], expressao[3], tabela)
+    return None, None
+
+
+def _tipo_chamada(funcao, nome_var, nomes_termos, tabela):
+    tipo, forma = tabela.get(nome_var, (None, None))
+    if tipo != 'sis' or (nomes_termos and funcao != 'solve'):
+        return None, None
+    if forma is None:
+        return ('sis', None) if funcao == 'trans' else (None, None)
+    m, colunas = forma
+    if funcao == 'trans':
+        return 'sis', (colunas - 1, m)
+    if funcao == 'solve':
+        return _tipo_solve(m, colunas, nomes_termos, tabela)
+    if m != colunas - 1:
+        return None, None
+    if funcao == 'det':
+        return 'float', None
+    return 'sis', (m, m)
+
+
+def _tipo_solve(n, colunas, nomes_termos, tabela):
+    if not nomes_termos:
+        if colunas <= n:
+            return None, None
+        return ('eq', (n,)) if colunas - n == 1 else ('sis', (n, colunas - n))
+    if colunas < n:
+        return None, None
+    termos = [tabela.get(nome, (None, None)) for nome in nomes_termos]
+    if any(tipo not in ('eq', 'sis') or forma is None or forma[0] != n for tipo, forma in termos):
+        return None, None
+    if len(termos) == 1:
+        return termos[0]
+    return 'sis', (n, sum(forma[1] if len(forma) == 2 else 1 for _, forma in termos))
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+DIRETORIO_CLASSES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'classes')
+sys.path.insert(0, DIRETORIO_CLASSES)
+
+from pro_sis_interpreter import ProSisCompiler  # noqa: E402
+
+GRAMATICA = os.path.join(DIRETORIO_CLASSES, 'pro_sis_grammar.lark')
+
+
+@pytest.fixture
+def executar(tmp_path):
+    """Executa um código PRO-SIS no modo de produção e retorna os valores dos comandos."""
+    def executar_codigo(codigo, usar_ir=False, incremental=None, **opcoes):
+        opcoes.setdefault('saida_resultados', 'nula')
+        opcoes.setdefault('verboso', False)
+        compilador = ProSisCompiler(GRAMATICA, parser='lalr', cache_dir=str(tmp_path / 'cache'),
+                                    opcoes_interpretador=opcoes, usar_ir=usar_ir,
+                                    incremental=incremental is not None, diretorio_incremental=incremental)
+        caminho = str(tmp_path / 'programa.psis')
+        return [r.valor for r in compilador.run(codigo, caminho, mostrar_arvore=False, salvar_tokens=False)]
+    return executar_codigo
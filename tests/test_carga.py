@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from pro_sis_carga import carregar_matriz
+
+
+@pytest.mark.parametrize('conteudo', [
+    "1 2 3 4\n5 6\n7 8 9 10 11 12\n",
+    "1,2,3,4\n5,6\n7,8,9,10,11,12\n",
+    "1;2;3\n4;5;6;7\n",
+])
+def test_linhas_com_colunas_diferentes(tmp_path, conteudo):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_text(conteudo)
+    with pytest.raises(Exception, match="devem ter"):
+        carregar_matriz(str(caminho))
+
+
+def test_valor_nao_numerico(tmp_path):
+    caminho = tmp_path / 'dados.txt'
+    caminho.write_text("1 2 3\n4 x 6\n")
+    with pytest.raises(Exception, match="não numérico"):
+        carregar_matriz(str(caminho))
+
+
+def test_texto_com_separadores_e_comentarios(tmp_path):
+    caminho = tmp_path / 'dados.txt'
+    caminho.write_text("# coeficientes\n1, 2, 3\n\n4;5;6\n7 8\t9\n")
+    np.testing.assert_array_equal(carregar_matriz(str(caminho)), [[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+
+
+def test_load_de_arquivo_malformado(executar, tmp_path):
+    (tmp_path / 'A.csv').write_text("1 2 3 4\n5 6\n7 8 9 10 11 12\n")
+    with pytest.raises(Exception, match="devem ter 4 colunas"):
+        executar('sis A = load("A.csv") solve A end')
+
+
+def test_texto_nao_mantem_a_pre_alocacao(tmp_path):
+    caminho = tmp_path / 'dados.txt'
+    caminho.write_text("# cabeçalho\n\n" * 50 + "1 2\n3 4\n")
+    matriz = carregar_matriz(str(caminho))
+    np.testing.assert_array_equal(matriz, [[1, 2], [3, 4]])
+    assert matriz.base is None and matriz.nbytes == 4 * 8
+
+
+@pytest.mark.parametrize('array', [np.array([1, 'a', None], dtype=object), np.array(['a', 'b'])])
+def test_npy_nao_numerico(tmp_path, array):
+    caminho = tmp_path / 'dados.npy'
+    np.save(caminho, array, allow_pickle=True)
+    with pytest.raises(Exception, match="Erro: O arquivo .*dados.npy"):
+        carregar_matriz(str(caminho))
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from conftest import DIRETORIO_CLASSES, GRAMATICA
+from pro_sis_interpreter import ProSisCompiler
+
+
+@pytest.mark.parametrize('exemplo', ['test_0', 'test_1', 'test_2', 'test_trans'])
+def test_arquivo_de_tokens_de_referencia(tmp_path, monkeypatch, exemplo):
+    # O arquivo de tokens é gravado no diretório atual, com o nome do programa
+    monkeypatch.chdir(tmp_path)
+    caminho = os.path.join(DIRETORIO_CLASSES, f'{exemplo}.psis')
+    with open(caminho, encoding='utf-8') as f:
+        codigo = f.read()
+    compilador = ProSisCompiler(GRAMATICA, opcoes_interpretador={'verboso': False, 'saida_resultados': 'nula'})
+    try:
+        compilador.run(codigo, caminho, mostrar_arvore=True, salvar_tokens=True)
+    except Exception:
+        pass  # os exemplos incluem erros propositais; o arquivo de tokens já foi gravado
+    with open(os.path.join(DIRETORIO_CLASSES, f'{exemplo}.txt'), encoding='utf-8') as f:
+        referencia = f.read().replace('\r\n', '\n')
+    assert (tmp_path / f'{exemplo}.txt').read_text(encoding='utf-8') == referencia
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+
+def _esparsa(A, B):
+    """Literal 'sparse(m, n) {...}' do sistema aumentado [A | B]."""
+    aumentada = np.column_stack([A, B])
+    triplas = ", ".join(f"({i}, {j}, {float(v)!r})" for (i, j), v in np.ndenumerate(aumentada) if v != 0)
+    return f"sparse({aumentada.shape[0]}, {aumentada.shape[1]}) {{{triplas}}}"
+
+
+def _sistemas():
+    gerador = np.random.default_rng(3)
+    n = 40
+    # Simétrica definida positiva (dominância diagonal) e não simétrica, ambas esparsas
+    espd = np.diag(np.full(n, 4.0)) - np.eye(n, k=1) - np.eye(n, k=-1) - 0.5 * np.eye(n, k=7) - 0.5 * np.eye(n, k=-7)
+    nao_simetrica = np.diag(np.full(n, 5.0)) + 2 * np.eye(n, k=1) - np.eye(n, k=-3) + 0.5 * np.eye(n, k=11)
+    b = gerador.standard_normal(n)
+    return {'simetrica_positiva': (espd, b), 'nao_simetrica': (nao_simetrica, b)}
+
+
+SISTEMAS = _sistemas()
+CASOS = [('simetrica_positiva', 'direto'), ('simetrica_positiva', 'cg'), ('simetrica_positiva', 'gmres'),
+         ('nao_simetrica', 'direto'), ('nao_simetrica', 'gmres')]
+
+
+@pytest.mark.parametrize('sistema, solver', CASOS)
+def test_solve_esparso_igual_ao_denso(executar, sistema, solver):
+    A, b = SISTEMAS[sistema]
+    codigo = f"sis S = {_esparsa(A, b)}\nsolve S end\ndet S end\n"
+    solucao, det = executar(codigo, solver=solver, tolerancia=1e-10)
+    esperado = np.linalg.solve(A, b)
+    rtol = 1e-10 if solver == 'direto' else 1e-7
+    np.testing.assert_allclose(solucao, esperado, rtol=rtol, atol=1e-12)
+    assert det == pytest.approx(np.linalg.det(A), rel=1e-9)
+
+
+@pytest.mark.parametrize('solver', ['cg', 'gmres'])
+def test_solve_esparso_com_varios_termos(executar, solver):
+    A, b = SISTEMAS['simetrica_positiva']
+    B = np.column_stack([b, 2 * b + 1])
+    codigo = f"sis S = {_esparsa(A, B)}\nsolve S end\n"
+    solucao, = executar(codigo, solver=solver, tolerancia=1e-10)
+    np.testing.assert_allclose(solucao, np.linalg.solve(A, B), rtol=1e-7, atol=1e-12)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize('solver', ['cg', 'gmres'])
+def test_metodo_iterativo_que_nao_converge(executar, solver):
+    # Sistema singular e inconsistente: nenhum x satisfaz 0 * x2 = 1
+    A = np.diag([1.0, 0.0, -1.0])
+    codigo = f"sis S = {_esparsa(A, np.ones(3))}\nsolve S end\n"
+    with pytest.raises(Exception, match=f"o método '{solver}' não convergiu"):
+        executar(codigo, solver=solver)
+
+
+def test_solver_invalido(executar):
+    with pytest.raises(Exception, match="Solver 'jacobi' inválido"):
+        executar("sis S = sparse(1, 2) {(0, 0, 1), (0, 1, 1)}\nsolve S end\n", solver='jacobi')
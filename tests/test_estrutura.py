@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from conftest import GRAMATICA
+from pro_sis_estrutura import FRACAO_BANDA, detectar_estrutura
+from pro_sis_fatoracao import (FatoracaoBanda, FatoracaoCholesky, FatoracaoDiagonal, FatoracaoLU,
+                               FatoracaoTriangular)
+from pro_sis_interpreter import ProSisCompiler
+
+
+def _tridiagonal(n):
+    return np.diag(np.full(n, 4.0)) + np.diag(np.full(n - 1, -1.0), -1) + np.diag(np.full(n - 1, 2.0), 1)
+
+
+def _matrizes():
+    gerador = np.random.default_rng(7)
+    geral = gerador.standard_normal((6, 6)) + 6 * np.eye(6)
+    quase_inferior = np.tril(geral)
+    quase_inferior[0, 5] = 1e-3
+    simetrica_indefinida = np.array([[1.0, 2, 0], [2, 1, 0], [0, 0, 3]])
+    n_banda = int(3 / FRACAO_BANDA)
+    return {
+        'diagonal': (np.diag([2.0, -3.0, 0.5, 4.0]), 'diagonal', FatoracaoDiagonal),
+        'triangular_inferior': (np.tril(geral), 'triangular_inferior', FatoracaoTriangular),
+        'triangular_superior': (np.triu(geral), 'triangular_superior', FatoracaoTriangular),
+        'banda': (_tridiagonal(n_banda), 'banda', FatoracaoBanda),
+        'cholesky': (geral @ geral.T + np.eye(6), 'simetrica_positiva', FatoracaoCholesky),
+        # Quase estruturadas: devem cair na LU geral
+        'quase_triangular': (quase_inferior, 'geral', FatoracaoLU),
+        'banda_larga': (_tridiagonal(n_banda - 1), 'geral', FatoracaoLU),
+        'simetrica_indefinida': (simetrica_indefinida, 'simetrica_indefinida', FatoracaoLU),
+    }
+
+
+MATRIZES = _matrizes()
+
+
+def _sistema(A, b):
+    linhas = ", ".join("[" + ", ".join(repr(float(v)) for v in linha) + "]" for linha in np.column_stack([A, b]))
+    return "sis A = {" + linhas + "}\neq x = solve(A)\n"
+
+
+@pytest.mark.parametrize('caso', sorted(MATRIZES))
+def test_estrutura_e_solucao(caso):
+    A, tipo, classe = MATRIZES[caso]
+    b = np.arange(1.0, A.shape[0] + 1)
+    compilador = ProSisCompiler(GRAMATICA, parser='lalr',
+                                opcoes_interpretador={'verboso': False, 'saida_resultados': 'nula'})
+    compilador.run(_sistema(A, b), 'programa.psis', mostrar_arvore=False, salvar_tokens=False)
+    interpretador = compilador.interpreter
+
+    estrutura = interpretador.vars['A'].estruturas[A.shape]
+    assert estrutura.tipo == tipo
+    assert isinstance(interpretador._fatoracao('A', A), classe)
+    np.testing.assert_allclose(interpretador.vars['x'].valor, np.linalg.solve(A, b), rtol=1e-10, atol=1e-12)
+
+
+def test_larguras_de_banda():
+    estrutura = detectar_estrutura(MATRIZES['banda'][0])
+    assert (estrutura.inferior, estrutura.superior) == (1, 1)
+    assert detectar_estrutura(np.triu(np.ones((5, 5)))).superior == 4
+
+
+def test_simetrica_com_diagonal_nao_positiva_nao_tenta_cholesky():
+    A = np.array([[-2.0, 1, 0], [1, -2, 1], [0, 1, -2]])
+    assert detectar_estrutura(A).tipo == 'geral'
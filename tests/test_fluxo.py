@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from lark.exceptions import UnexpectedInput
+
+from conftest import GRAMATICA
+from pro_sis_fluxo import instrucoes_em_fluxo
+from pro_sis_interpreter import ProSisCompiler
+
+PARSERS = ['lalr', 'earley']
+
+
+def _compilador(parser, tmp_path):
+    return ProSisCompiler(GRAMATICA, parser=parser, cache_dir=str(tmp_path / 'cache'),
+                          opcoes_interpretador={'verboso': False, 'saida_resultados': 'nula'})
+
+
+def _executar_fluxo(parser, tmp_path, codigo):
+    compilador = _compilador(parser, tmp_path)
+    linhas = codigo.splitlines(keepends=True)
+    return [r.valor for r in compilador.executar_fluxo(iter(linhas), str(tmp_path / 'programa.psis'))]
+
+
+def _executar(parser, tmp_path, codigo):
+    compilador = _compilador(parser, tmp_path)
+    resultados = compilador.run(codigo, str(tmp_path / 'programa.psis'), mostrar_arvore=False, salvar_tokens=False)
+    return [r.valor for r in resultados]
+
+
+def _linhas_consumidas(codigo, lidas):
+    for numero, linha in enumerate(codigo.splitlines(keepends=True), 1):
+        lidas.append(numero)
+        yield linha
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_instrucao_em_varias_linhas(parser, tmp_path):
+    codigo = "sis A = {\n  [2, 0, 4],\n\n  [0, 4, 8]\n}\nsolve A\nend\ndet A end\n"
+    obtidos = _executar_fluxo(parser, tmp_path, codigo)
+    esperados = _executar(parser, tmp_path, codigo)
+    assert len(obtidos) == 2
+    for obtido, esperado in zip(obtidos, esperados):
+        np.testing.assert_allclose(obtido, esperado)
+    np.testing.assert_allclose(obtidos[0], [2.0, 2.0])
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_varias_instrucoes_na_mesma_linha(parser, tmp_path):
+    codigo = "sis A = {[2, 0, 4], [0, 4, 8]} det A end trans A end\n"
+    obtidos = _executar_fluxo(parser, tmp_path, codigo)
+    esperados = _executar(parser, tmp_path, codigo)
+    assert len(obtidos) == len(esperados) == 2
+    assert obtidos[0] == pytest.approx(8.0)
+    np.testing.assert_allclose(obtidos[1], esperados[1])
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_linhas_do_erro_sao_as_do_arquivo(parser, tmp_path):
+    analisar = _compilador(parser, tmp_path).pro_sis_parser.parse
+    codigo = "sis A = {[1, 2]}\n\n// comentário\ndet A end\nsis = 3\n"
+    with pytest.raises(UnexpectedInput) as erro:
+        list(instrucoes_em_fluxo(codigo.splitlines(keepends=True), analisar))
+    assert erro.value.line == 5
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_instrucao_invalida_nao_espera_o_fim_da_entrada(parser, tmp_path):
+    analisar = _compilador(parser, tmp_path).pro_sis_parser.parse
+    codigo = "sis A = {[1, 2]}\nsis = 3\n" + "det A end\n" * 50
+    lidas = []
+    instrucoes = instrucoes_em_fluxo(_linhas_consumidas(codigo, lidas), analisar)
+    assert next(instrucoes).data == 'declaracao'
+    with pytest.raises(UnexpectedInput):
+        next(instrucoes)
+    # O erro é reportado na linha 2, sem acumular o resto da entrada
+    assert max(lidas) == 2
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_instrucao_incompleta_no_fim(parser, tmp_path):
+    with pytest.raises(UnexpectedInput):
+        _executar_fluxo(parser, tmp_path, "sis A = {[1, 2]}\ndet A\n")
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import GRAMATICA
+from pro_sis_interpreter import ProSisCompiler
+
+CODIGO = """
+sis A = {[4, 1, 2], [1, 3, 3]}
+inv A end
+sis B = {[2, 0, 1], [1, 5, 2]}
+eq X = solve(B)
+det B end
+"""
+
+
+@pytest.fixture
+def executar_incremental(tmp_path):
+    """Executa o código em um compilador novo (outro processo, em essência) com a memoização em disco."""
+    diretorio = tmp_path / 'memo'
+
+    def executar(codigo):
+        compilador = ProSisCompiler(GRAMATICA, parser='lalr', cache_dir=str(tmp_path / 'cache'), incremental=True,
+                                    diretorio_incremental=str(diretorio),
+                                    opcoes_interpretador={'verboso': False, 'saida_resultados': 'nula'})
+        resultados = compilador.run(codigo, str(tmp_path / 'programa.psis'), mostrar_arvore=False, salvar_tokens=False)
+        return [r.valor for r in resultados], compilador.interpreter.reaproveitadas
+    executar.diretorio = diretorio
+    return executar
+
+
+def test_instrucoes_inalteradas_sao_reaproveitadas(executar_incremental):
+    valores, reaproveitadas = executar_incremental(CODIGO)
+    assert reaproveitadas == 0
+
+    repetidos, reaproveitadas = executar_incremental(CODIGO)
+    assert reaproveitadas == 3
+    for a, b in zip(repetidos, valores):
+        np.testing.assert_array_equal(a, b)
+
+    # Literais não são memoizados; editar B recalcula X e 'det B', e 'inv A' é reaproveitado
+    editados, reaproveitadas = executar_incremental(CODIGO.replace("[2, 0, 1]", "[3, 0, 1]"))
+    assert reaproveitadas == 1
+    np.testing.assert_array_equal(editados[0], valores[0])
+    assert editados[1] == pytest.approx(np.linalg.det([[3, 0], [1, 5]]))
+
+
+def test_entrada_corrompida_e_recalculada(executar_incremental):
+    valores, _ = executar_incremental(CODIGO)
+    arquivos = [os.path.join(executar_incremental.diretorio, nome) for nome in os.listdir(executar_incremental.diretorio)]
+    assert arquivos
+    for caminho in arquivos:
+        with open(caminho, 'r+b') as f:
+            f.truncate(os.path.getsize(caminho) // 2)
+
+    recalculados, reaproveitadas = executar_incremental(CODIGO)
+    assert reaproveitadas == 0
+    for a, b in zip(recalculados, valores):
+        np.testing.assert_array_equal(a, b)
+    assert executar_incremental(CODIGO)[1] == 3
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+from conftest import GRAMATICA
+from pro_sis_interpreter import ProSisCompiler
+
+CODIGO = "sis A = {[2, 0, 4], [0, 4, 8]}\nsolve A end\n"
+
+
+def _compilador(diretorio):
+    return ProSisCompiler(GRAMATICA, parser='lalr', cache_dir=str(diretorio), usar_ir=True,
+                          opcoes_interpretador={'verboso': False, 'saida_resultados': 'nula'})
+
+
+@pytest.mark.parametrize('corromper', [lambda dados: dados[:len(dados) // 2], lambda dados: b'', lambda dados: b'lixo' * 64])
+def test_programa_compilado_corrompido_e_recompilado(tmp_path, corromper):
+    _compilador(tmp_path).run(CODIGO, str(tmp_path / 'p.psis'), mostrar_arvore=False, salvar_tokens=False)
+    caminho, = [os.path.join(tmp_path, nome) for nome in os.listdir(tmp_path) if nome.endswith('.psir')]
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    with open(caminho, 'wb') as f:
+        f.write(corromper(dados))
+
+    resultados = _compilador(tmp_path).run(CODIGO, str(tmp_path / 'p.psis'), mostrar_arvore=False, salvar_tokens=False)
+    assert resultados[0].valor.tolist() == [2.0, 2.0]
+    with open(caminho, 'rb') as f:
+        assert f.read() == dados
@@ -0,0 +1,54 @@
+import pytest
+
+import pro_sis_lote
+from pro_sis_lote import executar_lote
+from pro_sis_resultados import SaidaTexto
+from pro_sis_servidor import ProSisServidor
+
+PROGRAMA = "sis A = {[2, 0, 4], [0, 4, 8]}\nsolve A end\ndet A end\n"
+
+
+@pytest.fixture
+def programa(tmp_path):
+    caminho = tmp_path / 'programa.psis'
+    caminho.write_text(PROGRAMA, encoding='utf-8')
+    return str(caminho)
+
+
+def test_lote_sem_saida_nao_formata_resultados(programa, monkeypatch):
+    def formatar(self, resultado):
+        raise AssertionError("resultado formatado em texto sem --guardar-saida")
+
+    monkeypatch.setattr(SaidaTexto, 'escrever', formatar)
+    resumo = executar_lote([programa], workers=1, guardar_resultados=True)
+    resultado, = resumo['arquivos']
+    assert resultado['status'] == 'ok'
+    assert 'saida' not in resultado
+    assert [r['valor'] for r in resultado['resultados']] == [[2.0, 2.0], 8.0]
+
+
+def test_lote_com_saida_impressa(programa):
+    resultado, = executar_lote([programa], workers=1, guardar_saida=True)['arquivos']
+    assert "Solução do sistema:" in resultado['saida']
+    assert "Determinante: 8.0" in resultado['saida']
+
+
+def test_servidor_sem_saida_texto(programa):
+    pro_sis_lote.inicializar_trabalhador(*ProSisServidor(workers=1)._argumentos_inicializacao)
+    resposta = pro_sis_lote.executar_codigo(PROGRAMA, programa)
+    assert [r['valor'] for r in resposta['resultados']] == [[2.0, 2.0], 8.0]
+    assert "Determinante" not in resposta['saida']
+
+    pro_sis_lote.inicializar_trabalhador(*ProSisServidor(workers=1, saida_texto=True)._argumentos_inicializacao)
+    assert "Determinante: 8.0" in pro_sis_lote.executar_codigo(PROGRAMA, programa)['saida']
+
+
+def test_sessao_retorna_apenas_os_proprios_resultados(programa):
+    pro_sis_lote.inicializar_trabalhador(*ProSisServidor(workers=1)._argumentos_inicializacao)
+    primeira = pro_sis_lote.executar_codigo(PROGRAMA, programa, reiniciar=True)
+    segunda = pro_sis_lote.executar_codigo("det A end\n", programa, reiniciar=False)
+    terceira = pro_sis_lote.executar_codigo("trans A end\n", programa, reiniciar=False)
+    assert [r['funcao'] for r in primeira['resultados']] == ['solve', 'det']
+    assert [(r['funcao'], r['valor']) for r in segunda['resultados']] == [('det', 8.0)]
+    assert [r['funcao'] for r in terceira['resultados']] == ['trans']
+    assert len(pro_sis_lote._compilador.interpreter.resultados) == 1
@@ -0,0 +1,57 @@
+import gc
+
+import numpy as np
+import pytest
+
+from pro_sis_interpreter import ProSisInterpreter
+from pro_sis_memoria import GerenciadorMemoria
+
+
+def _interpretador(limite, tmp_path):
+    return ProSisInterpreter(limite_memoria=limite, diretorio_despejo=str(tmp_path), verboso=False,
+                             saida_resultados='nula')
+
+
+def test_relatorio_so_e_calculado_acima_do_limite(executar, monkeypatch):
+    chamadas = []
+    relatorio = GerenciadorMemoria.relatorio
+
+    def contar(self, interpretador):
+        chamadas.append(1)
+        return relatorio(self, interpretador)
+
+    monkeypatch.setattr(GerenciadorMemoria, 'relatorio', contar)
+    codigo = "".join(f"sis A{i} = {{[{i + 2}, 1, 1], [1, {i + 3}, 2]}}\ndet A{i} end\n" for i in range(200))
+    assert len(executar(codigo, limite_memoria='1G')) == 200
+    # Apenas o resumo exibido no fim do programa
+    assert len(chamadas) == 1
+
+
+def test_total_corrente_acompanha_declaracoes_e_liberacoes(tmp_path):
+    interpretador = _interpretador('1G', tmp_path)
+    memoria = interpretador.memoria
+    interpretador.declarar('sis', 'A', np.ones((100, 101)))
+    interpretador.declarar('sis', 'B', interpretador.vars['A'].valor)
+    assert memoria.bytes_registrados == memoria.relatorio(interpretador)['total'] == 100 * 101 * 8
+
+    interpretador.declarar('sis', 'A', np.ones((10, 11)))
+    gc.collect()
+    # O buffer antigo de A continua vivo em B
+    assert memoria.bytes_registrados == memoria.relatorio(interpretador)['total']
+    interpretador.declarar('sis', 'B', np.ones((10, 11)))
+    gc.collect()
+    assert memoria.bytes_registrados == memoria.relatorio(interpretador)['total'] == 2 * 10 * 11 * 8
+
+
+def test_limite_continua_respeitado(tmp_path):
+    interpretador = _interpretador('3M', tmp_path)
+    for nome in 'ABC':
+        interpretador.declarar('sis', nome, np.ones((400, 401)))
+    uso = interpretador.memoria_workspace()
+    assert uso['total'] <= 3 * 1024 ** 2
+    assert uso['despejada'] > 0
+    assert interpretador.memoria.bytes_registrados >= uso['total']
+    np.testing.assert_array_equal(interpretador.vars['A'].valor, np.ones((400, 401)))
+
+    with pytest.raises(Exception, match="Limite de memória excedido"):
+        interpretador.memoria.aplicar_limite(interpretador, 4 * 1024 ** 2, "'inv(A)'")
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import pro_sis_paralelo
+from conftest import GRAMATICA
+from pro_sis_interpreter import ProSisCompiler
+
+CODIGO = """
+sis A = {[4, 1, 2], [1, 3, 3]}
+sis B = {[2, 0, 1], [1, 5, 2]}
+inv A end
+det B end
+eq X = solve(A)
+trans A end
+"""
+
+
+def test_threads_usam_o_programa_compilado(executar):
+    sequencial = executar(CODIGO)
+    paralelo = executar(CODIGO, threads=2)
+    assert len(paralelo) == len(sequencial)
+    for a, b in zip(paralelo, sequencial):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_threads_com_diagnosticos(tmp_path):
+    compilador = ProSisCompiler(GRAMATICA, parser='lalr', cache_dir=str(tmp_path),
+                                opcoes_interpretador={'threads': 2, 'verboso': False, 'saida_resultados': 'nula'})
+    with pytest.raises(Exception, match="execução paralela"):
+        compilador.run(CODIGO, str(tmp_path / 'programa.psis'))
+
+
+@pytest.mark.parametrize('threads', [1, 2, 4])
+def test_limite_de_memoria_com_threads(executar, tmp_path, monkeypatch, threads):
+    rng = np.random.default_rng(0)
+    for nome in 'ABCD':
+        A = rng.random((400, 401))
+        A[:, :400] += 50 * np.eye(400)
+        np.save(tmp_path / f'{nome}.npy', A)
+    codigo = ''.join(f'sis {nome} = load("{nome}.npy")\ninv {nome} end\nretL {nome} end\n' for nome in 'ABCD')
+    esperado = executar(codigo)
+
+    # Workspace, cálculos em andamento, valores pendentes e fatorações cabem no limite
+    reservar = pro_sis_paralelo._OrcamentoMemoria.reservar
+    reservas = []
+
+    def reservar_e_conferir(orcamento, adicional, descricao):
+        reservar(orcamento, adicional, descricao)
+        with orcamento.condicao:
+            reservas.append(orcamento._excesso(0))
+
+    monkeypatch.setattr(pro_sis_paralelo._OrcamentoMemoria, 'reservar', reservar_e_conferir)
+    obtido = executar(codigo, threads=threads, limite_memoria='4M')
+    for a, b in zip(obtido, esperado):
+        np.testing.assert_array_equal(a, b)
+    if threads > 1:
+        assert reservas and max(reservas) <= 0
@@ -0,0 +1,28 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from pro_sis_perfil import Perfilador
+
+
+@pytest.mark.parametrize('reset_peak', [True, False])
+def test_pico_de_memoria_dos_eventos(monkeypatch, reset_peak):
+    if not reset_peak:
+        # Python 3.8: sem tracemalloc.reset_peak
+        monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+    perfilador = Perfilador()
+    try:
+        with perfilador.medir('externo'):
+            grande = np.ones(1024 ** 2)
+            with perfilador.medir('interno'):
+                pequeno = np.ones(1024)
+            del grande, pequeno
+        with perfilador.medir('depois'):
+            pass
+    finally:
+        perfilador.encerrar()
+    picos = {evento.nome: evento.pico_bytes for evento in perfilador.eventos}
+    assert picos['externo'] >= 8 * 1024 ** 2
+    assert 8 * 1024 <= picos['interno'] < 1024 ** 2
+    assert picos['depois'] < 1024 ** 2
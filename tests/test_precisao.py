@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from pro_sis_fatoracao import FatoracaoLUEsparsa
+
+
+def _sistema(A):
+    linhas = ', '.join('[' + ', '.join(str(float(v)) for v in linha) + ']' for linha in A)
+    return f"sis A = {{{linhas}}}"
+
+
+# Matrizes que usam a LU densa, a de Cholesky e a LU em banda (ver pro_sis_estrutura)
+MATRIZES = {
+    'geral': np.array([[4.0, 1.0, 2.0, 1.0], [1.0, 3.0, 3.0, 2.0], [2.0, -1.0, 5.0, 0.0]]),
+    'simetrica_positiva': np.array([[4.0, 1.0, 2.0], [1.0, 3.0, 0.0], [2.0, 0.0, 5.0]]),
+    'banda': np.diag(np.full(12, 4.0)) + np.diag(np.ones(11), 1) + np.diag(np.ones(11), -1),
+}
+
+
+@pytest.mark.parametrize('estrutura', sorted(MATRIZES))
+def test_inversa_em_float32(executar, estrutura):
+    A = MATRIZES[estrutura]
+    if A.shape[0] == A.shape[1]:
+        A = np.hstack([A, np.ones((A.shape[0], 1))])
+    inversa, = executar(f"{_sistema(A)} inv A end", precisao='float32')
+    assert inversa.dtype == np.float32
+    np.testing.assert_allclose(inversa, np.linalg.inv(A[:, :-1]), rtol=1e-4, atol=1e-5)
+
+
+def test_permutacao_em_float32(executar):
+    P, L, U = executar(f"{_sistema(MATRIZES['geral'])} retP A end retL A end retU A end", precisao='float32')
+    assert P.dtype == L.dtype == U.dtype == np.float32
+    np.testing.assert_allclose(P @ L @ U, MATRIZES['geral'][:, :-1], rtol=1e-5)
+
+
+def test_memoizacao_separa_precisoes(executar, tmp_path):
+    codigo = f"{_sistema(MATRIZES['geral'])} inv A end solve A end"
+    diretorio = str(tmp_path / 'memo')
+    for precisao in ('float64', 'float32', 'float64'):
+        valores = executar(codigo, incremental=diretorio, precisao=precisao)
+        assert [v.dtype for v in valores] == [np.dtype(precisao)] * 2
+
+
+@pytest.mark.parametrize('precisao', ['float64', 'float32'])
+def test_tamanho_da_lu_esparsa(precisao):
+    A = sp.random(200, 200, density=0.02, random_state=0, format='csc', dtype=precisao) + 10 * sp.eye(200, dtype=precisao)
+    fatoracao = FatoracaoLUEsparsa(A)
+    L, U = fatoracao.fatores.L, fatoracao.fatores.U
+    assert L.dtype == np.dtype(precisao)
+    assert fatoracao.nbytes == sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in (L, U))
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from conftest import GRAMATICA
+from pro_sis_adiado import Adiado
+from pro_sis_interpreter import ProSisCompiler, ProSisInterpreter
+
+BASE = "sis A = {[4, 1, 2, 1], [1, 3, 0, 2], [2, 0, 5, 3]}\neq b = [1, 2, 3]\n"
+
+# Uso de uma chamada adiada -> padrão de ProSisInterpreter.FUSOES que deve resolvê-lo
+USOS = {
+    "sis Ai = inv(A)\ndet Ai end": ('det', 'inv'),
+    "sis Ai = inv(A)\ninv Ai end": ('inv', 'inv'),
+    "sis Ai = inv(A)\neq x = solve(Ai, b)": ('solve', 'inv'),
+    "sis T = trans(A)\ndet T end": ('det', 'trans'),
+    "sis T = trans(A)\ninv T end": ('inv', 'trans'),
+    "sis T = trans(A)\neq x = solve(T, b)": ('solve', 'trans'),
+}
+
+
+def _executar(codigo, preguicoso):
+    compilador = ProSisCompiler(GRAMATICA, parser='lalr',
+                                opcoes_interpretador={'preguicoso': preguicoso, 'verboso': False,
+                                                      'saida_resultados': 'nula'})
+    resultados = compilador.run(codigo, 'programa.psis', mostrar_arvore=False, salvar_tokens=False)
+    interpretador = compilador.interpreter
+    valores = [r.valor for r in resultados]
+    if 'x' in interpretador.vars:
+        # 'x' é uma chamada adiada no modo preguiçoso: '_valor' a calcula (e aplica a fusão)
+        valores.append(interpretador._valor('x'))
+    return valores, interpretador
+
+
+def test_todos_os_padroes_sao_testados():
+    assert set(USOS.values()) == set(ProSisInterpreter.FUSOES)
+
+
+@pytest.mark.parametrize('uso', sorted(USOS))
+def test_fusao_igual_a_execucao_imediata(uso):
+    esperados, imediato = _executar(BASE + uso, preguicoso=False)
+    obtidos, preguicoso = _executar(BASE + uso, preguicoso=True)
+    assert imediato.fusoes == 0
+    assert preguicoso.fusoes == 1
+    # A chamada adiada (inv/trans) foi resolvida pela fusão, sem ser calculada
+    adiado = preguicoso.vars['Ai' if 'Ai' in preguicoso.vars else 'T'].valor
+    assert isinstance(adiado, Adiado) and not adiado.calculado
+    assert len(obtidos) == len(esperados) == 1
+    np.testing.assert_allclose(obtidos[0], esperados[0], rtol=1e-12, atol=1e-14)
+
+
+def test_declaracao_nunca_usada_nao_e_calculada():
+    valores, interpretador = _executar(BASE + "sis Ai = inv(A)\nsis T = trans(A)\ndet A end", preguicoso=True)
+    assert interpretador.chamadas_adiadas == 2
+    assert interpretador.chamadas_calculadas == 0
+    assert valores[0] == pytest.approx(np.linalg.det([[4, 1, 2], [1, 3, 0], [2, 0, 5]]))
+
+
+def test_sem_fusao_a_chamada_e_calculada():
+    # 'trans T' não tem padrão de fusão: a chamada adiada é calculada e o valor é o mesmo
+    esperados, _ = _executar(BASE + "sis Ai = inv(A)\ntrans Ai end", preguicoso=False)
+    obtidos, interpretador = _executar(BASE + "sis Ai = inv(A)\ntrans Ai end", preguicoso=True)
+    assert interpretador.fusoes == 0
+    assert interpretador.chamadas_calculadas == 1
+    np.testing.assert_allclose(obtidos[0], esperados[0])
@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+import scipy.sparse as sp
+
+from conftest import GRAMATICA
+from pro_sis_interpreter import ProSisCompiler
+from pro_sis_resultados import Resultado, SaidaJsonl
+
+
+def test_jsonl_com_valores_nao_finitos(tmp_path):
+    caminho = tmp_path / 'resultados.jsonl'
+    saida = SaidaJsonl(str(caminho))
+    saida.escrever(Resultado(0, 'det', 'A', 1, np.float64('inf')))
+    saida.escrever(Resultado(1, 'inv', 'A', 2, np.array([[1.0, np.nan], [-np.inf, 2.0]], dtype=np.float32)))
+    saida.escrever(Resultado(2, 'inv', 'B', 3, sp.csr_matrix(np.array([[np.nan, 0.0], [0.0, 1.0]]))))
+    saida.fechar()
+
+    def rejeitar(constante):
+        raise ValueError(f"JSON inválido: {constante}")
+
+    linhas = [json.loads(linha, parse_constant=rejeitar) for linha in caminho.read_text(encoding='utf-8').splitlines()]
+    assert linhas[0]['valor'] == "Infinity"
+    assert linhas[1]['valor'] == [[1.0, "NaN"], ["-Infinity", 2.0]]
+    assert linhas[2]['valor']['valores'] == ["NaN", 1.0]
+
+
+def test_npz_de_compilador_reutilizado(tmp_path):
+    caminho = tmp_path / 'resultados.npz'
+    compilador = ProSisCompiler(GRAMATICA, parser='lalr',
+                                opcoes_interpretador={'verboso': False, 'saida_resultados': str(caminho)})
+    programa = str(tmp_path / 'programa.psis')
+    compilador.run("sis A = {[2, 0, 4], [0, 4, 8]}\nsolve A end\ndet A end\n", programa,
+                   mostrar_arvore=False, salvar_tokens=False)
+    with np.load(caminho) as arquivo:
+        assert sorted(arquivo.files) == ['0000_solve_A', '0001_det_A']
+
+    compilador.run("sis B = {[1, 2], [3, 4]}\ntrans B end\n", programa, mostrar_arvore=False, salvar_tokens=False)
+    with np.load(caminho) as arquivo:
+        assert arquivo.files == ['0002_trans_B']
+        np.testing.assert_array_equal(arquivo['0002_trans_B'], [[1, 3], [2, 4]])
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import os
+
+from pro_sis_servidor import ProSisServidor
+
+PROGRAMA = "sis A = {[2, 0, 4], [0, 4, 8]}\nsolve A end\ndet A end\n"
+
+
+def _com_servidor(teste):
+    """Executa a corrotina 'teste(servidor, enviar)' com um servidor real em um socket Unix."""
+    async def executar(caminho_socket):
+        servidor = ProSisServidor(workers=1)
+        await servidor.iniciar()
+        socket_servidor = await asyncio.start_unix_server(servidor._atender, path=caminho_socket)
+        leitor, escritor = await asyncio.open_unix_connection(caminho_socket)
+
+        async def enviar(**requisicao):
+            escritor.write(json.dumps(requisicao).encode('utf-8') + b"\n")
+            await escritor.drain()
+            return json.loads(await leitor.readline())
+
+        try:
+            await teste(servidor, enviar)
+        finally:
+            escritor.close()
+            socket_servidor.close()
+            servidor.encerrar()
+    return executar
+
+
+def test_requisicao_e_resposta(tmp_path):
+    async def teste(servidor, enviar):
+        resposta = await enviar(codigo=PROGRAMA)
+        assert resposta['status'] == 'ok'
+        assert [(r['funcao'], r['valor']) for r in resposta['resultados']] == [('solve', [2.0, 2.0]), ('det', 8.0)]
+
+        assert (await enviar(codigo=PROGRAMA, sessao='s'))['status'] == 'ok'
+        resposta = await enviar(codigo="det A end\n", sessao='s')
+        assert [(r['funcao'], r['valor']) for r in resposta['resultados']] == [('det', 8.0)]
+
+        resposta = await enviar(codigo="det X end\n")
+        assert resposta['status'] == 'erro' and "'X'" in resposta['erro']
+
+    asyncio.run(_com_servidor(teste)(str(tmp_path / 'pro_sis.sock')))
+
+
+def test_processo_encerrado(tmp_path):
+    async def teste(servidor, enviar):
+        # Derruba o processo do pool compartilhado e o de uma sessão, como um OOM kill faria
+        servidor._pool.submit(os._exit, 1)
+        resposta = await enviar(codigo=PROGRAMA)
+        assert resposta['status'] == 'erro' and "encerrado inesperadamente" in resposta['erro']
+        assert (await enviar(codigo=PROGRAMA))['status'] == 'ok'
+
+        assert (await enviar(codigo=PROGRAMA, sessao='s'))['status'] == 'ok'
+        servidor._sessoes['s'].submit(os._exit, 1)
+        resposta = await enviar(codigo="det A end\n", sessao='s')
+        assert resposta['status'] == 'erro' and resposta['sessao'] == 's'
+        # A sessão recomeça com um workspace vazio
+        resposta = await enviar(codigo="det A end\n", sessao='s')
+        assert resposta['status'] == 'erro' and "'A'" in resposta['erro']
+        assert (await enviar(codigo=PROGRAMA, sessao='s'))['status'] == 'ok'
+
+    asyncio.run(_com_servidor(teste)(str(tmp_path / 'pro_sis.sock')))
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from conftest import GRAMATICA
+from pro_sis_interpreter import ProSisCompiler, ProSisInterpreter
+from pro_sis_ir import compilar_arvore
+from pro_sis_simbolos import verificar_programa
+
+VALIDO = ("sis A = {[4, 1, 2, 1], [1, 3, 0, 2], [2, 0, 5, 3]}\n"
+          "eq b = [1, 2, 3]\n"
+          "sis Ai = inv(A)\n"
+          "float d = det(A)\n"
+          "eq x = solve(A, b)\n"
+          "sis T = trans(A)\n"
+          "det A end\nsolve A end\ninv Ai end\n")
+
+
+def _verificadas(codigo):
+    compilador = ProSisCompiler(GRAMATICA, parser='lalr', opcoes_interpretador={'verboso': False})
+    return verificar_programa(compilar_arvore(compilador.pro_sis_parser.parse(codigo)), {})
+
+
+def test_programa_valido_e_todo_verificado():
+    assert all(_verificadas(VALIDO))
+
+
+def test_instrucoes_nao_verificadas():
+    codigo = ("sis A = load(\"a.npy\")\n"    # forma só conhecida na execução
+              "det A end\n"                  # A tem tipo conhecido: verificado
+              "float d = det(A)\n"           # quadrada? depende do valor carregado
+              "sis B = {[1, 2], [3, 4]}\n"   # 1 x 1 de coeficientes
+              "eq c = [1, 2]\n"
+              "det c end\n"                  # comando sobre 'eq'
+              "int n = det(B)\n")            # 'det' é float
+    assert _verificadas(codigo) == [False, True, False, True, True, False, False]
+
+
+@pytest.fixture
+def contar_verificacoes(monkeypatch):
+    chamadas = {'tipo': 0, 'comandos': []}
+    verificar_tipo = ProSisInterpreter._verificar_tipo
+    executar_comando = ProSisInterpreter.executar_comando
+
+    def _verificar_tipo(self, *args):
+        chamadas['tipo'] += 1
+        return verificar_tipo(self, *args)
+
+    def _executar_comando(self, nome_funcao, nome_var, linha=None, verificada=False):
+        chamadas['comandos'].append(verificada)
+        return executar_comando(self, nome_funcao, nome_var, linha, verificada)
+
+    monkeypatch.setattr(ProSisInterpreter, '_verificar_tipo', _verificar_tipo)
+    monkeypatch.setattr(ProSisInterpreter, 'executar_comando', _executar_comando)
+    return chamadas
+
+
+def test_instrucoes_verificadas_pulam_as_verificacoes(executar, contar_verificacoes):
+    executar(VALIDO, usar_ir=True)
+    assert contar_verificacoes['tipo'] == 0
+    assert contar_verificacoes['comandos'] == [True, True, True]
+
+
+def test_instrucoes_nao_verificadas_sao_verificadas_na_execucao(executar, contar_verificacoes, tmp_path):
+    np.save(tmp_path / 'a.npy', np.array([[2.0, 0, 4], [0, 4, 8]]))
+    valores = executar("sis A = load(\"a.npy\")\nfloat d = det(A)\ndet A end\n", usar_ir=True)
+    assert valores == [pytest.approx(8.0)]
+    assert contar_verificacoes['tipo'] == 2
+    assert contar_verificacoes['comandos'] == [True]
+
+
+@pytest.mark.parametrize('preguicoso', [False, True])
+def test_programa_valido_tem_os_mesmos_resultados(executar, preguicoso):
+    esperados = executar(VALIDO, usar_ir=False, preguicoso=preguicoso)
+    obtidos = executar(VALIDO, usar_ir=True, preguicoso=preguicoso)
+    assert len(obtidos) == len(esperados) == 3
+    for obtido, esperado in zip(obtidos, esperados):
+        np.testing.assert_allclose(obtido, esperado)
+
+
+@pytest.mark.parametrize('codigo, mensagem', [
+    ("int n = 3\ndet n end\n", "requer uma variável do tipo 'sis'"),
+    ("sis B = {[1, 2, 3, 4], [5, 6, 7, 8]}\ndet B end\n", "quadrada"),
+    ("float f = 3\n", "Impossível atribuir"),
+])
+def test_erros_continuam_reportados(executar, codigo, mensagem):
+    with pytest.raises(Exception, match=mensagem):
+        executar(codigo, usar_ir=True)